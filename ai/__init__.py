@@ -1,15 +1,45 @@
+from typing import Any
+from plugin_registry import FactorySpec, PluginRegistry
 from .base_agent import AIAgent
-from .gemini_agent import GeminiAgent
+from .pipeline_pool import PipelinePool
+from .audio_cache import AudioCache, audio_cache
+
+# Agents are imported on first use; packages can add more with a "videosdk_call_server.ai_agents" entry point
+ai_agents = PluginRegistry(
+    "AI agent",
+    "agents",
+    {
+        "gemini": "ai.gemini_agent:GeminiAgent",
+    },
+    entry_point_group="videosdk_call_server.ai_agents",
+)
+
+def register_ai_agent(agent_name: str, factory: FactorySpec) -> None:
+    """Make an AI agent available to get_ai_agent, as a factory or a "module:Class" spec."""
+    ai_agents.register(agent_name, factory)
 
 def get_ai_agent(agent_name: str = "gemini") -> AIAgent:
     """Factory function to get the appropriate AI agent."""
-    agents = {
-        "gemini": GeminiAgent,
-    }
-    
-    if agent_name not in agents:
-        raise ValueError(f"Unsupported AI agent: {agent_name}. Available agents: {list(agents.keys())}")
-    
-    return agents[agent_name]()
-
-__all__ = ["AIAgent", "GeminiAgent", "get_ai_agent"] 
\ No newline at end of file
+    return ai_agents.create(agent_name)
+
+def __getattr__(name: str) -> Any:
+    # These import the agent SDKs, so they are only loaded when asked for
+    if name == "GeminiAgent":
+        from .gemini_agent import GeminiAgent
+        return GeminiAgent
+    if name == "CachedSpeechAgentSession":
+        from .cached_speech import CachedSpeechAgentSession
+        return CachedSpeechAgentSession
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    "AIAgent",
+    "GeminiAgent",
+    "PipelinePool",
+    "AudioCache",
+    "CachedSpeechAgentSession",
+    "audio_cache",
+    "ai_agents",
+    "get_ai_agent",
+    "register_ai_agent",
+]
\ No newline at end of file
@@ -0,0 +1,124 @@
+import os
+import mmap
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+AudioBuffer = Union[bytes, memoryview]
+
+class AudioCache:
+    """
+    Synthesized speech keyed by (text, voice, model, sample format).
+
+    Recent entries are held in an LRU bounded by total bytes. Every entry is also written to a file in
+    the cache directory and memory-mapped when read back, so greetings cached by earlier processes play
+    without reading the whole file first.
+    """
+
+    def __init__(
+        self,
+        directory: str = Config.AUDIO_CACHE_DIR,
+        memory_bytes: int = Config.AUDIO_CACHE_MEMORY_BYTES,
+        enabled: bool = Config.AUDIO_CACHE_ENABLED,
+    ):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, AudioBuffer]" = OrderedDict()
+        self._memory_used = 0
+        self._writes: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "store_errors": 0,
+        }
+
+    @staticmethod
+    def make_key(text: str, voice: Optional[str], model: str, sample_format: str) -> str:
+        """Return the cache key, which is also the file name, for a spoken text."""
+        return hashlib.sha256("\0".join((sample_format, model, voice or "", text)).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def _remember(self, key: str, audio: AudioBuffer) -> None:
+        if key in self._memory:
+            self._memory_used -= len(self._memory.pop(key))
+        if len(audio) > self.memory_bytes:
+            return
+        self._memory[key] = audio
+        self._memory_used += len(audio)
+        while self._memory_used > self.memory_bytes:
+            # Evicted memory maps are unmapped once playbacks using them finish
+            self._memory_used -= len(self._memory.popitem(last=False)[1])
+
+    def get(self, key: str) -> Optional[AudioBuffer]:
+        """Return cached audio, from memory or by mapping its file, or None on a miss."""
+        if not self.enabled:
+            return None
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return audio
+
+        try:
+            with open(self._path(key), "rb") as file:
+                audio = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file, which cannot be mapped
+            self.stats["misses"] += 1
+            return None
+
+        self._remember(key, audio)
+        self.stats["disk_hits"] += 1
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Cache audio in memory now and write it to disk in the background."""
+        if not self.enabled or not audio:
+            return
+        self._remember(key, audio)
+        if key not in self._writes:
+            task = asyncio.create_task(self._write(key, audio))
+            self._writes[key] = task
+            task.add_done_callback(lambda _: self._writes.pop(key, None))
+
+    async def _write(self, key: str, audio: bytes) -> None:
+        try:
+            await asyncio.to_thread(self._write_file, key, audio)
+            self.stats["stored"] += 1
+        except OSError as e:
+            self.stats["store_errors"] += 1
+            logger.warning(f"Failed to write cached audio {key}: {e}")
+
+    def _write_file(self, key: str, audio: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(audio)
+        # Readers never see a partially written file
+        os.replace(temporary, path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage."""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+        }
+
+# Process-wide cache shared by all sessions
+audio_cache = AudioCache()
@@ -1,21 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from videosdk.agents import AgentSession, RealTimePipeline
+from typing import TYPE_CHECKING, Dict, Any, Hashable, Optional
+
+if TYPE_CHECKING:
+    from videosdk.agents import AgentSession, RealTimePipeline
 
 class AIAgent(ABC):
     """Base interface for AI agents."""
     
     @abstractmethod
-    def create_pipeline(self) -> RealTimePipeline:
+    def create_pipeline(self) -> "RealTimePipeline":
         """Create and return the AI pipeline."""
         pass
     
     @abstractmethod
-    def create_session(self, room_id: str, context: Dict[str, Any]) -> AgentSession:
-        """Create and return an agent session."""
+    def create_session(self, room_id: str, context: Dict[str, Any]) -> "AgentSession":
+        """Create and return an agent session. Agents that support pooling also accept a pre-connected `model`."""
         pass
     
+    def pipeline_key(self) -> Optional[Hashable]:
+        """Return the configuration key under which ready models can be pooled, or None to disable pooling."""
+        return None
+    
+    async def prepare_model(self) -> Any:
+        """Create a model and open its connection ahead of a call."""
+        raise NotImplementedError(f"{self.get_agent_name()} does not support pre-warmed models")
+    
     @abstractmethod
     def get_agent_name(self) -> str:
         """Return the agent name."""
-        pass 
\ No newline at end of file
+        pass
\ No newline at end of file
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+from videosdk.agents import AgentSession
+from videosdk.agents.llm.chat_context import ChatRole
+from config import Config
+from .audio_cache import AudioBuffer, AudioCache, audio_cache
+
+logger = logging.getLogger(__name__)
+
+# Playback is fed to the audio track in slices of this many 20ms frames, yielding in between
+PLAYBACK_FRAMES_PER_SLICE = 10
+# Recordings shorter than this are assumed to be truncated and are not cached
+MIN_RECORDING_SECONDS = 0.3
+
+def audio_format(track: Any) -> str:
+    """Describe the sample format of an audio track, e.g. pcm_s16le-24000-1."""
+    return f"pcm_s{track.sample_width * 8}le-{track.sample_rate}-{track.channels}"
+
+class _SpeechRecorder:
+    """Copies the audio a model writes to a track until it goes quiet, then hands it to a callback."""
+
+    def __init__(self, track: Any, on_complete: Callable[[bytes], None], idle_timeout: float, max_bytes: int):
+        self._track = track
+        self._on_complete = on_complete
+        self._idle_timeout = idle_timeout
+        self._max_bytes = max_bytes
+        self._buffer = bytearray()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._recording = True
+        self._add_new_bytes = track.add_new_bytes
+        self._interrupt = track.interrupt
+        # Other taps may wrap the track after us, so we stay installed and pass through once done
+        track.add_new_bytes = self._on_audio
+        track.interrupt = self._on_interrupt
+
+    def _on_audio(self, audio_data: bytes):
+        if self._recording:
+            self._buffer += audio_data
+            if len(self._buffer) > self._max_bytes:
+                self._stop()
+            else:
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = asyncio.get_running_loop().call_later(self._idle_timeout, self._finish)
+        return self._add_new_bytes(audio_data)
+
+    def _on_interrupt(self):
+        # The caller barged in, so the recording is incomplete
+        self._stop()
+        return self._interrupt()
+
+    def _stop(self) -> None:
+        self._recording = False
+        self._buffer = bytearray()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _finish(self) -> None:
+        audio = bytes(self._buffer)
+        self._stop()
+        self._on_complete(audio)
+
+class CachedSpeechAgentSession(AgentSession):
+    """AgentSession whose scripted lines are played from the audio cache when possible."""
+
+    def __init__(self, *args: Any, cache: AudioCache = audio_cache, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    async def say(self, message: str) -> None:
+        model = self.pipeline.model
+        track = getattr(model, "audio_track", None)
+        # Cached playback needs a way to tell the model what was said without it speaking
+        if not self.cache.enabled or track is None or not hasattr(model, "add_assistant_message"):
+            return await super().say(message)
+
+        sample_format = audio_format(track)
+        key = self.cache.make_key(message, getattr(getattr(model, "config", None), "voice", None), str(getattr(model, "model", "")), sample_format)
+        audio = self.cache.get(key)
+        if audio is None:
+            min_bytes = int(MIN_RECORDING_SECONDS * track.sample_rate) * track.sample_width * track.channels
+
+            def store(recorded: bytes) -> None:
+                if len(recorded) >= min_bytes:
+                    self.cache.put(key, recorded)
+
+            max_bytes = int(Config.AUDIO_CACHE_MAX_ENTRY_SECONDS * track.sample_rate) * track.sample_width * track.channels
+            _SpeechRecorder(track, store, Config.AUDIO_CACHE_RECORD_IDLE, max_bytes)
+            return await super().say(message)
+
+        logger.info(f"Playing cached audio for message in room {self.context.get('meetingId')}")
+        self.agent.chat_context.add_message(role=ChatRole.ASSISTANT, content=message)
+        playback = asyncio.create_task(self._play(track, audio))
+        await model.add_assistant_message(message)
+        await playback
+
+    async def _play(self, track: Any, audio: AudioBuffer) -> None:
+        """Queue cached audio on the track in slices so large greetings do not stall the event loop."""
+        slice_size = track.chunk_size * PLAYBACK_FRAMES_PER_SLICE
+        for offset in range(0, len(audio), slice_size):
+            await track.add_new_bytes(bytes(audio[offset:offset + slice_size]))
+            await asyncio.sleep(0)
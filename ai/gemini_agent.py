@@ -1,28 +1,122 @@
-from typing import Dict, Any
-from videosdk.agents import AgentSession, RealTimePipeline
+import logging
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+from videosdk.agents import Agent, AgentSession, RealTimePipeline, get_tool_info
 from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
+from google.genai.types import Content, Part
 from .base_agent import AIAgent
+from .cached_speech import CachedSpeechAgentSession
 from voice_agent import VoiceAgent
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.0-flash-live-001"
+GEMINI_VOICE = "Leda"
+GEMINI_RESPONSE_MODALITIES = ["AUDIO"]
+
+class PrewarmedGeminiRealtime(GeminiRealtime):
+    """GeminiRealtime that can open its Live API session before the call and adopt it on connect()."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._prepared = None
+        self._prepared_for: Optional[Tuple[str, Tuple[str, ...]]] = None
+        self._base_instructions: Optional[str] = None
+        self._call_instructions: Optional[str] = None
+
+    def set_agent(self, agent: Agent) -> None:
+        super().set_agent(agent)
+        # A VoiceAgent's instructions are shared base instructions plus the facts of its call
+        self._base_instructions = getattr(agent, "base_instructions", agent.instructions)
+        self._call_instructions = getattr(agent, "call_instructions", None)
+
+    def _session_signature(self) -> Tuple[str, Tuple[str, ...]]:
+        # The Live API fixes instructions and tools when the session opens
+        tools = getattr(self, "tools", None) or []
+        return self._base_instructions, tuple(sorted(get_tool_info(tool).name for tool in tools))
+
+    async def prepare(self, agent: VoiceAgent) -> None:
+        """Configure the model for an agent and open its Live API session ahead of time."""
+        self.set_agent(agent)
+        self._prepared = await self._create_session()
+        self._prepared_for = self._session_signature()
+
+    async def _create_session(self):
+        prepared, self._prepared = self._prepared, None
+        if prepared is not None:
+            if self._prepared_for == self._session_signature():
+                try:
+                    await self._send_call_instructions(prepared)
+                except Exception as e:
+                    logger.warning(f"Could not add call instructions to pre-connected Gemini Live session: {e}")
+                else:
+                    logger.info("Using pre-connected Gemini Live session")
+                    return prepared
+            else:
+                # The agent changed instructions or tools since the session was opened
+                logger.info("Pre-connected Gemini Live session does not match the agent, opening a new one")
+            await self._cleanup_session(prepared)
+        return await super()._create_session()
+
+    async def _send_call_instructions(self, prepared) -> None:
+        """Give a session opened with the base instructions the facts of this call, without starting a turn."""
+        if self._call_instructions:
+            await prepared.session.send_client_content(
+                turns=[Content(parts=[Part(text=self._call_instructions)], role="user")],
+                turn_complete=False,
+            )
+
+    async def add_assistant_message(self, message: str) -> None:
+        """Add a line to the conversation as already spoken by the model, without generating audio."""
+        for _ in range(50):
+            if self._session and self._session.session:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            raise RuntimeError("No active Gemini session to add the message to")
+        await self._session.session.send_client_content(
+            turns=[Content(parts=[Part(text=message)], role="model")],
+            turn_complete=False,
+        )
+    
+    async def aclose(self) -> None:
+        if self._prepared is not None:
+            await self._cleanup_session(self._prepared)
+            self._prepared = None
+        await super().aclose()
+
 class GeminiAgent(AIAgent):
     """Gemini AI agent implementation."""
     
-    def create_pipeline(self) -> RealTimePipeline:
-        """Create and return the Gemini pipeline."""
-        model = GeminiRealtime(
-            model="gemini-2.0-flash-live-001",
+    def create_model(self) -> PrewarmedGeminiRealtime:
+        """Create a Gemini realtime model."""
+        return PrewarmedGeminiRealtime(
+            model=GEMINI_MODEL,
             api_key=Config.GOOGLE_API_KEY,
             config=GeminiLiveConfig(
-                voice="Leda",
-                response_modalities=["AUDIO"],
+                voice=GEMINI_VOICE,
+                response_modalities=GEMINI_RESPONSE_MODALITIES,
             )
         )
-        return RealTimePipeline(model=model)
     
-    def create_session(self, room_id: str, context: Dict[str, Any]) -> AgentSession:
+    def create_pipeline(self, model: Optional[PrewarmedGeminiRealtime] = None) -> RealTimePipeline:
+        """Create and return the Gemini pipeline, reusing a pre-connected model if given."""
+        return RealTimePipeline(model=model or self.create_model())
+    
+    def pipeline_key(self) -> Tuple[Any, ...]:
+        """Return the configuration key for pooled Gemini models."""
+        return ("gemini", GEMINI_MODEL, GEMINI_VOICE, tuple(GEMINI_RESPONSE_MODALITIES))
+    
+    async def prepare_model(self) -> PrewarmedGeminiRealtime:
+        """Create a Gemini model with its Live API session already open."""
+        model = self.create_model()
+        await model.prepare(VoiceAgent())
+        return model
+    
+    def create_session(self, room_id: str, context: Dict[str, Any], model: Optional[Any] = None) -> AgentSession:
         """Create and return a Gemini agent session."""
-        pipeline = self.create_pipeline()
+        pipeline = self.create_pipeline(model)
         
         # Context for the agent
         agent_context = {
@@ -32,7 +126,7 @@ class GeminiAgent(AIAgent):
             **context
         }
         
-        session = AgentSession(
+        session = CachedSpeechAgentSession(
             agent=VoiceAgent(context=agent_context),
             pipeline=pipeline,
             context=agent_context
@@ -42,4 +136,4 @@ class GeminiAgent(AIAgent):
     
     def get_agent_name(self) -> str:
         """Return the agent name."""
-        return "gemini" 
\ No newline at end of file
+        return "gemini"
@@ -0,0 +1,58 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from config import Config
+from watermark_pool import WatermarkPool
+
+logger = logging.getLogger(__name__)
+
+class PipelinePool:
+    """
+    Keeps realtime models with an open connection ready, per agent configuration.
+
+    A pooled model has already connected to its provider, so a session checked out from the pool only
+    attaches to the room instead of waiting for the model handshake. Models are created by the factory
+    registered for their configuration key and must release their connection in aclose().
+    """
+
+    def __init__(
+        self,
+        size: int = Config.PIPELINE_POOL_SIZE,
+        ttl: float = Config.PIPELINE_POOL_TTL,
+        refill_concurrency: int = Config.PIPELINE_POOL_REFILL_CONCURRENCY,
+        enabled: bool = Config.PIPELINE_POOL_ENABLED,
+    ):
+        self.size = size
+        self.ttl = ttl
+        self.enabled = enabled and size > 0
+        # Every checkout wakes the refill, keeping each sub-pool at its full size
+        self._pool = WatermarkPool("pipeline-pool", size, size, ttl, refill_concurrency, close=lambda model: model.aclose())
+        self.stats = self._pool.stats
+
+    def register(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> None:
+        """Register the factory that prepares connected models for a configuration key."""
+        self._pool.add(key, factory)
+
+    async def start(self) -> None:
+        """Start one background refill task per registered configuration."""
+        if not self.enabled or self._pool.running:
+            return
+        self._pool.start()
+        logger.info(f"Pipeline pool started for {list(self._pool.items)} (size={self.size}, ttl={self.ttl}s)")
+
+    async def stop(self) -> None:
+        """Stop the refill tasks and close every pooled connection."""
+        await self._pool.stop()
+
+    def checkout(self, key: Optional[Hashable]) -> Optional[Any]:
+        """Take a ready model for a configuration, or None if the sub-pool is empty."""
+        if not self.enabled or key not in self._pool.items:
+            return None
+        return self._pool.take(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current sub-pool sizes."""
+        return {
+            **self._pool.get_stats(),
+            "enabled": self.enabled,
+            "size": self.size,
+        }
@@ -0,0 +1 @@
+"""Benchmarks and local API stubs for the telephony server."""
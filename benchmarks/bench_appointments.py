@@ -0,0 +1,102 @@
+"""
+Cost of finding a caller's appointment: the AppointmentStore index vs querying the source when the call needs it.
+
+Writes --appointments appointments to a CSV file and a SQLite database, then times loading the store and looking
+up --lookups random callers in the index, in SQLite by an indexed query on a new connection (as a tool call
+would), and by scanning the CSV file. Confirmations are then queued and written back in batches.
+
+    python -m benchmarks.bench_appointments --appointments 100000 --lookups 2000
+"""
+import os
+import csv
+import time
+import random
+import sqlite3
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import Callable, List
+
+from benchmarks.stubs import apply_bench_env
+from benchmarks.load_server import percentiles
+
+FIELDS = ("appointment_id", "phone_number", "patient_name", "doctor", "appointment_at", "status")
+
+def phone(index: int) -> str:
+    return f"+1415{index:07d}"
+
+def write_sources(directory: str, count: int) -> List[str]:
+    rows = [
+        (f"appt-{index}", phone(index), f"Patient {index}", "Dr. Patel", f"2030-{index % 12 + 1:02d}-{index % 28 + 1:02d}T{9 + index % 8:02d}:00", "booked")
+        for index in range(count)
+    ]
+    csv_path, db_path = os.path.join(directory, "appointments.csv"), os.path.join(directory, "appointments.db")
+    with open(csv_path, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        writer.writerow(FIELDS)
+        writer.writerows(rows)
+    db = sqlite3.connect(db_path)
+    db.execute(f"CREATE TABLE appointments (appointment_id TEXT PRIMARY KEY, {', '.join(FIELDS[1:])})")
+    db.execute("CREATE INDEX appointments_phone ON appointments (phone_number)")
+    db.executemany(f"INSERT INTO appointments VALUES ({', '.join('?' for _ in FIELDS)})", rows)
+    db.commit()
+    db.close()
+    return [csv_path, db_path]
+
+def time_lookups(label: str, lookup: Callable[[str], object], numbers: List[str]) -> None:
+    durations = []
+    for number in numbers:
+        started = time.perf_counter()
+        assert lookup(number) is not None
+        durations.append(time.perf_counter() - started)
+    stats = {key: value * 1e6 for key, value in percentiles(durations).items()}
+    print(f"{label:<26} p50={stats['p50']:10.1f}us p99={stats['p99']:10.1f}us max={stats['max']:10.1f}us")
+
+def query_sqlite(db_path: str, number: str) -> object:
+    db = sqlite3.connect(db_path)
+    try:
+        return db.execute("SELECT * FROM appointments WHERE phone_number = ?", (number,)).fetchone()
+    finally:
+        db.close()
+
+def scan_csv(csv_path: str, number: str) -> object:
+    with open(csv_path, newline="", encoding="utf-8") as source:
+        return next((row for row in csv.DictReader(source) if row["phone_number"] == number), None)
+
+async def main(args: argparse.Namespace) -> None:
+    apply_bench_env()
+    from services.appointments import AppointmentStore
+    from services.metrics import MetricsRegistry
+    logging.getLogger().setLevel(logging.WARNING)
+    numbers = [phone(random.randrange(args.appointments)) for _ in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path, db_path = write_sources(directory, args.appointments)
+        for path in (csv_path, db_path):
+            store = AppointmentStore(path=path, flush_interval=args.flush_interval, registry=MetricsRegistry())
+            started = time.perf_counter()
+            await store.start()
+            print(f"load {store.source_format:<21} {(time.perf_counter() - started) * 1000:.0f}ms for {args.appointments} appointments")
+            time_lookups(f"index ({store.source_format})", store.lookup, numbers)
+
+            started = time.perf_counter()
+            for number in numbers:
+                store.confirm(store.lookup(number)["appointment_id"])
+            queued = time.perf_counter() - started
+            started = time.perf_counter()
+            await store.stop()
+            stats = store.get_stats()
+            print(
+                f"{'confirm':<26} {queued / len(numbers) * 1e6:.1f}us each on the event loop, {stats['written']} written "
+                f"in {stats['batches']} batches, final flush {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+        time_lookups("sqlite query per call", lambda number: query_sqlite(db_path, number), numbers)
+        time_lookups("csv scan per call", lambda number: scan_csv(csv_path, number), numbers[: max(1, args.lookups // 100)])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--appointments", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
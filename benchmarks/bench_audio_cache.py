@@ -0,0 +1,74 @@
+"""
+Greeting start latency: live synthesis vs the audio cache's memory and memory-mapped disk tiers.
+
+Uses the fake realtime model, whose speech starts --first-audio-latency seconds after a request.
+
+    python -m benchmarks.bench_audio_cache --calls 50
+"""
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import List
+
+from benchmarks.stubs import apply_bench_env
+from benchmarks.bench_room_creation import summarize
+
+GREETING = "Hello, this is Neha, calling from City Medical Center regarding your upcoming appointment. Is this a good time to speak?"
+
+async def time_first_audio(agent, cache) -> float:
+    """Return seconds from say() to the first audio reaching the track."""
+    session = agent.create_session("bench-room", {})
+    session.cache = cache
+    model = session.pipeline.model
+    await model.connect()
+    first_audio = asyncio.get_running_loop().create_future()
+    add_new_bytes = model.audio_track.add_new_bytes
+
+    def tap(audio_data: bytes):
+        if not first_audio.done():
+            first_audio.set_result(time.perf_counter())
+        return add_new_bytes(audio_data)
+
+    model.audio_track.add_new_bytes = tap
+    started = time.perf_counter()
+    await session.say(GREETING)
+    latency = await first_audio - started
+    await asyncio.sleep(0.05)  # let the recording finish and be stored
+    await model.aclose()
+    return latency
+
+async def main(args: argparse.Namespace) -> None:
+    directory = tempfile.mkdtemp(prefix="audio-cache-bench-")
+    apply_bench_env(AUDIO_CACHE_RECORD_IDLE="0.02")
+    from ai.audio_cache import AudioCache
+    from benchmarks.fakes import FakeAgent
+    logging.getLogger().setLevel(logging.WARNING)
+
+    agent = FakeAgent(connect_latency=0, first_audio_latency=args.first_audio_latency)
+    try:
+        disabled = AudioCache(directory, enabled=False)
+        summarize("live synthesis", [await time_first_audio(agent, disabled) for _ in range(args.calls)], 1)
+
+        cache = AudioCache(directory)
+        await time_first_audio(agent, cache)  # miss: records and stores the greeting
+        while cache.stats["stored"] == 0:
+            await asyncio.sleep(0.01)
+        summarize("memory tier", [await time_first_audio(agent, cache) for _ in range(args.calls)], 1)
+
+        disk: List[float] = []
+        for _ in range(args.calls):
+            # A fresh cache per call forces a memory-mapped read of the stored file
+            disk.append(await time_first_audio(agent, AudioCache(directory)))
+        summarize("disk tier (mmap)", disk, 1)
+        print(f"{'':<22} cache stats: {cache.get_stats()}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--first-audio-latency", type=float, default=0.4, help="fake synthesis latency in seconds")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Event-loop cost of recording calls: no recording vs writing each record inline vs CallRecordSink.
+
+Ends --rate calls per second for --duration seconds, each with a transcript of --lines lines, while a probe
+measures how late the event loop wakes a task sleeping 5ms (the lag live audio would see). Inline recording
+appends each record to a gzip file from the event loop, as a session or request handler would. The sink
+queues the record and writes batches from a worker thread.
+
+    python -m benchmarks.bench_call_records --rate 200 --duration 10 --lines 60
+"""
+import os
+import time
+import gzip
+import json
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import Callable, List
+
+from benchmarks.stubs import apply_bench_env
+from benchmarks.load_server import percentiles
+
+PROBE_INTERVAL = 0.005
+
+def session_record(index: int, lines: int) -> dict:
+    transcript = [
+        {"role": "assistant" if line % 2 else "user", "text": f"Line {line} of the conversation about the appointment on 5th June.", "at": time.time()}
+        for line in range(lines)
+    ]
+    return {
+        "room_id": f"room-{index}", "call_sid": f"CA{index:032d}", "call_type": "inbound", "agent_type": "gemini",
+        "provider": "twilio", "node_id": "bench", "status": "ended", "created_at": time.time() - 60, "transcript": transcript,
+    }
+
+async def measure(label: str, end_call: Callable[[int], None], args: argparse.Namespace) -> List[float]:
+    """End calls at the configured rate and return the event-loop lag samples, in seconds."""
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    done = False
+
+    async def probe() -> None:
+        while not done:
+            expected = loop.time() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(loop.time() - expected)
+
+    probe_task = asyncio.create_task(probe())
+    started = loop.time()
+    for index in range(int(args.rate * args.duration)):
+        await asyncio.sleep(max(0.0, started + index / args.rate - loop.time()))
+        end_call(index)
+    done = True
+    await probe_task
+    stats = {key: value * 1000 for key, value in percentiles(lags).items()}
+    print(f"{label:<22} lag p50={stats['p50']:6.2f}ms p99={stats['p99']:6.2f}ms max={stats['max']:6.2f}ms samples={len(lags)}")
+    return lags
+
+async def main(args: argparse.Namespace) -> None:
+    apply_bench_env()
+    from services import CallRecordSink
+    from services.metrics import MetricsRegistry
+    logging.getLogger().setLevel(logging.WARNING)
+    records = [session_record(index, args.lines) for index in range(int(args.rate * args.duration))]
+
+    with tempfile.TemporaryDirectory() as directory:
+        await measure("no recording", lambda index: None, args)
+
+        inline_path = os.path.join(directory, "inline.jsonl.gz")
+
+        def write_inline(index: int) -> None:
+            with gzip.open(inline_path, "ab", compresslevel=6) as inline:
+                inline.write((json.dumps(records[index]) + "\n").encode("utf-8"))
+
+        await measure("inline gzip append", write_inline, args)
+
+        sink = CallRecordSink(
+            enabled=True,
+            directory=os.path.join(directory, "sink"),
+            queue_policy=args.policy,
+            queue_size=args.queue_size,
+            flush_interval=args.flush_interval,
+            registry=MetricsRegistry(),
+        )
+        await sink.start()
+        await measure("CallRecordSink", lambda index: sink.on_session_event("ended", records[index]["room_id"], records[index]), args)
+        await sink.stop()
+        stats = sink.get_stats()
+        size = sum(os.path.getsize(os.path.join(directory, "sink", name)) for name in os.listdir(os.path.join(directory, "sink")))
+        print(
+            f"{'':<22} written={stats['written']} dropped={stats['dropped']} batches={stats['batches']} "
+            f"files={stats['files']} bytes/record={size / max(stats['written'], 1):.0f} "
+            f"(inline: {os.path.getsize(inline_path) / len(records):.0f})"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200, help="calls ending per second")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--lines", type=int, default=60, help="transcript lines per call")
+    parser.add_argument("--policy", choices=("drop", "block"), default="drop")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    asyncio.run(main(parser.parse_args()))
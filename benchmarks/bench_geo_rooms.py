@@ -0,0 +1,71 @@
+"""
+Room-creation tail latency: single requests vs hedged requests, per region.
+
+Runs against a local VideoSDK stub where a share of requests are slow (--tail-probability, --tail-latency).
+Rooms are created on demand (pool misses) for numbers routed to two regions, first without hedging, then with
+a second request sent after the region's measured p95. Hedge-losing rooms go to the pool, so the pool is
+emptied before every call to keep each run on the creation path.
+
+    python -m benchmarks.bench_geo_rooms --calls 400 --concurrency 10 --tail-probability 0.02
+"""
+import time
+import asyncio
+import logging
+import argparse
+
+from benchmarks.stubs import apply_bench_env, create_videosdk_stub_app, run_stub_server
+from benchmarks.bench_room_creation import run_load, summarize
+
+async def main(args: argparse.Namespace) -> None:
+    apply_bench_env(VIDEOSDK_API_BASE_URL=f"http://127.0.0.1:{args.port}/v2")
+    from services import GeoRouter, RoomPool, VideoSDKService
+    from services.metrics import MetricsRegistry
+    logging.getLogger().setLevel(logging.WARNING)
+
+    stub = create_videosdk_stub_app(
+        region_latency={"us002": args.latency, "eu001": args.latency * 2},
+        tail_probability=args.tail_probability,
+        tail_latency=args.tail_latency,
+    )
+    numbers = ["+14155550100", "+442071838750"]
+    async with run_stub_server(stub, port=args.port):
+        for label, hedge_enabled in (("single request", False), ("hedged at p95", True)):
+            geo_router = GeoRouter(
+                "us002",
+                ["us002", "eu001"],
+                prefix_routes={"+44": ["eu001", "us002"]},
+                hedge_enabled=hedge_enabled,
+                hedge_min_samples=50,
+                registry=MetricsRegistry(),
+            )
+            service = VideoSDKService()
+            service.add_latency_listener(geo_router.record)
+            pool = RoomPool(service, geo_fences=["us002", "eu001"], enabled=False, geo_router=geo_router)
+            calls = iter(range(10**9))
+
+            async def create_room() -> str:
+                for rooms in pool._pool.items.values():
+                    rooms.clear()
+                return await pool.acquire(number=numbers[next(calls) % len(numbers)])
+
+            await service.start()
+            try:
+                await run_load(create_room, 100, args.concurrency)  # warm-up, measures each region's p95
+                started = time.perf_counter()
+                latencies = await run_load(create_room, args.calls, args.concurrency)
+                summarize(label, latencies, time.perf_counter() - started)
+                stats = pool.get_stats()
+                print(f"{'':<22} hedged={stats['hedged']} hedge wins={stats['hedge_wins']} spare rooms pooled={stats['hedge_spares']}")
+            finally:
+                await asyncio.sleep(args.tail_latency)  # let requests that lost a hedge finish
+                await service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub latency of us002 in seconds (eu001 is twice that)")
+    parser.add_argument("--tail-probability", type=float, default=0.02, help="share of slow stub requests")
+    parser.add_argument("--tail-latency", type=float, default=0.5, help="latency of slow stub requests in seconds")
+    parser.add_argument("--port", type=int, default=8900)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,230 @@
+"""
+End-to-end load test of the call server against local VideoSDK and Twilio stubs.
+
+Starts the stubs, runs `benchmarks.load_server` (the real app with a fake realtime agent whose calls last
+--call-seconds) in its own process, then replays Twilio-style form-encoded /inbound-call webhooks and
+/outbound-call JSON requests at fixed open-loop rates. Reports request throughput and latency
+percentiles, the server's event-loop lag and memory per session, and writes them as JSON.
+
+    python -m benchmarks.bench_load --inbound-rate 20 --outbound-rate 5 --duration 30 --output load.json
+
+With --baseline, exits non-zero when p99 latency or throughput regress by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import itertools
+from typing import Any, Dict, List, Optional
+import httpx
+
+from benchmarks.stubs import BENCH_ENV, create_twilio_stub_app, create_videosdk_stub_app, run_stub_server
+from benchmarks.bench_room_creation import summarize
+from benchmarks.load_server import percentiles
+
+logger = logging.getLogger(__name__)
+
+class RequestLog:
+    """Latencies and status codes of the requests of one kind."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.latencies: List[float] = []
+        self.status_codes: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        if status is None or status >= 400:
+            self.errors += 1
+        else:
+            self.latencies.append(latency)
+        key = str(status) if status is not None else "connection_error"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+    def get_results(self, wall: float) -> Dict[str, Any]:
+        return {
+            "sent": sum(self.status_codes.values()),
+            "ok": len(self.latencies),
+            "errors": self.errors,
+            "status_codes": self.status_codes,
+            "throughput_per_second": len(self.latencies) / wall if wall else 0.0,
+            "latency_ms": {key: value * 1000 for key, value in percentiles(self.latencies).items()},
+        }
+
+async def generate(client: httpx.AsyncClient, kind: str, rate: float, duration: float, poisson: bool, log: RequestLog) -> None:
+    """Send requests of one kind at `rate` per second for `duration` seconds without waiting for replies."""
+    loop = asyncio.get_running_loop()
+    numbers = itertools.count(1)
+    tasks = []
+
+    async def one() -> None:
+        number = next(numbers)
+        caller = f"+1555{number:07d}"
+        started = time.perf_counter()
+        try:
+            if kind == "inbound":
+                response = await client.post("/inbound-call", data={"CallSid": f"CAload{number:026d}", "From": caller, "To": BENCH_ENV["TWILIO_NUMBER"]})
+            else:
+                response = await client.post("/outbound-call", json={"to_number": caller})
+            log.record(time.perf_counter() - started, response.status_code)
+        except httpx.HTTPError as e:
+            logger.debug(f"{kind} request failed: {e}")
+            log.record(time.perf_counter() - started, None)
+
+    next_at = loop.time()
+    deadline = next_at + duration
+    while next_at < deadline:
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        tasks.append(asyncio.create_task(one()))
+        next_at += random.expovariate(rate) if poisson else 1 / rate
+    await asyncio.gather(*tasks)
+
+async def watch(client: httpx.AsyncClient, timeline: List[Dict[str, Any]], interval: float = 1.0) -> None:
+    """Record the server's session count and memory once per `interval`."""
+    started = time.perf_counter()
+    while True:
+        try:
+            stats = (await client.get("/bench/stats")).json()
+            timeline.append({
+                "t": round(time.perf_counter() - started, 3),
+                "active_sessions": stats["active_sessions"],
+                "rss_bytes": stats["rss_bytes"],
+                "event_loop_lag_p99_ms": stats["event_loop_lag_ms"]["p99"],
+            })
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+async def wait_until_ready(client: httpx.AsyncClient, server: asyncio.subprocess.Process, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.returncode is not None:
+            raise RuntimeError(f"Load server exited with code {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Load server not ready after {timeout} seconds")
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare p99 latency and throughput of each request kind with a previous run."""
+    regressions = []
+    for kind, current in results["requests"].items():
+        previous = baseline.get("requests", {}).get(kind)
+        if not previous:
+            continue
+        if current["latency_ms"]["p99"] > previous["latency_ms"]["p99"] * (1 + tolerance):
+            regressions.append(f"{kind} p99 {current['latency_ms']['p99']:.2f}ms vs {previous['latency_ms']['p99']:.2f}ms")
+        if current["throughput_per_second"] < previous["throughput_per_second"] * (1 - tolerance):
+            regressions.append(f"{kind} throughput {current['throughput_per_second']:.1f}/s vs {previous['throughput_per_second']:.1f}/s")
+    return regressions
+
+async def main(args: argparse.Namespace) -> int:
+    videosdk_port, twilio_port = args.stub_port, args.stub_port + 1
+    env = {
+        **BENCH_ENV,
+        **os.environ,
+        "VIDEOSDK_API_BASE_URL": f"http://127.0.0.1:{videosdk_port}/v2",
+        "TWILIO_API_BASE_URL": f"http://127.0.0.1:{twilio_port}",
+    }
+    server_args = [
+        "--port", str(args.port),
+        "--call-seconds", str(args.call_seconds),
+        "--connect-latency", str(args.connect_latency),
+        "--first-audio-latency", str(args.first_audio_latency),
+        "--join-latency", str(args.join_latency),
+        "--log-level", args.log_level,
+    ]
+
+    async with run_stub_server(create_videosdk_stub_app(args.videosdk_latency), port=videosdk_port), \
+            run_stub_server(create_twilio_stub_app(args.twilio_latency), port=twilio_port):
+        server = await asyncio.create_subprocess_exec(sys.executable, "-m", "benchmarks.load_server", *server_args, env=env)
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=args.timeout) as client:
+            try:
+                await wait_until_ready(client, server)
+                await asyncio.sleep(args.warmup)  # let the room and model pools fill
+                await client.post("/bench/reset")
+
+                logs = {kind: RequestLog(kind) for kind, rate in (("inbound", args.inbound_rate), ("outbound", args.outbound_rate)) if rate > 0}
+                rates = {"inbound": args.inbound_rate, "outbound": args.outbound_rate}
+                timeline: List[Dict[str, Any]] = []
+                watcher = asyncio.create_task(watch(client, timeline))
+                started = time.perf_counter()
+                await asyncio.gather(*(generate(client, kind, rates[kind], args.duration, args.poisson, log) for kind, log in logs.items()))
+                wall = time.perf_counter() - started
+                server_stats = (await client.get("/bench/stats")).json()
+
+                if args.drain:
+                    # Every call should end on its own once it has lasted --call-seconds
+                    drain_deadline = time.monotonic() + args.call_seconds + args.join_latency + 30
+                    while server_stats["active_sessions"] and time.monotonic() < drain_deadline:
+                        await asyncio.sleep(1)
+                        server_stats = {**server_stats, "active_sessions": (await client.get("/bench/stats")).json()["active_sessions"]}
+                watcher.cancel()
+            finally:
+                if server.returncode is None:
+                    server.terminate()
+                await server.wait()
+
+    results = {
+        "config": vars(args),
+        "wall_seconds": wall,
+        "requests": {kind: log.get_results(wall) for kind, log in logs.items()},
+        "server": server_stats,
+        "timeline": timeline,
+    }
+    for kind, log in logs.items():
+        summarize(f"{kind} ({rates[kind]:g}/s)", log.latencies or [0.0], wall)
+        if log.errors:
+            print(f"{'':<22} errors={log.errors} status codes: {log.status_codes}")
+    lag = server_stats["event_loop_lag_ms"]
+    print(f"{'event-loop lag':<22} samples={server_stats['lag_samples']:<6} mean={lag['mean']:7.2f}ms p50={lag['p50']:7.2f}ms p99={lag['p99']:7.2f}ms max={lag['max']:7.2f}ms")
+    print(
+        f"{'memory':<22} baseline={server_stats['baseline_rss_bytes'] / 2**20:.1f}MiB peak={server_stats['peak_rss_bytes'] / 2**20:.1f}MiB "
+        f"peak sessions={server_stats['peak_sessions']} per session={server_stats['memory_per_session_bytes'] / 2**10:.1f}KiB"
+    )
+    if args.drain:
+        print(f"{'':<22} sessions still active after drain: {server_stats['active_sessions']}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inbound-rate", type=float, default=20, help="inbound webhooks per second (0 disables)")
+    parser.add_argument("--outbound-rate", type=float, default=5, help="outbound call requests per second (0 disables)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times instead of a fixed interval")
+    parser.add_argument("--call-seconds", type=float, default=10, help="length of each fake call")
+    parser.add_argument("--connect-latency", type=float, default=0.3, help="fake model handshake in seconds")
+    parser.add_argument("--first-audio-latency", type=float, default=0.4, help="fake synthesis latency in seconds")
+    parser.add_argument("--join-latency", type=float, default=0.2, help="fake room join in seconds")
+    parser.add_argument("--videosdk-latency", type=float, default=0.02, help="VideoSDK stub latency in seconds")
+    parser.add_argument("--twilio-latency", type=float, default=0.05, help="Twilio stub latency in seconds")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds to let the server's pools fill before the load")
+    parser.add_argument("--drain", action="store_true", help="wait for all calls to end and report leftover sessions")
+    parser.add_argument("--timeout", type=float, default=30, help="client timeout per request in seconds")
+    parser.add_argument("--port", type=int, default=8000, help="port of the server under test")
+    parser.add_argument("--stub-port", type=int, default=8900, help="VideoSDK stub port; the Twilio stub uses the next one")
+    parser.add_argument("--log-level", default="warning", help="log level of the server under test")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression against --baseline")
+    sys.exit(asyncio.run(main(parser.parse_args())))
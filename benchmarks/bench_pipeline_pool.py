@@ -0,0 +1,65 @@
+"""
+Time from session creation to a connected realtime model, cold vs checked out of the pipeline pool.
+
+Uses a fake realtime model whose handshake takes --connect-latency seconds.
+
+    python -m benchmarks.bench_pipeline_pool --calls 200 --interval 0.1
+"""
+import time
+import asyncio
+import logging
+import argparse
+from typing import List, Optional
+
+from benchmarks.stubs import apply_bench_env
+from benchmarks.bench_room_creation import summarize
+
+async def run_calls(agent, pool, calls: int, interval: float) -> List[float]:
+    """Start `calls` sessions, one every `interval` seconds, and time each model connect."""
+    latencies: List[float] = []
+
+    async def one() -> None:
+        started = time.perf_counter()
+        model = pool.checkout(agent.pipeline_key()) if pool is not None else None
+        session = agent.create_session("bench-room", {}, model=model)
+        await session.pipeline.model.connect()
+        latencies.append(time.perf_counter() - started)
+        await session.pipeline.model.aclose()
+
+    tasks = []
+    for _ in range(calls):
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+    return latencies
+
+async def main(args: argparse.Namespace) -> None:
+    apply_bench_env()
+    from ai import PipelinePool
+    from benchmarks.fakes import FakeAgent
+    logging.getLogger().setLevel(logging.WARNING)
+
+    agent = FakeAgent(args.connect_latency)
+    for label, pool_size in (("cold connect", 0), (f"pool (size {args.pool_size})", args.pool_size)):
+        pool: Optional[PipelinePool] = None
+        if pool_size:
+            pool = PipelinePool(size=pool_size, ttl=args.ttl, refill_concurrency=args.refill_concurrency, enabled=True)
+            pool.register(agent.pipeline_key(), agent.prepare_model)
+            await pool.start()
+            await asyncio.sleep(args.connect_latency * pool_size + 0.1)  # let the pool fill
+        started = time.perf_counter()
+        latencies = await run_calls(agent, pool, args.calls, args.interval)
+        summarize(label, latencies, time.perf_counter() - started)
+        if pool is not None:
+            print(f"{'':<22} pool stats: {pool.get_stats()}")
+            await pool.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between session starts")
+    parser.add_argument("--connect-latency", type=float, default=0.3, help="fake model handshake in seconds")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--refill-concurrency", type=int, default=4)
+    parser.add_argument("--ttl", type=float, default=120)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""
+Room-creation latency: per-call AsyncClient vs the shared pooled client.
+
+Runs against a local VideoSDK stub so only client-side connection costs differ.
+
+    python -m benchmarks.bench_room_creation --calls 500 --concurrency 20
+"""
+import time
+import asyncio
+import logging
+import argparse
+import statistics
+from typing import List
+import httpx
+
+from benchmarks.stubs import apply_bench_env, create_videosdk_stub_app, run_stub_server
+
+def summarize(label: str, latencies: List[float], wall: float) -> None:
+    """Print per-call latency percentiles in milliseconds."""
+    ordered = sorted(latencies)
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+    print(
+        f"{label:<22} calls={len(ordered):<6} "
+        f"mean={statistics.fmean(ordered) * 1000:7.2f}ms "
+        f"p50={pct(0.50):7.2f}ms p95={pct(0.95):7.2f}ms p99={pct(0.99):7.2f}ms "
+        f"throughput={len(ordered) / wall:8.1f}/s"
+    )
+
+async def run_load(create_room, calls: int, concurrency: int) -> List[float]:
+    """Issue `calls` room creations with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await create_room()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies
+
+async def main(args: argparse.Namespace) -> None:
+    base_url = f"http://127.0.0.1:{args.port}/v2"
+    apply_bench_env(VIDEOSDK_API_BASE_URL=base_url)
+    from services.videosdk_service import VideoSDKService
+    logging.getLogger().setLevel(logging.WARNING)
+
+    async def per_call_client() -> str:
+        # Behaviour before the shared client: a fresh connection per room
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{base_url}/rooms", headers={"Authorization": "bench-token"})
+            response.raise_for_status()
+            return response.json()["roomId"]
+
+    async with run_stub_server(create_videosdk_stub_app(args.latency), port=args.port):
+        service = VideoSDKService()
+        await service.start()
+        try:
+            for label, create_room in (("per-call AsyncClient", per_call_client), ("shared pooled client", service.create_room)):
+                await run_load(create_room, min(args.calls, 20), args.concurrency)  # warm-up
+                started = time.perf_counter()
+                latencies = await run_load(create_room, args.calls, args.concurrency)
+                summarize(label, latencies, time.perf_counter() - started)
+        finally:
+            await service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub server latency in seconds")
+    parser.add_argument("--port", type=int, default=8900)
+    asyncio.run(main(parser.parse_args()))
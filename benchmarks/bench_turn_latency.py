@@ -0,0 +1,118 @@
+"""
+Per-turn latency instrumentation: cost on the audio path and accuracy against a scripted conversation.
+
+First times the caller-audio and model-audio paths of a session with and without the turn taps. Then plays a
+conversation in real time: the caller speaks for --speech seconds, the fake model starts replying a random
+0.2-1.5s after the caller stops, and the room pulls the agent's audio every 20ms. The latencies recorded by
+TurnLatency are compared with the scripted reply delays.
+
+    python -m benchmarks.bench_turn_latency --frames 200000 --turns 10
+"""
+import time
+import math
+import array
+import random
+import asyncio
+import logging
+import argparse
+from types import SimpleNamespace
+from typing import List
+
+from benchmarks.stubs import apply_bench_env
+
+# 20ms of 48kHz 16-bit mono, as the room hands caller audio to the pipeline
+FRAME_SAMPLES = 960
+FRAME_SECONDS = 0.02
+
+def caller_frame(amplitude: int) -> bytes:
+    return array.array("h", (int(amplitude * math.sin(2 * math.pi * 220 * index / 48000)) for index in range(FRAME_SAMPLES))).tobytes()
+
+def make_session():
+    from videosdk.agents import CustomAudioStreamTrack, RealTimePipeline
+    from benchmarks.fakes import FakeRealtimeModel
+    pipeline = RealTimePipeline(model=FakeRealtimeModel())
+    pipeline.model.audio_track = CustomAudioStreamTrack(pipeline.loop)
+    return SimpleNamespace(pipeline=pipeline)
+
+async def time_audio_path(frames: int, tapped: bool) -> List[float]:
+    """Return nanoseconds per caller frame (speech and silence) and per model chunk."""
+    from services import telemetry
+    session = make_session()
+    if tapped:
+        telemetry._tap_turns(session, "bench-room")
+    pipeline, track = session.pipeline, session.pipeline.model.audio_track
+    results = []
+    for frame in (caller_frame(8000), bytes(FRAME_SAMPLES * 2)):
+        started = time.perf_counter_ns()
+        for _ in range(frames):
+            await pipeline.on_audio_delta(frame)
+        results.append((time.perf_counter_ns() - started) / frames)
+    chunk = bytes(track.chunk_size)
+    started = time.perf_counter_ns()
+    for index in range(frames // 10):
+        await track.add_new_bytes(chunk)
+        if index % 50 == 0:
+            track.frame_buffer.clear()
+    results.append((time.perf_counter_ns() - started) / (frames // 10))
+    return results
+
+async def play_conversation(turns: int, speech: float) -> None:
+    from services import telemetry, TurnLatency
+    from services.metrics import MetricsRegistry
+    tracker = TurnLatency(slow_threshold=1.0, sample_path=None, registry=MetricsRegistry())
+    telemetry.add_sink(tracker.mark)
+    tracker.on_session_event("created", "bench-room", {"call_type": "inbound", "provider": "bench", "agent_type": "fake"})
+    session = make_session()
+    telemetry._tap_turns(session, "bench-room")
+    pipeline, track = session.pipeline, session.pipeline.model.audio_track
+    speech_frame, silence_frame = caller_frame(8000), bytes(FRAME_SAMPLES * 2)
+    reply = bytes(track.chunk_size * 25)
+
+    async def room_output() -> None:
+        while True:
+            await track.recv()
+
+    output = asyncio.create_task(room_output())
+    loop = asyncio.get_running_loop()
+    delays = []
+    for _ in range(turns):
+        delay = random.uniform(0.2, 1.5)
+        delays.append(delay)
+        for _ in range(int(speech / FRAME_SECONDS)):
+            await pipeline.on_audio_delta(speech_frame)
+            await asyncio.sleep(FRAME_SECONDS)
+        # The reply starts `delay` after the last loud frame, and the caller stays quiet until it has played
+        reply_at = loop.time() - FRAME_SECONDS + delay
+        loop.call_at(reply_at, lambda: loop.create_task(track.add_new_bytes(reply)))
+        while loop.time() < reply_at + 1.0:
+            await pipeline.on_audio_delta(silence_frame)
+            await asyncio.sleep(FRAME_SECONDS)
+    output.cancel()
+    await asyncio.gather(output, return_exceptions=True)
+    telemetry.remove_sink(tracker.mark)
+
+    measured = tracker._calls["bench-room"].latencies
+    print(f"{'turn':>4} {'scripted ms':>12} {'played ms':>10} {'error ms':>9}")
+    # Playback pacing and the 20ms caller frames add one or two frames to the scripted delay
+    for index, (delay, played) in enumerate(zip(delays, measured), 1):
+        print(f"{index:>4} {delay * 1000:>12.0f} {played * 1000:>10.0f} {(played - delay) * 1000:>+9.0f}")
+    print(f"recorded {len(measured)} of {turns} turns, {tracker.stats['unanswered']} unanswered, {tracker.stats['slow']} slow (>1s)")
+
+async def main(args: argparse.Namespace) -> None:
+    apply_bench_env()
+    # Configured before `config` is imported, so its INFO-level setup does nothing
+    logging.basicConfig(level=logging.WARNING)
+    baseline = await time_audio_path(args.frames, tapped=False)
+    tapped = await time_audio_path(args.frames, tapped=True)
+    print(f"{'path':<22} {'untapped ns':>12} {'tapped ns':>10} {'overhead ns':>12}")
+    for label, plain, instrumented in zip(("caller frame, speech", "caller frame, silence", "model audio chunk"), baseline, tapped):
+        print(f"{label:<22} {plain:>12.0f} {instrumented:>10.0f} {instrumented - plain:>12.0f}")
+    print()
+    await play_conversation(args.turns, args.speech)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--speech", type=float, default=1.0, help="seconds the caller speaks each turn")
+    asyncio.run(main(parser.parse_args()))
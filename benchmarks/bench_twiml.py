@@ -0,0 +1,67 @@
+"""
+TwiML rendering cost: building a twilio VoiceResponse tree per call vs the precompiled templates.
+
+Checks that both paths produce identical output on random input first, then times each.
+
+    python -m benchmarks.bench_twiml --calls 200000
+"""
+import time
+import random
+import logging
+import argparse
+
+from benchmarks.stubs import apply_bench_env
+
+ALPHABET = "abcXYZ019:@._-&<>\"'\r\n\té "
+
+def random_value(rng: random.Random) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 24)))
+
+def check_equivalence(provider, modules, samples: int) -> None:
+    """Compare the template output with the twilio builders on random values, including the empty shapes."""
+    rng = random.Random(7)
+    for _ in range(samples):
+        sip_endpoint = f"sip:{random_value(rng)}@sip.videosdk.live"
+        reason = rng.choice(["busy", "rejected", random_value(rng)])
+        message = random_value(rng)
+        expected = (
+            str(modules.build_dial_response(sip_endpoint, provider._dial_template.fixed["username"], provider._dial_template.fixed["password"])),
+            str(modules.build_reject_response(reason)),
+            str(modules.build_say_response(message)),
+        )
+        actual = (
+            provider.generate_twiml(sip_endpoint),
+            provider.generate_reject_twiml(reason),
+            provider.generate_say_twiml(message),
+        )
+        if expected != actual:
+            raise SystemExit(f"Output mismatch:\n  twilio:   {expected}\n  template: {actual}")
+    print(f"template output matches the twilio library on {samples} random inputs")
+
+def time_calls(label: str, render, calls: int) -> None:
+    endpoints = [f"sip:room-{index:08d}@sip.videosdk.live" for index in range(1024)]
+    started = time.perf_counter()
+    for index in range(calls):
+        render(endpoints[index & 1023])
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {elapsed / calls * 1e6:7.2f}us/call  {calls / elapsed:12.0f} calls/s")
+
+def main(args: argparse.Namespace) -> None:
+    apply_bench_env()
+    from providers import twilio_provider
+    from providers.twilio_provider import TwilioProvider
+    logging.getLogger().setLevel(logging.WARNING)
+
+    provider = TwilioProvider()
+    check_equivalence(provider, twilio_provider, args.samples)
+
+    username = provider._dial_template.fixed["username"]
+    password = provider._dial_template.fixed["password"]
+    time_calls("VoiceResponse per call", lambda endpoint: str(twilio_provider.build_dial_response(endpoint, username, password)), args.calls)
+    time_calls("precompiled template", provider.generate_twiml, args.calls)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--samples", type=int, default=5000, help="random inputs for the equivalence check")
+    main(parser.parse_args())
@@ -0,0 +1,201 @@
+"""
+Local fakes of the realtime model, VideoSDK room and AI agent, for exercising the server without provider credentials.
+
+Import after `benchmarks.stubs.apply_bench_env()`, since this pulls in `config`.
+"""
+import math
+import array
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from videosdk.agents import AgentSession, CustomAudioStreamTrack, RealTimePipeline
+from videosdk.agents.realtime_base_model import RealtimeBaseModel
+
+from ai.base_agent import AIAgent
+from ai.cached_speech import CachedSpeechAgentSession
+from voice_agent import VoiceAgent
+
+# Seconds of fake speech per character of text
+SPEECH_SECONDS_PER_CHAR = 0.06
+# Bytes per streamed chunk: 40ms of 24kHz 16-bit mono
+STREAM_CHUNK_BYTES = 1920
+
+@lru_cache(maxsize=64)
+def fake_speech(text: str, sample_rate: int = 24000) -> bytes:
+    """Deterministic PCM16 mono tone standing in for synthesized speech of `text`."""
+    samples = int(len(text) * SPEECH_SECONDS_PER_CHAR * sample_rate)
+    pitch = 200 + sum(text.encode("utf-8")) % 200
+    return array.array("h", (int(8000 * math.sin(2 * math.pi * pitch * index / sample_rate)) for index in range(samples))).tobytes()
+
+class FakeRealtimeModel(RealtimeBaseModel):
+    """Realtime model whose connection handshake is a fixed sleep."""
+
+    def __init__(self, connect_latency: float = 0.5, first_audio_latency: float = 0.4):
+        super().__init__()
+        self.model = "fake-realtime"
+        self.connect_latency = connect_latency
+        self.first_audio_latency = first_audio_latency
+        self.loop = None
+        self.audio_track = None
+        self.connected = False
+        self.prepared = False
+        self.closed = False
+        self.spoken = []
+        self.context = []
+
+    def set_agent(self, agent: Any) -> None:
+        self.instructions = agent.instructions
+
+    async def prepare(self) -> None:
+        """Open the connection ahead of the call."""
+        await asyncio.sleep(self.connect_latency)
+        self.prepared = True
+
+    async def connect(self) -> None:
+        if self.audio_track is None and self.loop is not None:
+            self.audio_track = CustomAudioStreamTrack(self.loop)
+        # Adopt the prepared connection like PrewarmedGeminiRealtime does
+        if not self.prepared:
+            await asyncio.sleep(self.connect_latency)
+        self.prepared = False
+        self.connected = True
+
+    async def handle_audio_input(self, audio_data: bytes) -> None:
+        pass
+
+    async def send_message(self, message: str) -> None:
+        """Stream fake speech for the message to the audio track after the synthesis latency."""
+        self.spoken.append(message)
+        self.context.append(message)
+        await asyncio.sleep(self.first_audio_latency)
+        if self.audio_track is None:
+            return
+        audio = fake_speech(message, getattr(self.audio_track, "sample_rate", 24000))
+        for offset in range(0, len(audio), STREAM_CHUNK_BYTES):
+            await self.audio_track.add_new_bytes(audio[offset:offset + STREAM_CHUNK_BYTES])
+            await asyncio.sleep(0.005)
+
+    async def add_assistant_message(self, message: str) -> None:
+        self.context.append(message)
+
+    async def interrupt(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        self.connected = False
+        self.prepared = False
+        self.closed = True
+
+class FakeMeeting:
+    """Meeting that reports the caller leaving once the call has lasted its length."""
+
+    def __init__(self):
+        self.listeners = []
+        self.ended = False
+
+    def add_event_listener(self, listener: Any) -> None:
+        self.listeners.append(listener)
+        if self.ended:
+            listener.on_participant_left(None)
+
+    def remove_event_listener(self, listener: Any) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def end(self) -> None:
+        self.ended = True
+        for listener in list(self.listeners):
+            listener.on_participant_left(None)
+
+class FakeRoom:
+    """
+    Stand-in for the VideoSDK room: after a join delay it plays the media loop of a call, pulling the agent's
+    audio in real time and feeding silence from the caller every 20ms, until the call has lasted `call_seconds`.
+    """
+
+    def __init__(self, pipeline: RealTimePipeline, call_seconds: float, join_latency: float):
+        self.pipeline = pipeline
+        self.call_seconds = call_seconds
+        self.join_latency = join_latency
+        self.meeting = FakeMeeting()
+        self.audio_track = CustomAudioStreamTrack(pipeline.loop)
+        self.participants_data: Dict[str, Dict[str, str]] = {}
+        self._media_task: Optional[asyncio.Task] = None
+
+    async def join(self) -> None:
+        await asyncio.sleep(self.join_latency)
+        # The caller is in the room as soon as the agent is
+        self.participants_data["caller"] = {"name": "caller"}
+        self._media_task = asyncio.create_task(self._run_media())
+
+    async def _run_media(self) -> None:
+        silence = bytes(self.audio_track.chunk_size)
+        deadline = self.pipeline.loop.time() + self.call_seconds
+        while self.pipeline.loop.time() < deadline:
+            await self.audio_track.recv()
+            await self.pipeline.on_audio_delta(silence)
+        self.meeting.end()
+
+    async def leave(self) -> None:
+        if self._media_task is not None:
+            self._media_task.cancel()
+            await asyncio.gather(self._media_task, return_exceptions=True)
+            self._media_task = None
+
+    async def cleanup(self) -> None:
+        await self.audio_track.cleanup()
+
+class FakePipeline(RealTimePipeline):
+    """RealTimePipeline that joins a FakeRoom instead of a VideoSDK meeting."""
+
+    def __init__(self, model: FakeRealtimeModel, call_seconds: float = 30.0, join_latency: float = 0.2):
+        super().__init__(model=model)
+        self.call_seconds = call_seconds
+        self.join_latency = join_latency
+
+    async def start(self, **kwargs: Any) -> None:
+        self.room = FakeRoom(self, self.call_seconds, self.join_latency)
+        self.model.loop = self.loop
+        self.model.audio_track = self.room.audio_track
+        await self.model.connect()
+        await self.room.join()
+
+class FakeAgent(AIAgent):
+    """AI agent backed by FakeRealtimeModel and FakeRoom, with pooling support."""
+
+    def __init__(
+        self,
+        connect_latency: float = 0.5,
+        first_audio_latency: float = 0.4,
+        call_seconds: float = 30.0,
+        join_latency: float = 0.2,
+    ):
+        self.connect_latency = connect_latency
+        self.first_audio_latency = first_audio_latency
+        self.call_seconds = call_seconds
+        self.join_latency = join_latency
+
+    def create_model(self) -> FakeRealtimeModel:
+        return FakeRealtimeModel(self.connect_latency, self.first_audio_latency)
+
+    def create_pipeline(self, model: Optional[FakeRealtimeModel] = None) -> RealTimePipeline:
+        return FakePipeline(model or self.create_model(), self.call_seconds, self.join_latency)
+
+    def pipeline_key(self) -> Tuple[Any, ...]:
+        return ("fake", self.connect_latency, self.first_audio_latency)
+
+    async def prepare_model(self) -> FakeRealtimeModel:
+        model = self.create_model()
+        await model.prepare()
+        return model
+
+    def create_session(self, room_id: str, context: Dict[str, Any], model: Optional[Any] = None) -> AgentSession:
+        agent_context = {"name": "Fake Agent", "meetingId": room_id, **context}
+        return CachedSpeechAgentSession(
+            agent=VoiceAgent(context=agent_context),
+            pipeline=self.create_pipeline(model),
+            context=agent_context,
+        )
+
+    def get_agent_name(self) -> str:
+        return "fake"
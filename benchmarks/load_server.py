@@ -0,0 +1,136 @@
+"""
+The call server running the fake agent, with probes for event-loop lag and memory.
+
+Started in its own process by `benchmarks.bench_load`, which points it at the local API stubs through the
+environment. Adds two endpoints to the app:
+
+    GET  /bench/stats   event-loop lag percentiles, resident memory and session counts since the last reset
+    POST /bench/reset   start a new measurement window
+"""
+import os
+import time
+import asyncio
+import logging
+import argparse
+import resource
+from typing import Any, Dict, List
+import uvicorn
+
+from benchmarks.stubs import apply_bench_env
+
+def rss_bytes() -> int:
+    """Current resident set size of this process, or its peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Return mean, p50, p95, p99 and max of `values`."""
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "max": ordered[-1],
+    }
+
+class LoadProbe:
+    """Measures how late the event loop wakes a sleeping task, and memory growth against live sessions."""
+
+    def __init__(self, count_sessions, interval: float = 0.05, memory_every: int = 10):
+        self.count_sessions = count_sessions
+        self.interval = interval
+        self.memory_every = memory_every
+        self.reset()
+
+    def reset(self) -> None:
+        self.lags: List[float] = []
+        self.started_at = time.monotonic()
+        self.baseline_rss = rss_bytes()
+        self.peak_rss = self.baseline_rss
+        self.peak_sessions = 0
+        self.peak_growth_per_session = 0.0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        ticks = 0
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(loop.time() - expected)
+            ticks += 1
+            if ticks % self.memory_every == 0:
+                self._sample_memory()
+
+    def _sample_memory(self) -> None:
+        rss = rss_bytes()
+        sessions = self.count_sessions()
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_sessions = max(self.peak_sessions, sessions)
+        if sessions:
+            self.peak_growth_per_session = max(self.peak_growth_per_session, (rss - self.baseline_rss) / sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": time.monotonic() - self.started_at,
+            "event_loop_lag_ms": {key: value * 1000 for key, value in percentiles(self.lags).items()},
+            "lag_samples": len(self.lags),
+            "active_sessions": self.count_sessions(),
+            "peak_sessions": self.peak_sessions,
+            "rss_bytes": rss_bytes(),
+            "baseline_rss_bytes": self.baseline_rss,
+            "peak_rss_bytes": self.peak_rss,
+            # Memory above the idle baseline divided by the sessions holding it, at the worst sample
+            "memory_per_session_bytes": self.peak_growth_per_session,
+        }
+
+async def main(args: argparse.Namespace) -> None:
+    # The fake agent is registered in this process only, so sessions must run in it
+    apply_bench_env()
+    os.environ.update(DEFAULT_AI_AGENT="fake", PIPELINE_POOL_AGENTS="fake", SESSION_BACKEND="inprocess")
+    from ai import register_ai_agent
+    from benchmarks.fakes import FakeAgent
+    register_ai_agent("fake", lambda: FakeAgent(
+        connect_latency=args.connect_latency,
+        first_audio_latency=args.first_audio_latency,
+        call_seconds=args.call_seconds,
+        join_latency=args.join_latency,
+    ))
+
+    import server
+    logging.getLogger().setLevel(args.log_level.upper())
+    probe = LoadProbe(lambda: len(server.session_manager.sessions))
+
+    @server.app.get("/bench/stats")
+    async def get_bench_stats():
+        return probe.get_stats()
+
+    @server.app.post("/bench/reset")
+    async def reset_bench_stats():
+        probe.reset()
+        return probe.get_stats()
+
+    probe_task = asyncio.create_task(probe.run())
+    config = uvicorn.Config(server.app, host=args.host, port=args.port, log_level=args.log_level.lower(), access_log=False)
+    try:
+        await uvicorn.Server(config).serve()
+    finally:
+        probe_task.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--call-seconds", type=float, default=30, help="length of each fake call")
+    parser.add_argument("--connect-latency", type=float, default=0.3, help="fake model handshake in seconds")
+    parser.add_argument("--first-audio-latency", type=float, default=0.4, help="fake synthesis latency in seconds")
+    parser.add_argument("--join-latency", type=float, default=0.2, help="fake room join in seconds")
+    parser.add_argument("--log-level", default="warning")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+import os
+import random
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, AsyncIterator, Optional
+import uvicorn
+from fastapi import Body, FastAPI, Form
+
+# Placeholder credentials so `config` validates without a real .env
+BENCH_ENV: Dict[str, str] = {
+    "VIDEOSDK_AUTH_TOKEN": "bench-token",
+    "VIDEOSDK_SIP_USERNAME": "bench-sip-user",
+    "VIDEOSDK_SIP_PASSWORD": "bench-sip-password",
+    "GOOGLE_API_KEY": "bench-google-key",
+    "TWILIO_SID": "ACbench",
+    "TWILIO_AUTH_TOKEN": "bench-twilio-token",
+    "TWILIO_NUMBER": "+15550000000",
+}
+
+def apply_bench_env(**overrides: str) -> None:
+    """Populate the environment for a benchmark run. Must be called before importing `config`."""
+    for key, value in {**BENCH_ENV, **overrides}.items():
+        os.environ.setdefault(key, value)
+
+def create_videosdk_stub_app(
+    latency: float = 0.0,
+    region_latency: Optional[Dict[str, float]] = None,
+    tail_probability: float = 0.0,
+    tail_latency: float = 0.0,
+) -> FastAPI:
+    """
+    Create a stub of the VideoSDK rooms API with a fixed server-side latency, or a latency per geo-fence in
+    `region_latency`. A `tail_probability` share of requests take `tail_latency` seconds instead.
+    """
+    app = FastAPI(title="VideoSDK API stub")
+    counter = itertools.count(1)
+
+    @app.post("/v2/rooms")
+    async def create_room(body: Optional[Dict[str, str]] = Body(None)):
+        geo_fence = (body or {}).get("geoFence")
+        delay = (region_latency or {}).get(geo_fence, latency)
+        if tail_probability and random.random() < tail_probability:
+            delay = tail_latency
+        if delay:
+            await asyncio.sleep(delay)
+        return {"roomId": f"stub-{next(counter):08d}", "geoFence": geo_fence}
+
+    return app
+
+def create_twilio_stub_app(latency: float = 0.0) -> FastAPI:
+    """Create a stub of the Twilio Calls API with a fixed server-side latency. Calls are accepted, never dialled."""
+    app = FastAPI(title="Twilio API stub")
+    counter = itertools.count(1)
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Calls.json", status_code=201)
+    async def create_call(account_sid: str, To: str = Form(...), From: str = Form(...)):
+        if latency:
+            await asyncio.sleep(latency)
+        return {
+            "sid": f"CA{next(counter):032d}",
+            "account_sid": account_sid,
+            "to": To,
+            "from": From,
+            "status": "queued",
+        }
+
+    return app
+
+@asynccontextmanager
+async def run_stub_server(app: FastAPI, host: str = "127.0.0.1", port: int = 8900) -> AsyncIterator[str]:
+    """Serve a stub app in the current event loop and yield its base URL."""
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    logging.getLogger(__name__).info(f"Stub server listening on http://{host}:{port}")
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        await task
@@ -1,15 +1,22 @@
 import os
+import socket
 import logging
-from typing import Dict, Any
+from typing import Dict
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables. Settings are read when this module is imported;
+# validation is left to startup (Config.validate()) so importing has no other side effects.
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "key=value,key=value" settings."""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): val.strip() for key, val in pairs if key.strip()}
+
 class Config:
     """Centralized configuration management."""
     
@@ -17,14 +24,150 @@ class Config:
     VIDEOSDK_AUTH_TOKEN = os.getenv("VIDEOSDK_AUTH_TOKEN")
     VIDEOSDK_SIP_USERNAME = os.getenv("VIDEOSDK_SIP_USERNAME")
     VIDEOSDK_SIP_PASSWORD = os.getenv("VIDEOSDK_SIP_PASSWORD")
+    VIDEOSDK_API_BASE_URL = os.getenv("VIDEOSDK_API_BASE_URL", "https://api.videosdk.live/v2")
+    
+    # VideoSDK HTTP client pool
+    VIDEOSDK_HTTP2 = os.getenv("VIDEOSDK_HTTP2", "false").lower() == "true"
+    VIDEOSDK_MAX_CONNECTIONS = int(os.getenv("VIDEOSDK_MAX_CONNECTIONS", "100"))
+    VIDEOSDK_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("VIDEOSDK_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    VIDEOSDK_KEEPALIVE_EXPIRY = float(os.getenv("VIDEOSDK_KEEPALIVE_EXPIRY", "60"))
+    VIDEOSDK_CONNECT_TIMEOUT = float(os.getenv("VIDEOSDK_CONNECT_TIMEOUT", "5"))
+    VIDEOSDK_TIMEOUT = float(os.getenv("VIDEOSDK_TIMEOUT", "10"))
+    
+    # Pre-warmed room pool
+    ROOM_POOL_ENABLED = os.getenv("ROOM_POOL_ENABLED", "true").lower() == "true"
+    # An empty list falls back to the default, since the first entry is the default room region
+    ROOM_POOL_GEO_FENCES = [geo.strip() for geo in os.getenv("ROOM_POOL_GEO_FENCES", "us002").split(",") if geo.strip()] or ["us002"]
+    ROOM_POOL_LOW_WATERMARK = int(os.getenv("ROOM_POOL_LOW_WATERMARK", "2"))
+    ROOM_POOL_HIGH_WATERMARK = int(os.getenv("ROOM_POOL_HIGH_WATERMARK", "5"))
+    ROOM_POOL_ROOM_TTL = float(os.getenv("ROOM_POOL_ROOM_TTL", "3600"))
+    ROOM_POOL_REFILL_CONCURRENCY = int(os.getenv("ROOM_POOL_REFILL_CONCURRENCY", "2"))
+    
+    # Room region per call: "+44=eu001|us002,+91=in001" maps number prefixes to geo-fences, nearest first
+    ROOM_GEO_ROUTES = {prefix: geos.split("|") for prefix, geos in _parse_mapping(os.getenv("ROOM_GEO_ROUTES", "")).items()}
+    ROOM_GEO_SLOW_FACTOR = float(os.getenv("ROOM_GEO_SLOW_FACTOR", "3"))
+    ROOM_GEO_STATS_WINDOW = float(os.getenv("ROOM_GEO_STATS_WINDOW", "300"))
+    # Hedged room creation: a second request after the region's p95 latency (ROOM_HEDGE_DELAY until measured)
+    ROOM_HEDGE_ENABLED = os.getenv("ROOM_HEDGE_ENABLED", "false").lower() == "true"
+    ROOM_HEDGE_DELAY = float(os.getenv("ROOM_HEDGE_DELAY", "0.3"))
+    ROOM_HEDGE_PERCENTILE = float(os.getenv("ROOM_HEDGE_PERCENTILE", "0.95"))
+    ROOM_HEDGE_MIN_SAMPLES = int(os.getenv("ROOM_HEDGE_MIN_SAMPLES", "20"))
+    
+    # Outbound campaigns
+    CAMPAIGN_CALLS_PER_SECOND = float(os.getenv("CAMPAIGN_CALLS_PER_SECOND", "1"))
+    CAMPAIGN_MAX_CONCURRENT = int(os.getenv("CAMPAIGN_MAX_CONCURRENT", "10"))
+    CAMPAIGN_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", "3"))
+    CAMPAIGN_RETRY_BACKOFF = float(os.getenv("CAMPAIGN_RETRY_BACKOFF", "300"))
     
     # AI Configuration
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    DEFAULT_AI_AGENT = os.getenv("DEFAULT_AI_AGENT", "gemini")
     
     # Twilio Configuration
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_SID")
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_NUMBER = os.getenv("TWILIO_NUMBER")
+    TWILIO_HTTP_TIMEOUT = float(os.getenv("TWILIO_HTTP_TIMEOUT", "10"))
+    TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL")
+    
+    # SIP provider routing: the first provider is the default and receives inbound calls
+    SIP_PROVIDERS = [name.strip() for name in os.getenv("SIP_PROVIDERS", "twilio").split(",") if name.strip()]
+    SIP_PROVIDER_WEIGHTS = {name: float(weight) for name, weight in _parse_mapping(os.getenv("SIP_PROVIDER_WEIGHTS", "")).items()}
+    # Number prefix to providers in order of preference, e.g. "+44=vonage|twilio,+1=twilio"
+    SIP_PROVIDER_ROUTES = {prefix: names.split("|") for prefix, names in _parse_mapping(os.getenv("SIP_PROVIDER_ROUTES", "")).items()}
+    SIP_PROVIDER_FAILURE_THRESHOLD = int(os.getenv("SIP_PROVIDER_FAILURE_THRESHOLD", "5"))
+    SIP_PROVIDER_RESET_TIMEOUT = float(os.getenv("SIP_PROVIDER_RESET_TIMEOUT", "30"))
+    SIP_PROVIDER_STATS_WINDOW = float(os.getenv("SIP_PROVIDER_STATS_WINDOW", "300"))
+    
+    # Public URL of this server, used for provider status callbacks
+    PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL")
+    
+    # Session execution: "inprocess" (development) or "process" (worker pool)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "inprocess")
+    SESSION_WORKERS = int(os.getenv("SESSION_WORKERS", str(os.cpu_count() or 1)))
+    SESSION_WORKER_SHUTDOWN_TIMEOUT = float(os.getenv("SESSION_WORKER_SHUTDOWN_TIMEOUT", "10"))
+    
+    # Reaper for sessions whose caller never joins the room or that run too long (0 disables a deadline)
+    SESSION_JOIN_TIMEOUT = float(os.getenv("SESSION_JOIN_TIMEOUT", "90"))
+    SESSION_MAX_DURATION = float(os.getenv("SESSION_MAX_DURATION", "3600"))
+    SESSION_REAPER_INTERVAL = float(os.getenv("SESSION_REAPER_INTERVAL", "5"))
+    
+    # Session registry shared by all nodes: "memory" (single node) or "sqlite" (shared file)
+    NODE_ID = os.getenv("NODE_ID", f"{socket.gethostname()}-{os.getpid()}")
+    SESSION_REGISTRY = os.getenv("SESSION_REGISTRY", "memory")
+    SESSION_REGISTRY_PATH = os.getenv("SESSION_REGISTRY_PATH", "sessions.db")
+    SESSION_REGISTRY_HEARTBEAT_INTERVAL = float(os.getenv("SESSION_REGISTRY_HEARTBEAT_INTERVAL", "5"))
+    SESSION_REGISTRY_NODE_TTL = float(os.getenv("SESSION_REGISTRY_NODE_TTL", "15"))
+    # Seconds a SQLite registry write waits for another process's lock; it runs on the event loop, so keep it short
+    SESSION_REGISTRY_BUSY_TIMEOUT = float(os.getenv("SESSION_REGISTRY_BUSY_TIMEOUT", "0.25"))
+    
+    # Live stream of this node's session lifecycle events (/sessions/events, /sessions/ws)
+    SESSION_EVENTS_BUFFER = int(os.getenv("SESSION_EVENTS_BUFFER", "1000"))
+    SESSION_EVENTS_SUBSCRIBER_QUEUE = int(os.getenv("SESSION_EVENTS_SUBSCRIBER_QUEUE", "1000"))
+    SESSION_EVENTS_PING_INTERVAL = float(os.getenv("SESSION_EVENTS_PING_INTERVAL", "15"))
+    
+    # Pre-connected realtime models, per agent configuration
+    PIPELINE_POOL_ENABLED = os.getenv("PIPELINE_POOL_ENABLED", "true").lower() == "true"
+    PIPELINE_POOL_AGENTS = [agent.strip() for agent in os.getenv("PIPELINE_POOL_AGENTS", "gemini").split(",") if agent.strip()]
+    PIPELINE_POOL_SIZE = int(os.getenv("PIPELINE_POOL_SIZE", "2"))
+    PIPELINE_POOL_TTL = float(os.getenv("PIPELINE_POOL_TTL", "120"))
+    PIPELINE_POOL_REFILL_CONCURRENCY = int(os.getenv("PIPELINE_POOL_REFILL_CONCURRENCY", "2"))
+    
+    # Synthesized speech cache for scripted lines such as greetings
+    AUDIO_CACHE_ENABLED = os.getenv("AUDIO_CACHE_ENABLED", "true").lower() == "true"
+    AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", ".audio_cache")
+    AUDIO_CACHE_MEMORY_BYTES = int(float(os.getenv("AUDIO_CACHE_MEMORY_MB", "64")) * 1024 * 1024)
+    AUDIO_CACHE_MAX_ENTRY_SECONDS = float(os.getenv("AUDIO_CACHE_MAX_ENTRY_SECONDS", "30"))
+    AUDIO_CACHE_RECORD_IDLE = float(os.getenv("AUDIO_CACHE_RECORD_IDLE", "0.8"))
+    
+    # Admission control (0 disables the session cap)
+    ADMISSION_MAX_ACTIVE_SESSIONS = int(os.getenv("ADMISSION_MAX_ACTIVE_SESSIONS", "0"))
+    ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "10"))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+    ADMISSION_RETRY_AFTER = float(os.getenv("ADMISSION_RETRY_AFTER", "30"))
+    
+    # Per-turn latency: caller speech is a frame whose peak exceeds the threshold, and ends after the hangover of quiet
+    TURN_LATENCY_ENABLED = os.getenv("TURN_LATENCY_ENABLED", "true").lower() == "true"
+    TURN_SPEECH_THRESHOLD = int(os.getenv("TURN_SPEECH_THRESHOLD", "500"))
+    TURN_SPEECH_HANGOVER = float(os.getenv("TURN_SPEECH_HANGOVER", "0.5"))
+    # Turns slower than this are sampled to a JSON lines file for offline analysis (empty path keeps them in memory only)
+    TURN_SLOW_THRESHOLD = float(os.getenv("TURN_SLOW_THRESHOLD", "1.5"))
+    TURN_SLOW_SAMPLE_RATE = float(os.getenv("TURN_SLOW_SAMPLE_RATE", "1.0"))
+    TURN_SLOW_SAMPLE_PATH = os.getenv("TURN_SLOW_SAMPLE_PATH", "slow_turns.jsonl")
+    
+    # Call records (metadata and transcript of every call), written in batches by a background task
+    CALL_RECORDS_ENABLED = os.getenv("CALL_RECORDS_ENABLED", "true").lower() == "true"
+    CALL_RECORDS_DIR = os.getenv("CALL_RECORDS_DIR", "call_records")
+    CALL_RECORDS_FORMAT = os.getenv("CALL_RECORDS_FORMAT", "jsonl.gz")
+    CALL_RECORDS_QUEUE_SIZE = int(os.getenv("CALL_RECORDS_QUEUE_SIZE", "10000"))
+    # "drop" discards records that find the queue full; "block" holds them until the writer catches up
+    CALL_RECORDS_QUEUE_POLICY = os.getenv("CALL_RECORDS_QUEUE_POLICY", "drop")
+    CALL_RECORDS_BATCH_SIZE = int(os.getenv("CALL_RECORDS_BATCH_SIZE", "500"))
+    CALL_RECORDS_FLUSH_INTERVAL = float(os.getenv("CALL_RECORDS_FLUSH_INTERVAL", "5"))
+    CALL_RECORDS_ROTATE_BYTES = int(float(os.getenv("CALL_RECORDS_ROTATE_MB", "64")) * 1024 * 1024)
+    CALL_RECORDS_ROTATE_SECONDS = float(os.getenv("CALL_RECORDS_ROTATE_SECONDS", "3600"))
+    
+    # Appointment store indexed by phone number: a .csv file or a .db/.sqlite database (empty disables)
+    APPOINTMENTS_PATH = os.getenv("APPOINTMENTS_PATH", "")
+    APPOINTMENTS_TABLE = os.getenv("APPOINTMENTS_TABLE", "appointments")
+    # Prefix for stored or caller numbers without one, e.g. "4155550100" -> "+14155550100"
+    APPOINTMENTS_DEFAULT_COUNTRY_CODE = os.getenv("APPOINTMENTS_DEFAULT_COUNTRY_CODE", "+1")
+    # Confirmations and reschedules are written back in batches
+    APPOINTMENTS_FLUSH_INTERVAL = float(os.getenv("APPOINTMENTS_FLUSH_INTERVAL", "2"))
+    APPOINTMENTS_BATCH_SIZE = int(os.getenv("APPOINTMENTS_BATCH_SIZE", "100"))
+    
+    # Graceful drain for rolling restarts: stop admitting calls and let active sessions finish, up to the timeout
+    DRAIN_ON_SIGTERM = os.getenv("DRAIN_ON_SIGTERM", "true").lower() == "true"
+    DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "600"))
+    # Bearer token for /admin endpoints; without one they are only served to localhost
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    
+    # Retried webhooks (by CallSid) and outbound requests (by Idempotency-Key header) reuse the first result
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "300"))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+    
+    # Thread pool for providers without a native async client
+    PROVIDER_EXECUTOR_WORKERS = int(os.getenv("PROVIDER_EXECUTOR_WORKERS", "8"))
     
     @classmethod
     def validate(cls) -> None:
@@ -46,7 +189,4 @@ class Config:
                 logger.error(f"Error: Missing environment variable: {var_name}")
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
         
-        logger.info("All required environment variables are set.")
-
-# Validate configuration on import
-Config.validate() 
\ No newline at end of file
+        logger.info("All required environment variables are set.")
\ No newline at end of file
@@ -0,0 +1,65 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Latency assumed for services without measurements yet, so they compete fairly with measured ones
+DEFAULT_LATENCY = 0.5
+
+class LatencyStats:
+    """Rolling latency and error rate of requests to a remote service over the last `window` seconds."""
+
+    def __init__(self, window: float = 300.0, ewma_alpha: float = 0.2):
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+        # (monotonic time, latency seconds, succeeded)
+        self._samples: Deque[Tuple[float, float, bool]] = deque()
+        self.latency_ewma: Optional[float] = None
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        self._samples.append((now, latency, ok))
+        self._trim(now)
+        self.calls += 1
+        if ok:
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                self.ewma_alpha * latency + (1 - self.ewma_alpha) * self.latency_ewma
+            )
+        else:
+            self.errors += 1
+
+    def _trim(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def error_rate(self) -> float:
+        self._trim(time.monotonic())
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, _, ok in self._samples if not ok) / len(self._samples)
+
+    def successes(self) -> int:
+        """Number of successful requests in the window."""
+        self._trim(time.monotonic())
+        return sum(1 for _, _, ok in self._samples if ok)
+
+    def latency_percentile(self, p: float) -> Optional[float]:
+        """Latency in seconds of successful requests at percentile `p` (0-1) over the window, or None without any."""
+        self._trim(time.monotonic())
+        latencies = sorted(latency for _, latency, ok in self._samples if ok)
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        def pct_ms(p: float) -> Optional[float]:
+            latency = self.latency_percentile(p)
+            return latency * 1000 if latency is not None else None
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "window_calls": len(self._samples),
+            "window_error_rate": self.error_rate(),
+            "latency_ewma_ms": self.latency_ewma * 1000 if self.latency_ewma is not None else None,
+            "latency_p50_ms": pct_ms(0.50),
+            "latency_p95_ms": pct_ms(0.95),
+        }
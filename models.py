@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 class OutboundCallRequest(BaseModel):
@@ -11,10 +11,37 @@ class CallResponse(BaseModel):
     message: str
     twilio_call_sid: Optional[str] = None
     videosdk_room_id: Optional[str] = None
+    provider: Optional[str] = None
 
 class SessionInfo(BaseModel):
     """Model for session information."""
     room_id: str
     call_type: str
     agent_type: str
-    status: str 
\ No newline at end of file
+    status: str 
+    provider: Optional[str] = None
+    node_id: Optional[str] = None
+    created_at: Optional[float] = None
+    worker: Optional[int] = None
+
+class SessionPage(BaseModel):
+    """One page of active sessions, oldest first."""
+    sessions: List[SessionInfo]
+    total: int
+    next_cursor: Optional[str] = None
+
+class CampaignStatus(BaseModel):
+    """Model for outbound campaign progress."""
+    campaign_id: str
+    name: str
+    state: str
+    total: int
+    pending: int
+    in_progress: int
+    retrying: int
+    completed: int
+    failed: int
+    calls_per_second: float
+    max_concurrent: int
+    created_at: float
+    providers: Optional[List[str]] = None
@@ -0,0 +1,80 @@
+import time
+import logging
+import importlib
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# A factory, or where to import it from: "package.module:Attribute"
+FactorySpec = Union[str, Callable[..., Any]]
+
+def import_spec(spec: str) -> Any:
+    """Import the object named by a "package.module:Attribute" spec."""
+    module_name, _, attribute = spec.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute) if attribute else module
+
+class PluginRegistry:
+    """
+    Named factories that are imported on first use.
+
+    Factories are registered as callables or "module:Attribute" specs. Packages installed with an entry point
+    in `entry_point_group` are added under the entry point name, also without importing them.
+    """
+
+    def __init__(self, kind: str, plural: str, specs: Dict[str, FactorySpec], entry_point_group: Optional[str] = None):
+        self.kind = kind
+        self.plural = plural
+        self.entry_point_group = entry_point_group
+        self._specs: Dict[str, FactorySpec] = dict(specs)
+        self._factories: Dict[str, Callable[..., Any]] = {}
+        self._entry_points_loaded = False
+        # Seconds spent importing each factory, for the startup report
+        self.load_times: Dict[str, float] = {}
+
+    def register(self, name: str, factory: FactorySpec) -> None:
+        """Add or replace a factory."""
+        self._specs[name] = factory
+        self._factories.pop(name, None)
+
+    def _discover_entry_points(self) -> None:
+        if self._entry_points_loaded or self.entry_point_group is None:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=self.entry_point_group):
+            # Explicit registrations win over installed packages
+            self._specs.setdefault(entry_point.name, entry_point.value)
+
+    def names(self) -> List[str]:
+        """Return the names of all registered factories, loaded or not."""
+        self._discover_entry_points()
+        return list(self._specs.keys())
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._factories
+
+    def load(self, name: str) -> Callable[..., Any]:
+        """Return the factory for a name, importing it on first use."""
+        factory = self._factories.get(name)
+        if factory is not None:
+            return factory
+
+        self._discover_entry_points()
+        if name not in self._specs:
+            raise ValueError(f"Unsupported {self.kind}: {name}. Available {self.plural}: {self.names()}")
+
+        spec = self._specs[name]
+        if isinstance(spec, str):
+            started = time.perf_counter()
+            factory = import_spec(spec)
+            self.load_times[name] = time.perf_counter() - started
+            logger.info(f"Loaded {self.kind} {name} from {spec} in {self.load_times[name] * 1000:.0f}ms")
+        else:
+            factory = spec
+        self._factories[name] = factory
+        return factory
+
+    def create(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Import the factory for a name if needed and call it."""
+        return self.load(name)(*args, **kwargs)
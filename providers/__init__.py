@@ -1,15 +1,40 @@
+from typing import Any
+from plugin_registry import FactorySpec, PluginRegistry
 from .base import SIPProvider
-from .twilio_provider import TwilioProvider
+from .router import ProviderRouter, CircuitBreaker, NoProviderAvailable
+
+# Providers are imported on first use; packages can add more with a "videosdk_call_server.providers" entry point
+providers = PluginRegistry(
+    "provider",
+    "providers",
+    {
+        "twilio": "providers.twilio_provider:TwilioProvider",
+    },
+    entry_point_group="videosdk_call_server.providers",
+)
+
+def register_provider(provider_name: str, factory: FactorySpec) -> None:
+    """Make a SIP provider available to get_provider, as a class or a "module:Class" spec."""
+    providers.register(provider_name, factory)
 
 def get_provider(provider_name: str = "twilio") -> SIPProvider:
     """Factory function to get the appropriate SIP provider."""
-    providers = {
-        "twilio": TwilioProvider,
-    }
-    
-    if provider_name not in providers:
-        raise ValueError(f"Unsupported provider: {provider_name}. Available providers: {list(providers.keys())}")
-    
-    return providers[provider_name]()
-
-__all__ = ["SIPProvider", "TwilioProvider", "get_provider"] 
\ No newline at end of file
+    return providers.create(provider_name)
+
+def __getattr__(name: str) -> Any:
+    # Provider classes import their SDKs, so they are only loaded when asked for
+    if name == "TwilioProvider":
+        from .twilio_provider import TwilioProvider
+        return TwilioProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    "SIPProvider",
+    "TwilioProvider",
+    "ProviderRouter",
+    "CircuitBreaker",
+    "NoProviderAvailable",
+    "get_provider",
+    "register_provider",
+    "providers",
+]
\ No newline at end of file
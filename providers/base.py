@@ -1,10 +1,16 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from twilio.twiml.voice_response import VoiceResponse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Mapping, Optional
+from config import Config
 
 class SIPProvider(ABC):
     """Base interface for SIP providers."""
     
+    # Shared, bounded pool for providers whose SDK only offers blocking calls
+    _executor: Optional[ThreadPoolExecutor] = None
+    
     @abstractmethod
     def create_client(self) -> Any:
         """Create and return the provider's client instance."""
@@ -16,11 +22,61 @@ class SIPProvider(ABC):
         pass
     
     @abstractmethod
-    def initiate_outbound_call(self, to_number: str, twiml: str) -> Dict[str, Any]:
-        """Initiate an outbound call using the provider."""
+    def generate_reject_twiml(self, reason: str = "busy") -> str:
+        """Generate a response that rejects an inbound call, e.g. with a busy signal."""
+        pass
+    
+    @abstractmethod
+    def generate_say_twiml(self, message: str) -> str:
+        """Generate a response that speaks a message to the caller."""
+        pass
+    
+    @abstractmethod
+    def initiate_outbound_call(self, to_number: str, twiml: str, status_callback: Optional[str] = None) -> Dict[str, Any]:
+        """Initiate an outbound call using the provider, optionally reporting call status to a URL."""
         pass
     
+    async def initiate_outbound_call_async(self, to_number: str, twiml: str, status_callback: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Initiate an outbound call without blocking the event loop.
+        Providers with a native async client override this; the default runs
+        the blocking call on the shared bounded thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.get_executor(),
+            functools.partial(self.initiate_outbound_call, to_number, twiml, status_callback),
+        )
+    
+    def validate_request(self, url: str, params: Mapping[str, str], headers: Mapping[str, str]) -> bool:
+        """
+        Check that a webhook request to `url` was signed by the provider. Providers that do not sign their webhooks
+        accept none, so their callbacks cannot stop sessions.
+        """
+        return False
+    
     @abstractmethod
     def get_provider_name(self) -> str:
         """Return the provider name."""
-        pass 
\ No newline at end of file
+        pass
+    
+    async def close(self) -> None:
+        """Release any connections held by the provider."""
+        pass
+    
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """Return the shared thread pool for blocking provider calls."""
+        if SIPProvider._executor is None:
+            SIPProvider._executor = ThreadPoolExecutor(
+                max_workers=Config.PROVIDER_EXECUTOR_WORKERS,
+                thread_name_prefix="sip-provider",
+            )
+        return SIPProvider._executor
+    
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        """Shut down the shared thread pool."""
+        if SIPProvider._executor is not None:
+            SIPProvider._executor.shutdown(wait=False, cancel_futures=True)
+            SIPProvider._executor = None
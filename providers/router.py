@@ -0,0 +1,247 @@
+import time
+import random
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from config import Config
+from latency_stats import LatencyStats, DEFAULT_LATENCY
+from .base import SIPProvider
+
+logger = logging.getLogger(__name__)
+
+# Statuses meaning the call itself was invalid. Auth failures (401/403) and missing resources (404) point at the
+# provider's account or configuration, so they count against its breaker and the call fails over.
+CLIENT_ERROR_STATUSES = {400, 422}
+
+class NoProviderAvailable(Exception):
+    """Raised when every candidate provider is unavailable or failed."""
+
+    def __init__(self, message: str, errors: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+class CircuitBreaker:
+    """
+    Stops sending calls to a failing provider.
+
+    Opens after `failure_threshold` consecutive failures. After `reset_timeout` seconds it lets a single trial call
+    through (half-open): success closes it again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return whether a call may be sent now, reserving the trial call when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._trial_in_flight or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a reserved trial call that never got a result, e.g. because it was cancelled."""
+        self._trial_in_flight = False
+
+class ProviderRoute:
+    """A provider instance with its routing weight, circuit breaker and statistics."""
+
+    def __init__(self, name: str, provider: SIPProvider, weight: float, breaker: CircuitBreaker, stats: LatencyStats):
+        self.name = name
+        self.provider = provider
+        self.weight = weight
+        self.breaker = breaker
+        self.stats = stats
+
+    def score(self) -> float:
+        """Higher for heavier-weighted, faster and more reliable providers."""
+        latency = self.stats.latency_ewma if self.stats.latency_ewma is not None else DEFAULT_LATENCY
+        return self.weight * (1.0 - self.stats.error_rate()) / max(latency, 0.001)
+
+class ProviderRouter:
+    """
+    Holds several SIP providers and picks one per outbound call.
+
+    Candidates are the providers preferred for the call (by campaign, else by the longest matching number prefix)
+    followed by the rest as failover; calls without a rule draw from all providers. Within each group the order is a weighted random draw on weight, latency and
+    error rate. Providers whose circuit breaker is open are skipped, and a call that fails on one provider is retried
+    on the next.
+    """
+
+    def __init__(
+        self,
+        provider_names: Sequence[str] = Config.SIP_PROVIDERS,
+        weights: Optional[Dict[str, float]] = None,
+        prefix_routes: Optional[Dict[str, List[str]]] = None,
+        failure_threshold: int = Config.SIP_PROVIDER_FAILURE_THRESHOLD,
+        reset_timeout: float = Config.SIP_PROVIDER_RESET_TIMEOUT,
+        stats_window: float = Config.SIP_PROVIDER_STATS_WINDOW,
+    ):
+        if not provider_names:
+            raise ValueError("At least one SIP provider must be configured")
+        self.provider_names = list(provider_names)
+        self.weights = dict(Config.SIP_PROVIDER_WEIGHTS if weights is None else weights)
+        self.prefix_routes = dict(Config.SIP_PROVIDER_ROUTES if prefix_routes is None else prefix_routes)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.stats_window = stats_window
+        self.routes: Dict[str, ProviderRoute] = {}
+        self.default_name = self.provider_names[0]
+
+    def start(self) -> None:
+        """Create the configured providers, importing their SDKs."""
+        for name in self.provider_names:
+            self.add_provider(name)
+        for prefix, names in self.prefix_routes.items():
+            unknown = [name for name in names if name not in self.routes]
+            if unknown:
+                raise ValueError(f"Route for prefix {prefix} uses providers that are not configured: {unknown}")
+        logger.info(f"Provider router started with {list(self.routes)} (default {self.default_name})")
+
+    def add_provider(self, name: str) -> ProviderRoute:
+        """Create a provider and make it routable, if it is not already."""
+        from . import get_provider
+
+        route = self.routes.get(name)
+        if route is None:
+            route = ProviderRoute(
+                name,
+                get_provider(name),
+                self.weights.get(name, 1.0),
+                CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                LatencyStats(self.stats_window),
+            )
+            self.routes[name] = route
+        return route
+
+    def set_default(self, name: str) -> None:
+        """Make a provider the one that answers inbound calls, creating it if needed."""
+        self.add_provider(name)
+        self.default_name = name
+
+    @property
+    def default(self) -> SIPProvider:
+        """The provider that receives inbound calls."""
+        return self.routes[self.default_name].provider
+
+    def get(self, name: str) -> SIPProvider:
+        return self.routes[name].provider
+
+    def validate_names(self, names: Sequence[str]) -> None:
+        unknown = [name for name in names if name not in self.routes]
+        if unknown:
+            raise ValueError(f"Unsupported provider: {', '.join(unknown)}. Available providers: {list(self.routes.keys())}")
+
+    def _ordered(self, routes: List[ProviderRoute]) -> List[ProviderRoute]:
+        # Weighted random order: sort by u ** (1 / score), so each route leads with probability proportional to its score
+        keyed = []
+        for route in routes:
+            score = route.score()
+            keyed.append((random.random() ** (1.0 / score) if score > 0 else 0.0, route))
+        return [route for _, route in sorted(keyed, key=lambda item: item[0], reverse=True)]
+
+    def plan(self, to_number: str, preferred: Optional[Sequence[str]] = None) -> List[ProviderRoute]:
+        """Return the routes to try for a call, in order."""
+        if not preferred:
+            matches = [prefix for prefix in self.prefix_routes if to_number.startswith(prefix)]
+            preferred = self.prefix_routes[max(matches, key=len)] if matches else []
+        first = [self.routes[name] for name in preferred if name in self.routes]
+        rest = [route for name, route in self.routes.items() if name not in preferred]
+        return self._ordered(first) + self._ordered(rest)
+
+    async def place_call(
+        self,
+        routes: List[ProviderRoute],
+        to_number: str,
+        sip_endpoint: str,
+        status_callback: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Place a call on the first route that accepts it, failing over on provider errors. The result names the provider used."""
+        errors: Dict[str, str] = {}
+        for route in routes:
+            if not route.breaker.allow():
+                errors[route.name] = f"circuit {route.breaker.state}"
+                continue
+
+            twiml = route.provider.generate_twiml(sip_endpoint)
+            started = time.perf_counter()
+            try:
+                result = await route.provider.initiate_outbound_call_async(to_number, twiml, status_callback)
+            except Exception as e:
+                latency = time.perf_counter() - started
+                if _is_client_error(e):
+                    # The provider is healthy and rejected this call (e.g. an invalid number); another would too
+                    route.breaker.record_success()
+                    route.stats.record(latency, True)
+                    raise
+                route.breaker.record_failure()
+                route.stats.record(latency, False)
+                errors[route.name] = str(e)
+                logger.warning(f"Provider {route.name} failed to place call to {to_number}: {e}. Breaker {route.breaker.state}.")
+                continue
+            except BaseException:
+                # Cancelled: neither a success nor a failure, so let the next call try the provider
+                route.breaker.release_trial()
+                raise
+
+            route.breaker.record_success()
+            route.stats.record(time.perf_counter() - started, True)
+            return {**result, "provider": route.name}
+
+        raise NoProviderAvailable(f"No SIP provider could place the call: {errors}", errors)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return routing rules and per-provider health."""
+        return {
+            "default": self.default_name,
+            "prefix_routes": self.prefix_routes,
+            "providers": {
+                name: {
+                    "weight": route.weight,
+                    "score": route.score(),
+                    "circuit": route.breaker.state,
+                    "consecutive_failures": route.breaker.consecutive_failures,
+                    "times_opened": route.breaker.times_opened,
+                    **route.stats.get_stats(),
+                }
+                for name, route in self.routes.items()
+            },
+        }
+
+    def validate_request(self, url: str, params: Mapping[str, str], headers: Mapping[str, str]) -> bool:
+        """Whether a webhook request was signed by any of the configured providers."""
+        return any(route.provider.validate_request(url, params, headers) for route in self.routes.values())
+
+    async def close(self) -> None:
+        for route in self.routes.values():
+            await route.provider.close()
+
+def _is_client_error(error: Exception) -> bool:
+    """Whether a provider rejected the request itself rather than failing to serve it."""
+    return getattr(error, "status", None) in CLIENT_ERROR_STATUSES
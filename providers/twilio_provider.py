@@ -1,44 +1,135 @@
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, Mapping, Optional
 from twilio.rest import Client as TwilioClient
+from twilio.request_validator import RequestValidator
 from twilio.twiml.voice_response import VoiceResponse, Dial
 from .base import SIPProvider
+from .twiml_templates import TwiMLTemplate
 from config import Config
 
+try:
+    from twilio.http.async_http_client import AsyncTwilioHttpClient
+except ImportError:  # aiohttp is not installed
+    AsyncTwilioHttpClient = None
+
+logger = logging.getLogger(__name__)
+
+def build_dial_response(sip_endpoint: str, username: Optional[str], password: Optional[str]) -> VoiceResponse:
+    """Build the response that bridges the call to a SIP endpoint."""
+    response = VoiceResponse()
+    dial = Dial()
+    dial.sip(sip_endpoint, username=username, password=password)
+    response.append(dial)
+    return response
+
+def build_reject_response(reason: str) -> VoiceResponse:
+    """Build the response that rejects a call."""
+    response = VoiceResponse()
+    response.reject(reason=reason)
+    return response
+
+def build_say_response(message: str) -> VoiceResponse:
+    """Build the response that speaks a message."""
+    response = VoiceResponse()
+    response.say(message)
+    return response
+
 class TwilioProvider(SIPProvider):
     """Twilio SIP provider implementation."""
     
     def __init__(self):
         self.client = self.create_client()
+        self._async_client: Optional[TwilioClient] = None
+        self._validator = RequestValidator(Config.TWILIO_AUTH_TOKEN or "")
+        # Responses are compiled once; the SIP credentials are constant and baked into the dial template
+        self._dial_template = TwiMLTemplate(
+            build_dial_response,
+            ("sip_endpoint",),
+            username=Config.VIDEOSDK_SIP_USERNAME,
+            password=Config.VIDEOSDK_SIP_PASSWORD,
+        )
+        self._reject_template = TwiMLTemplate(build_reject_response, ("reason",))
+        self._say_template = TwiMLTemplate(build_say_response, ("message",))
     
     def create_client(self) -> TwilioClient:
         """Create and return Twilio client instance."""
-        return TwilioClient(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
+        return self._with_api_base_url(TwilioClient(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN))
+    
+    def _get_async_client(self) -> Optional[TwilioClient]:
+        """Return a Twilio client backed by a pooled aiohttp session, or None if unavailable."""
+        if self._async_client is None and AsyncTwilioHttpClient is not None:
+            # The aiohttp session must be created inside the running event loop
+            self._async_client = self._with_api_base_url(TwilioClient(
+                Config.TWILIO_ACCOUNT_SID,
+                Config.TWILIO_AUTH_TOKEN,
+                http_client=AsyncTwilioHttpClient(timeout=Config.TWILIO_HTTP_TIMEOUT),
+            ))
+        return self._async_client
+    
+    def _with_api_base_url(self, client: TwilioClient) -> TwilioClient:
+        """Point the client's Calls API at TWILIO_API_BASE_URL when set, e.g. a local stub."""
+        if Config.TWILIO_API_BASE_URL:
+            client.api.base_url = Config.TWILIO_API_BASE_URL
+        return client
     
     def generate_twiml(self, sip_endpoint: str, **kwargs) -> str:
         """Generate TwiML for connecting to SIP endpoint."""
-        response = VoiceResponse()
-        dial = Dial()
-        dial.sip(
-            sip_endpoint,
-            username=Config.VIDEOSDK_SIP_USERNAME,
-            password=Config.VIDEOSDK_SIP_PASSWORD,
-        )
-        response.append(dial)
-        return str(response)
+        return self._dial_template.render(sip_endpoint=sip_endpoint)
+    
+    def generate_reject_twiml(self, reason: str = "busy") -> str:
+        """Generate TwiML that rejects the call with a busy or rejected signal."""
+        return self._reject_template.render(reason=reason)
     
-    def initiate_outbound_call(self, to_number: str, twiml: str) -> Dict[str, Any]:
+    def generate_say_twiml(self, message: str) -> str:
+        """Generate TwiML that speaks a message to the caller."""
+        return self._say_template.render(message=message)
+    
+    def initiate_outbound_call(self, to_number: str, twiml: str, status_callback: Optional[str] = None) -> Dict[str, Any]:
         """Initiate an outbound call using Twilio."""
-        call = self.client.calls.create(
-            to=to_number,
-            from_=Config.TWILIO_NUMBER,
-            twiml=twiml
-        )
+        call = self.client.calls.create(**self._call_params(to_number, twiml, status_callback))
+        return self._call_result(call)
+    
+    async def initiate_outbound_call_async(self, to_number: str, twiml: str, status_callback: Optional[str] = None) -> Dict[str, Any]:
+        """Initiate an outbound call using Twilio's async client."""
+        client = self._get_async_client()
+        if client is None:
+            return await super().initiate_outbound_call_async(to_number, twiml, status_callback)
+        
+        call = await client.calls.create_async(**self._call_params(to_number, twiml, status_callback))
+        return self._call_result(call)
+    
+    def _call_params(self, to_number: str, twiml: str, status_callback: Optional[str]) -> Dict[str, Any]:
+        """Build the Calls API parameters shared by the sync and async paths."""
+        params: Dict[str, Any] = {
+            "to": to_number,
+            "from_": Config.TWILIO_NUMBER,
+            "twiml": twiml,
+        }
+        if status_callback:
+            params["status_callback"] = status_callback
+            params["status_callback_event"] = ["initiated", "ringing", "answered", "completed"]
+        return params
+    
+    def _call_result(self, call: Any) -> Dict[str, Any]:
+        """Convert a Twilio call instance to the provider-neutral result."""
         return {
             "call_sid": call.sid,
             "status": call.status,
             "provider": "twilio"
         }
     
+    def validate_request(self, url: str, params: Mapping[str, str], headers: Mapping[str, str]) -> bool:
+        """Check the request's X-Twilio-Signature against the auth token."""
+        signature = headers.get("X-Twilio-Signature")
+        return bool(signature) and self._validator.validate(url, dict(params), signature)
+    
+    async def close(self) -> None:
+        """Close the pooled async HTTP session."""
+        if self._async_client is not None:
+            await self._async_client.http_client.close()
+            self._async_client = None
+            logger.info("Twilio async HTTP client closed")
+    
     def get_provider_name(self) -> str:
         """Return the provider name."""
-        return "twilio" 
\ No newline at end of file
+        return "twilio"
@@ -0,0 +1,114 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Values that exercise every escaping rule; used to check a compiled template against the builder
+_PROBE = "&<>\"'\r\n\t é"
+
+def escape_text(value: str) -> str:
+    """Escape element text exactly like xml.etree.ElementTree."""
+    if "&" in value:
+        value = value.replace("&", "&amp;")
+    if "<" in value:
+        value = value.replace("<", "&lt;")
+    if ">" in value:
+        value = value.replace(">", "&gt;")
+    return value
+
+def escape_attribute(value: str) -> str:
+    """Escape an attribute value exactly like xml.etree.ElementTree."""
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    if "\r" in value:
+        value = value.replace("\r", "&#13;")
+    if "\n" in value:
+        value = value.replace("\n", "&#10;")
+    if "\t" in value:
+        value = value.replace("\t", "&#09;")
+    return value
+
+def _stringify(value: Any) -> str:
+    # Same conversion the twilio library applies to attribute values
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+def _shape(value: Any) -> Optional[bool]:
+    # None drops an attribute and "" drops element text, so each changes the document structure
+    if value is None:
+        return None
+    return value != ""
+
+class TwiMLTemplate:
+    """
+    A TwiML response whose structure is fixed and whose values vary per call.
+
+    The response is built once with the twilio library using placeholder values and split into literal
+    chunks. Rendering joins the chunks with escaped values, producing the same output as building and
+    serializing the element tree each time.
+    """
+
+    def __init__(self, builder: Callable[..., Any], slots: Sequence[str], **fixed: Any):
+        self.builder = builder
+        self.slots = tuple(slots)
+        self.fixed = fixed
+        # One compiled template per combination of missing and empty values
+        self._compiled: Dict[Tuple[Optional[bool], ...], Optional[List[Union[str, Tuple[int, bool]]]]] = {}
+
+    def _build(self, values: Dict[str, Any]) -> str:
+        return str(self.builder(**values, **self.fixed))
+
+    def _compile(self, shape: Tuple[Optional[bool], ...]) -> Optional[List[Union[str, Tuple[int, bool]]]]:
+        """Split the builder's output into literal chunks and (slot index, is_attribute) markers."""
+        placeholders = {}
+        for index, (slot, present) in enumerate(zip(self.slots, shape)):
+            placeholders[slot] = f"__twiml_slot_{index}__" if present else (None if present is None else "")
+        document = self._build(placeholders)
+
+        located = []
+        for index, slot in enumerate(self.slots):
+            placeholder = placeholders[slot]
+            if not placeholder:
+                continue
+            if document.count(placeholder) != 1:
+                return None
+            located.append((document.index(placeholder), index, placeholder))
+
+        # Slots are split out in document order, which follows the builder's attribute sorting
+        parts: List[Union[str, Tuple[int, bool]]] = []
+        cursor = 0
+        for position, index, placeholder in sorted(located):
+            before = document[cursor:position]
+            parts.append(before)
+            parts.append((index, before.endswith('="')))
+            cursor = position + len(placeholder)
+        parts.append(document[cursor:])
+
+        # Only trust the template if it reproduces the builder on awkward input
+        probe = {slot: _PROBE if present else placeholders[slot] for slot, present in zip(self.slots, shape)}
+        if self._join(parts, probe) != self._build(probe):
+            return None
+        return parts
+
+    def _join(self, parts: List[Union[str, Tuple[int, bool]]], values: Dict[str, Any]) -> str:
+        chunks = []
+        for part in parts:
+            if isinstance(part, str):
+                chunks.append(part)
+            else:
+                index, is_attribute = part
+                value = _stringify(values[self.slots[index]])
+                chunks.append(escape_attribute(value) if is_attribute else escape_text(value))
+        return "".join(chunks)
+
+    def render(self, **values: Any) -> str:
+        """Render the response for the given slot values."""
+        shape = tuple(_shape(values.get(slot)) for slot in self.slots)
+        if shape not in self._compiled:
+            self._compiled[shape] = self._compile(shape)
+            if self._compiled[shape] is None:
+                logger.warning(f"TwiML template for slots {self.slots} could not be compiled; building responses per call")
+        parts = self._compiled[shape]
+        if parts is None:
+            return self._build({slot: values.get(slot) for slot in self.slots})
+        return self._join(parts, values)
@@ -1,28 +1,133 @@
+import time
+_import_started = time.perf_counter()
+import hmac
+import json
+import ipaddress
 import logging
-from typing import Optional
-from fastapi import FastAPI, Request, Form, BackgroundTasks, HTTPException
-from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Request, Form, Header, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from sse_starlette.sse import EventSourceResponse
 
 # Import our modular components
 from config import Config
-from models import OutboundCallRequest, CallResponse, SessionInfo
-from providers import get_provider
-from services import VideoSDKService, SessionManager
+from models import OutboundCallRequest, CallResponse, SessionInfo, SessionPage, CampaignStatus
+from providers import SIPProvider, ProviderRouter, NoProviderAvailable, providers as provider_registry
+from services import VideoSDKService, RoomPool, SessionManager, CampaignScheduler, AdmissionController, AdmissionRejected, StartupReport, SessionEventStream, GeoRouter
+from services import IdempotencyCache, IdempotencyConflict, SessionReaper, TurnLatency, CallRecordSink, DrainController
+from services import telemetry
+from services.call_timeline import CallTimeline
+from services.drain import DRAIN_STATES
+from services.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from ai import ai_agents, audio_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# --- Application Lifespan ---
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Validate configuration, load the SIP providers and open shared resources on startup, and release them on shutdown."""
+    with startup_report.step("validate config"):
+        Config.validate()
+    with startup_report.step("start provider router"):
+        provider_router.start()
+    with startup_report.step("start VideoSDK client"):
+        await videosdk_service.start()
+    with startup_report.step("start room pool"):
+        await room_pool.start()
+    with startup_report.step("start session manager"):
+        await session_manager.start()
+    await session_reaper.start()
+    await call_records.start()
+    startup_report.mark_ready()
+    # After the server installed its own signal handlers
+    drain.install_signal_handler()
+    try:
+        yield
+    finally:
+        await drain.stop()
+        await campaign_scheduler.stop()
+        await session_reaper.stop()
+        await session_manager.stop()
+        # After the session manager, so sessions ended by shutdown are recorded
+        await call_records.stop()
+        await room_pool.stop()
+        await provider_router.close()
+        SIPProvider.shutdown_executor()
+        await videosdk_service.close()
+
 # --- FastAPI App Initialization ---
 app = FastAPI(
     title="VideoSDK AI Agent Call Server (Modular)",
     description="Modular FastAPI server for inbound/outbound calls with VideoSDK AI Agent using different providers.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
 )
 
 # --- Initialize Services ---
+startup_report = StartupReport()
 videosdk_service = VideoSDKService()
+# Chooses each call's room region by number prefix and measured room-creation latency
+geo_router = GeoRouter(Config.ROOM_POOL_GEO_FENCES[0], Config.ROOM_POOL_GEO_FENCES)
+videosdk_service.add_latency_listener(geo_router.record)
+room_pool = RoomPool(videosdk_service, geo_router=geo_router)
 session_manager = SessionManager()
-sip_provider = get_provider("twilio")  # Default to Twilio
+admission = AdmissionController()
+# Retried webhooks and repeated outbound requests get the first request's result instead of a second call setup
+idempotency = IdempotencyCache()
+# SIP providers are created at startup, so importing this module does not load a provider SDK
+provider_router = ProviderRouter()
+campaign_scheduler = CampaignScheduler(room_pool, session_manager, provider_router, admission)
+
+def _release_admission(event: str, room_id: str, record: dict) -> None:
+    """Free the admission slot of a session once it ends."""
+    if event == "ended" and record.get("admitted"):
+        admission.release()
+
+session_manager.add_listener(_release_admission)
+
+# Stops admitting calls and waits for active sessions before a restart (SIGTERM or /admin/drain)
+drain = DrainController(session_manager, admission, campaign_scheduler, room_pool)
+session_manager.add_listener(drain.on_session_event)
+
+# Per-call setup timelines, fed by stage marks from this process and from session workers
+call_timeline = CallTimeline()
+session_manager.add_listener(call_timeline.on_session_event)
+telemetry.add_sink(call_timeline.mark)
+
+# Per-turn conversation latency, from the end of the caller's speech to the reply, fed by turn marks from sessions
+turn_latency = TurnLatency()
+session_manager.add_listener(turn_latency.on_session_event)
+telemetry.add_sink(turn_latency.mark)
+
+# A record of every call, with its transcript, written in batches off the event loop
+call_records = CallRecordSink()
+session_manager.add_listener(call_records.on_session_event)
+telemetry.add_sink(call_records.on_stage)
+
+# Stops sessions whose caller never joins, that run too long, or whose call the provider reports as ended
+session_reaper = SessionReaper(session_manager)
+session_manager.add_listener(session_reaper.on_session_event)
+telemetry.add_sink(session_reaper.on_stage)
+
+# Lifecycle events of the sessions this node launched, for /sessions/events and /sessions/ws
+session_events = SessionEventStream(lambda: list(session_manager.sessions.values()))
+session_manager.add_listener(session_events.on_session_event)
+telemetry.add_sink(session_events.on_stage)
+
+metrics.gauge("active_sessions", "Sessions currently registered on all nodes.", session_manager.get_active_sessions_count)
+metrics.gauge("admission_active_sessions", "Sessions holding an admission slot on this node.", lambda: admission.active)
+metrics.gauge("admission_queue_depth", "Calls waiting for an admission slot on this node.", lambda: admission.queue_depth)
+metrics.gauge("session_event_subscribers", "Clients streaming session events from this node.", lambda: session_events.get_stats()["subscribers"])
+metrics.gauge("session_event_dropped_subscribers", "Session event clients dropped for falling behind.", lambda: session_events.dropped_subscribers)
+metrics.gauge("node_ready", "1 if this node accepts new calls, 0 while starting or draining.", lambda: int(_is_ready()))
+metrics.gauge("drain_state", "Drain state of this node: 0 serving, 1 draining, 2 drained.", lambda: DRAIN_STATES.index(drain.state))
+metrics.gauge("call_record_queue_depth", "Call records waiting to be written.", lambda: call_records.get_stats()["queue_depth"])
+
+startup_report.record("import server", time.perf_counter() - _import_started, "import")
 
 # --- FastAPI Endpoints ---
 
@@ -32,28 +137,249 @@ async def health_check():
     active_sessions = session_manager.get_active_sessions_count()
     return f"Server is healthy. Active sessions: {active_sessions}"
 
+def _is_ready() -> bool:
+    return startup_report.ready_at is not None and drain.ready
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until startup finishes and while the node drains, unlike /health."""
+    status = {"ready": _is_ready(), "state": drain.state, "active_sessions": len(session_manager.sessions)}
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+def _require_admin(request: Request, authorization: Optional[str] = Header(None)) -> None:
+    """Allow /admin requests with `Authorization: Bearer <ADMIN_TOKEN>`, or only from localhost when no token is set."""
+    if Config.ADMIN_TOKEN:
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+            raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+        return
+    try:
+        loopback = request.client is not None and ipaddress.ip_address(request.client.host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise HTTPException(status_code=403, detail="Admin endpoints are only served to localhost unless ADMIN_TOKEN is set")
+
+@app.get("/admin/drain", dependencies=[Depends(_require_admin)])
+async def get_drain_status():
+    """Get the drain state and progress: sessions left, ended and stopped, and time to the deadline."""
+    return drain.get_status()
+
+@app.post("/admin/drain", dependencies=[Depends(_require_admin)])
+async def start_drain(timeout: Optional[float] = None):
+    """
+    Stop admitting calls and let active sessions finish, stopping any left after `timeout` seconds
+    (DRAIN_TIMEOUT by default). The server keeps running; poll GET /admin/drain for progress.
+    """
+    if timeout is not None and timeout < 0:
+        raise HTTPException(status_code=400, detail="timeout must not be negative")
+    if not drain.start("admin", timeout):
+        raise HTTPException(status_code=409, detail=f"Node is already {drain.state}")
+    return drain.get_status()
+
+@app.delete("/admin/drain", dependencies=[Depends(_require_admin)])
+async def cancel_drain():
+    """Return a draining or drained node to service."""
+    if not await drain.cancel():
+        detail = "Node is shutting down" if drain.exit_when_done else "Node is not draining"
+        raise HTTPException(status_code=409, detail=detail)
+    return drain.get_status()
+
 @app.get("/sessions", response_class=PlainTextResponse)
-async def get_active_sessions():
-    """Get information about active sessions."""
-    session_info = session_manager.get_session_info()
+async def get_active_sessions(
+    call_type: Optional[str] = None,
+    agent_type: Optional[str] = None,
+    provider: Optional[str] = None,
+    node_id: Optional[str] = None,
+):
+    """Get information about active sessions on all nodes, optionally filtered."""
+    filters = {"call_type": call_type, "agent_type": agent_type, "provider": provider, "node_id": node_id}
+    session_info = session_manager.get_session_info(**{key: value for key, value in filters.items() if value is not None})
     
     if not session_info:
         return "No active sessions"
     
     session_details = []
     for session in session_info:
-        session_details.append(
+        detail = (
             f"Room: {session['room_id']}, "
             f"Agent: {session['agent_type']}, "
-            f"Status: {session['status']}"
+            f"Status: {session['status']}, "
+            f"Node: {session['node_id']}"
         )
+        if session.get("worker") is not None:
+            detail += f", Worker: {session['worker']}"
+        session_details.append(detail)
     
     return "\n".join(session_details)
 
+@app.get("/sessions/list", response_model=SessionPage)
+async def list_sessions(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    call_type: Optional[str] = None,
+    agent_type: Optional[str] = None,
+    provider: Optional[str] = None,
+    node_id: Optional[str] = None,
+):
+    """
+    Get a page of active sessions on all nodes, oldest first, optionally filtered.
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    filters = {"call_type": call_type, "agent_type": agent_type, "provider": provider, "node_id": node_id}
+    filters = {key: value for key, value in filters.items() if value is not None}
+    after = _parse_session_cursor(cursor) if cursor else None
+
+    # One extra record tells whether there is a next page
+    records = session_manager.get_session_page(limit + 1, after, **filters)
+    page = records[:limit]
+    next_cursor = f"{page[-1]['created_at']!r}:{page[-1]['room_id']}" if len(records) > limit else None
+    return SessionPage(
+        sessions=[SessionInfo(**record) for record in page],
+        total=session_manager.get_active_sessions_count(**filters),
+        next_cursor=next_cursor,
+    )
+
+def _parse_session_cursor(cursor: str):
+    created_at, _, room_id = cursor.partition(":")
+    try:
+        return float(created_at), room_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid session cursor: {cursor}")
+
+@app.get("/sessions/events")
+async def stream_session_events(
+    request: Request,
+    cursor: Optional[int] = None,
+    call_type: Optional[str] = None,
+    agent_type: Optional[str] = None,
+    provider: Optional[str] = None,
+):
+    """
+    Stream lifecycle events of this node's sessions as server-sent events.
+    Starts with a snapshot of the current sessions, or resumes after the Last-Event-ID header or `cursor`.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if cursor is None and last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+    filters = {"call_type": call_type, "agent_type": agent_type, "provider": provider}
+    subscription = session_events.subscribe(cursor, **{key: value for key, value in filters.items() if value is not None})
+
+    async def events():
+        try:
+            while True:
+                message = await subscription.next()
+                event_id = str(message["id"]) if message["id"] is not None else None
+                yield {"id": event_id, "event": message["event"], "data": json.dumps(message)}
+                if message["event"] == "overflow":
+                    return
+        finally:
+            subscription.close()
+
+    return EventSourceResponse(events(), ping=Config.SESSION_EVENTS_PING_INTERVAL)
+
+@app.websocket("/sessions/ws")
+async def session_events_socket(
+    websocket: WebSocket,
+    cursor: Optional[int] = None,
+    call_type: Optional[str] = None,
+    agent_type: Optional[str] = None,
+    provider: Optional[str] = None,
+):
+    """Stream the same events as /sessions/events over a WebSocket, one JSON message per event."""
+    await websocket.accept()
+    filters = {"call_type": call_type, "agent_type": agent_type, "provider": provider}
+    subscription = session_events.subscribe(cursor, **{key: value for key, value in filters.items() if value is not None})
+    try:
+        while True:
+            message = await subscription.next(timeout=Config.SESSION_EVENTS_PING_INTERVAL)
+            # Pings also notice clients that went away while no events were flowing
+            await websocket.send_json(message or {"event": "ping", "at": time.time()})
+            if message is not None and message["event"] == "overflow":
+                await websocket.close(code=1013)
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
+@app.get("/room-pool")
+async def get_room_pool_stats():
+    """Get room pool hit/miss counters and sub-pool sizes."""
+    return room_pool.get_stats()
+
+@app.get("/regions")
+async def get_region_stats():
+    """Get room region rules and per-region room-creation latency, error rate and hedge delay."""
+    return geo_router.get_stats()
+
+@app.get("/pipeline-pool")
+async def get_pipeline_pool_stats():
+    """Get pre-connected model pool counters for sessions run in this process."""
+    return session_manager.pipeline_pool.get_stats()
+
+@app.get("/audio-cache")
+async def get_audio_cache_stats():
+    """Get speech cache counters for sessions run in this process."""
+    return audio_cache.get_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Expose call setup latency histograms and load gauges in Prometheus text format."""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/diagnostics/startup")
+async def get_startup_diagnostics():
+    """Get how long startup took, step by step, including provider and agent imports."""
+    plugin_load_times = {
+        **{f"import provider {name}": seconds for name, seconds in provider_registry.load_times.items()},
+        **{f"import AI agent {name}": seconds for name, seconds in ai_agents.load_times.items()},
+    }
+    return startup_report.get_report(plugin_load_times)
+
+@app.get("/providers")
+async def get_provider_stats():
+    """Get routing rules and per-provider circuit state, latency and error rate."""
+    return provider_router.get_stats()
+
+@app.get("/admission")
+async def get_admission_stats():
+    """Get admission control load, queue depth and rejection counters."""
+    return admission.get_stats()
+
+@app.get("/reaper")
+async def get_reaper_stats():
+    """Get reaped session counts by reason and provider call status callback counts."""
+    return session_reaper.get_stats()
+
+@app.get("/idempotency")
+async def get_idempotency_stats():
+    """Get counters of new, coalesced and replayed call requests."""
+    return idempotency.get_stats()
+
+@app.get("/call-records")
+async def get_call_record_stats():
+    """Get call record queue depth, written and dropped counts and the file being written."""
+    return call_records.get_stats()
+
+@app.get("/turns")
+async def get_turn_latency_stats():
+    """Get turn counts, per-call turn latency of recently ended calls and sampled slow turns."""
+    return turn_latency.get_stats()
+
+@app.get("/turns/{room_id}")
+async def get_call_turn_latency(room_id: str):
+    """Get the turn latency summary of an active or recently ended call."""
+    stats = turn_latency.get_call_stats(room_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No turn latency for room {room_id}")
+    return stats
+
 @app.post("/inbound-call", response_class=PlainTextResponse)
 async def inbound_call(
     request: Request,
-    background_tasks: BackgroundTasks,
     CallSid: str = Form(...),
     From: str = Form(...),
     To: str = Form(...),
@@ -61,41 +387,82 @@ async def inbound_call(
     """
     Handles incoming calls from SIP provider.
     1. Creates a VideoSDK room.
-    2. Creates an AI Agent session for the room.
-    3. Starts the session in a background task.
-    4. Generates TwiML to connect the call to the VideoSDK SIP endpoint.
+    2. Launches an AI Agent session for the room on the session backend.
+    3. Generates TwiML to connect the call to the VideoSDK SIP endpoint.
+    A retry of the webhook for the same CallSid gets the first TwiML back, waiting for it if it is still being set up.
     """
+    received_at = time.monotonic()
+    twiml, outcome = await idempotency.run(
+        "inbound",
+        CallSid,
+        lambda: _answer_inbound_call(CallSid, From, To, received_at),
+        # Error responses are not kept, so a retry after a failure tries again
+        cacheable=lambda response: isinstance(response, str),
+    )
+    if outcome != "new":
+        logger.info(f"Inbound call {CallSid} webhook retried; returning the {outcome} response")
+    return twiml
+
+async def _answer_inbound_call(CallSid: str, From: str, To: str, received_at: float):
+    """Set up an inbound call and return its TwiML, or an error response."""
+    # Inbound webhooks come from the default provider; a provider switch mid-request does not affect this call
+    sip_provider = provider_router.default
     logger.info(f"Inbound call received from {From} to {To}. CallSid: {CallSid}")
 
     try:
-        # Create VideoSDK room
-        room_id = await videosdk_service.create_room()
+        await admission.acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"Rejecting inbound call {CallSid}: {e.reason}")
+        return sip_provider.generate_reject_twiml("busy")
 
-        # Create the AI agent session
-        session = await session_manager.create_session(room_id, "inbound")
-        
-        # Start the session in a background task
-        background_tasks.add_task(session_manager.run_session, session, room_id)
+    launched = False
+    try:
+        # Take a pre-warmed VideoSDK room near the caller (created on demand if the pool is empty)
+        room_id = await room_pool.acquire(number=From)
+        call_timeline.begin(room_id, received_at)
+        telemetry.mark(room_id, "room_created")
+
+        # Create and start the AI agent session on the session backend
+        launched = True
+        await session_manager.launch_session(
+            room_id,
+            "inbound",
+            provider=sip_provider.get_provider_name(),
+            context={"phone_number": From},
+            admitted=True,
+        )
+        session_manager.attach_call(room_id, CallSid)
 
         # Generate TwiML to connect the call to VideoSDK's SIP gateway
         sip_endpoint = videosdk_service.get_sip_endpoint(room_id)
         twiml = sip_provider.generate_twiml(sip_endpoint)
 
         logger.info(f"Responding to {sip_provider.get_provider_name()} inbound call {CallSid} with TwiML to dial SIP: {sip_endpoint}")
+        telemetry.mark(room_id, "twiml_returned")
         return twiml
 
     except HTTPException as e:
         logger.error(f"Failed to handle inbound call {CallSid}: {e.detail}")
-        return PlainTextResponse(f"<Response><Say>An error occurred: {e.detail}</Say></Response>", status_code=500)
+        return PlainTextResponse(sip_provider.generate_say_twiml(f"An error occurred: {e.detail}"), status_code=500)
     except Exception as e:
         logger.error(f"Unhandled error in inbound call {CallSid}: {e}", exc_info=True)
-        return PlainTextResponse("<Response><Say>An unexpected error occurred. Please try again later.</Say></Response>", status_code=500)
+        return PlainTextResponse(sip_provider.generate_say_twiml("An unexpected error occurred. Please try again later."), status_code=500)
+    finally:
+        # Launched sessions give their slot back when they end
+        if not launched:
+            admission.release()
 
 @app.post("/outbound-call")
-async def outbound_call(request_body: OutboundCallRequest, background_tasks: BackgroundTasks):
+async def outbound_call(
+    request_body: OutboundCallRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """
     Initiates an outbound call using SIP provider, connecting to an AI Agent in a VideoSDK room.
+    Requests repeating an `Idempotency-Key` header get the first request's response instead of a second call.
     """
+    received_at = time.monotonic()
     to_number = request_body.to_number
     initial_greeting = request_body.initial_greeting
     logger.info(f"Request to initiate outbound call to: {to_number}")
@@ -103,53 +470,190 @@ async def outbound_call(request_body: OutboundCallRequest, background_tasks: Bac
     if not to_number:
         raise HTTPException(status_code=400, detail="'to_number' is required.")
 
+    if idempotency_key is None:
+        return await _place_outbound_call(to_number, initial_greeting, received_at)
+
     try:
-        # Create VideoSDK room
-        room_id = await videosdk_service.create_room()
-
-        # Create the AI agent session
-        session = await session_manager.create_session(
-            room_id, 
-            "outbound", 
-            initial_greeting
+        call_response, outcome = await idempotency.run(
+            "outbound",
+            idempotency_key,
+            lambda: _place_outbound_call(to_number, initial_greeting, received_at),
+            fingerprint=(to_number, initial_greeting),
         )
-        
-        # Start the session in a background task
-        background_tasks.add_task(session_manager.run_session, session, room_id)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if outcome != "new":
+        logger.info(f"Outbound call request {idempotency_key} repeated; returning the {outcome} response")
+        response.headers["Idempotent-Replayed"] = "true"
+    return call_response
 
-        # Generate TwiML for connecting to SIP endpoint
-        sip_endpoint = videosdk_service.get_sip_endpoint(room_id)
-        twiml = sip_provider.generate_twiml(sip_endpoint)
+async def _place_outbound_call(to_number: str, initial_greeting: Optional[str], received_at: float) -> CallResponse:
+    """Set up an outbound call and place it, raising HTTPException on failure."""
+    try:
+        await admission.acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"Rejecting outbound call to {to_number}: {e.reason}")
+        raise HTTPException(
+            status_code=429 if e.reason == "queue_full" else 503,
+            detail="Server is draining for a restart. Retry later." if e.reason == "draining" else f"Server is at capacity ({e.reason}). Retry later.",
+            headers={"Retry-After": str(int(e.retry_after))},
+        )
 
+    room_id = None
+    launched = False
+    try:
+        # Providers to try, in order, by number prefix rules, weights and health
+        routes = provider_router.plan(to_number)
+
+        # Take a pre-warmed VideoSDK room near the callee (created on demand if the pool is empty)
+        room_id = await room_pool.acquire(number=to_number)
+        call_timeline.begin(room_id, received_at)
+        telemetry.mark(room_id, "room_created")
+
+        # Create and start the AI agent session on the session backend
+        launched = True
+        await session_manager.launch_session(
+            room_id,
+            "outbound",
+            initial_greeting,
+            provider=routes[0].name,
+            context={"phone_number": to_number},
+            admitted=True,
+        )
+
+        sip_endpoint = videosdk_service.get_sip_endpoint(room_id)
         logger.info(f"Outbound call SIP endpoint: {sip_endpoint}")
 
-        # Create the outbound call via SIP provider
-        call_result = sip_provider.initiate_outbound_call(to_number, twiml)
+        # Create the outbound call without blocking the event loop, failing over between providers
+        status_callback = f"{Config.PUBLIC_BASE_URL}/call-status" if Config.PUBLIC_BASE_URL else None
+        call_result = await provider_router.place_call(routes, to_number, sip_endpoint, status_callback)
+        telemetry.mark(room_id, "call_placed")
+        session_manager.attach_call(room_id, call_result["call_sid"])
+        if call_result["provider"] != routes[0].name:
+            session_manager.update_session(room_id, provider=call_result["provider"])
 
-        logger.info(f"Outbound call initiated via {sip_provider.get_provider_name()} to {to_number}. "
+        logger.info(f"Outbound call initiated via {call_result['provider']} to {to_number}. "
                    f"Call SID: {call_result['call_sid']}. VideoSDK Room: {room_id}")
         
         return CallResponse(
             message="Outbound call initiated successfully",
             twilio_call_sid=call_result['call_sid'],
-            videosdk_room_id=room_id
+            videosdk_room_id=room_id,
+            provider=call_result["provider"],
         )
 
+    except NoProviderAvailable as e:
+        logger.error(f"No SIP provider could place outbound call to {to_number}: {e.errors}")
+        await _abandon_outbound_session(room_id, launched)
+        raise HTTPException(status_code=503, detail=f"No SIP provider available: {e.errors}")
     except HTTPException as e:
         logger.error(f"Failed to initiate outbound call to {to_number}: {e.detail}")
+        await _abandon_outbound_session(room_id, launched)
         raise e
     except Exception as e:
         logger.error(f"Unhandled error initiating outbound call to {to_number}: {e}", exc_info=True)
+        await _abandon_outbound_session(room_id, launched)
         raise HTTPException(status_code=500, detail=f"Failed to initiate outbound call: {e}")
 
+async def _abandon_outbound_session(room_id: Optional[str], launched: bool) -> None:
+    """Stop the session of an outbound call that could not be placed, or free its slot."""
+    if not launched:
+        admission.release()
+    elif room_id in session_manager.sessions:
+        await session_manager.stop_session(room_id)
+
+@app.post("/call-status", response_class=PlainTextResponse)
+async def call_status(
+    request: Request,
+    CallSid: str = Form(...),
+    CallStatus: str = Form(...),
+):
+    """Receives call status callbacks from the SIP provider and stops the sessions of calls that ended."""
+    # Signed for the callback URL given when placing the call, which may differ from what a proxy forwards
+    url = f"{Config.PUBLIC_BASE_URL}/call-status" if Config.PUBLIC_BASE_URL else str(request.url)
+    if not provider_router.validate_request(url, await request.form(), request.headers):
+        logger.warning(f"Rejected call status callback for {CallSid} with an invalid signature")
+        raise HTTPException(status_code=403, detail="Invalid request signature")
+    logger.info(f"Call {CallSid} status: {CallStatus}")
+    # Campaigns record the outcome first; they stop their own unanswered calls
+    await campaign_scheduler.handle_call_status(CallSid, CallStatus)
+    await session_reaper.handle_call_status(CallSid, CallStatus)
+    return ""
+
+# --- Campaign Endpoints ---
+
+@app.post("/campaigns", response_model=CampaignStatus)
+async def create_campaign(
+    request: Request,
+    format: str = "csv",
+    name: Optional[str] = None,
+    calls_per_second: float = Config.CAMPAIGN_CALLS_PER_SECOND,
+    max_concurrent: int = Config.CAMPAIGN_MAX_CONCURRENT,
+    max_attempts: int = Config.CAMPAIGN_MAX_ATTEMPTS,
+    providers: Optional[str] = None,
+):
+    """
+    Starts an outbound campaign from a streamed CSV or JSON lines body.
+    Each row needs `to_number` and may set `initial_greeting`. Dialing starts
+    while the upload is still being read. `providers` is a comma-separated
+    list of SIP providers to prefer for the campaign's calls.
+    """
+    if format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail=f"Unsupported campaign format: {format}. Available formats: ['csv', 'jsonl']")
+
+    try:
+        preferred = [provider.strip() for provider in providers.split(",") if provider.strip()] if providers else None
+        campaign = campaign_scheduler.create_campaign(name, calls_per_second, max_concurrent, max_attempts, providers=preferred)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        await campaign_scheduler.ingest(campaign, request.stream(), format)
+    except ValueError as e:
+        logger.error(f"Invalid campaign upload for {campaign.campaign_id}: {e}")
+        campaign_scheduler.cancel(campaign)
+        raise HTTPException(status_code=400, detail=f"Invalid campaign data: {e}")
+
+    logger.info(f"Campaign {campaign.campaign_id} loaded with {campaign.counts['total']} rows")
+    return campaign.get_status()
+
+@app.get("/campaigns", response_model=List[CampaignStatus])
+async def list_campaigns():
+    """Get progress for all campaigns."""
+    return [campaign.get_status() for campaign in campaign_scheduler.campaigns.values()]
+
+@app.get("/campaigns/{campaign_id}", response_model=CampaignStatus)
+async def get_campaign(campaign_id: str):
+    """Get progress for one campaign."""
+    return _get_campaign_or_404(campaign_id).get_status()
+
+@app.post("/campaigns/{campaign_id}/{action}", response_model=CampaignStatus)
+async def control_campaign(campaign_id: str, action: str):
+    """Pause, resume or cancel a campaign."""
+    campaign = _get_campaign_or_404(campaign_id)
+    actions = {
+        "pause": campaign_scheduler.pause,
+        "resume": campaign_scheduler.resume,
+        "cancel": campaign_scheduler.cancel,
+    }
+    if action not in actions:
+        raise HTTPException(status_code=400, detail=f"Unsupported campaign action: {action}. Available actions: {list(actions.keys())}")
+    actions[action](campaign)
+    return campaign.get_status()
+
+def _get_campaign_or_404(campaign_id: str):
+    campaign = campaign_scheduler.get_campaign(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail=f"Campaign not found: {campaign_id}")
+    return campaign
+
 # --- Configuration Endpoints ---
 
 @app.post("/configure-provider")
 async def configure_provider(provider_name: str):
-    """Configure the SIP provider to use."""
-    global sip_provider
+    """Configure the SIP provider that answers inbound calls, adding it to outbound routing if new."""
     try:
-        sip_provider = get_provider(provider_name)
+        provider_router.set_default(provider_name)
         logger.info(f"SIP provider changed to: {provider_name}")
         return {"message": f"Provider changed to {provider_name}"}
     except ValueError as e:
@@ -1,4 +1,45 @@
 from .videosdk_service import VideoSDKService
+from .room_pool import RoomPool
+from .geo_router import GeoRouter
+from .session_backend import SessionBackend, InProcessSessionBackend, ProcessSessionBackend
+from .session_registry import SessionRegistry, InMemorySessionRegistry, SQLiteSessionRegistry
 from .session_manager import SessionManager
+from .session_reaper import SessionReaper
+from .campaign import CampaignScheduler
+from .admission import AdmissionController, AdmissionRejected
+from .idempotency import IdempotencyCache, IdempotencyConflict
+from .metrics import MetricsRegistry
+from .call_timeline import CallTimeline
+from .turn_latency import TurnLatency
+from .call_records import CallRecordSink
+from .appointments import AppointmentStore
+from .drain import DrainController
+from .startup_report import StartupReport
+from .session_events import SessionEventStream
 
-__all__ = ["VideoSDKService", "SessionManager"] 
\ No newline at end of file
+__all__ = [
+    "VideoSDKService",
+    "RoomPool",
+    "GeoRouter",
+    "SessionBackend",
+    "InProcessSessionBackend",
+    "ProcessSessionBackend",
+    "SessionRegistry",
+    "InMemorySessionRegistry",
+    "SQLiteSessionRegistry",
+    "SessionManager",
+    "SessionReaper",
+    "CampaignScheduler",
+    "AdmissionController",
+    "AdmissionRejected",
+    "IdempotencyCache",
+    "IdempotencyConflict",
+    "MetricsRegistry",
+    "CallTimeline",
+    "TurnLatency",
+    "CallRecordSink",
+    "AppointmentStore",
+    "DrainController",
+    "StartupReport",
+    "SessionEventStream",
+]
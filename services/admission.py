@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Any
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Call rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Caps concurrent sessions, with an optional short wait queue in front of the cap."""
+
+    def __init__(
+        self,
+        max_active: int = Config.ADMISSION_MAX_ACTIVE_SESSIONS,
+        max_queue: int = Config.ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = Config.ADMISSION_QUEUE_TIMEOUT,
+        retry_after: float = Config.ADMISSION_RETRY_AFTER,
+    ):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        # Closed while the node drains: every new call is rejected
+        self.closed = False
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats: Dict[str, int] = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "rejected_draining": 0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> None:
+        """Take a session slot, waiting in the queue up to the deadline. Raises AdmissionRejected."""
+        if self.closed:
+            self.stats["rejected_draining"] += 1
+            raise AdmissionRejected("draining", self.retry_after)
+
+        if self.max_active <= 0 or (self.active < self.max_active and not self.queue_depth):
+            self.active += 1
+            self.stats["admitted"] += 1
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            logger.warning(f"Admission rejected: {self.active} active sessions and {self.queue_depth} queued")
+            raise AdmissionRejected("queue_full", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                if not waiter.cancelled() and waiter.exception() is None:
+                    # A slot was handed over just as the deadline passed
+                    return
+                # Closed just as the deadline passed: result() re-raises the waiter's exception
+                self.stats["rejected_draining"] += 1
+                waiter.result()
+            waiter.cancel()
+            self.stats["rejected_timeout"] += 1
+            logger.warning(f"Admission rejected after waiting {self.queue_timeout}s in queue")
+            raise AdmissionRejected("timeout", self.retry_after)
+        except AdmissionRejected:
+            # Closed while waiting
+            self.stats["rejected_draining"] += 1
+            raise
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+
+    def release(self) -> None:
+        """Return a slot, handing it straight to the oldest queued caller if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.stats["admitted"] += 1
+                return
+        self.active = max(0, self.active - 1)
+
+    def close(self) -> None:
+        """Reject new calls, and the calls waiting in the queue, until reopened. Admitted sessions keep their slots."""
+        self.closed = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(AdmissionRejected("draining", self.retry_after))
+
+    def open(self) -> None:
+        self.closed = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return current load, queue depth and rejection counters."""
+        return {
+            **self.stats,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "max_active": self.max_active,
+            "max_queue": self.max_queue,
+            "closed": self.closed,
+        }
@@ -0,0 +1,271 @@
+import os
+import csv
+import time
+import sqlite3
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from config import Config
+from .geo_router import normalize_number
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FORMATS = {".csv": "csv", ".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite"}
+# Columns a source must have; any others (patient_name, doctor, location...) are kept on the record
+REQUIRED_FIELDS = ("appointment_id", "phone_number", "appointment_at")
+# Columns written back when a caller confirms or reschedules
+UPDATE_FIELDS = ("appointment_id", "status", "appointment_at", "updated_at")
+INACTIVE_STATUSES = {"cancelled", "canceled", "completed", "no_show"}
+# Longest wait before retrying a write-back that failed
+MAX_RETRY_DELAY = 60.0
+
+def normalize_phone(number: Optional[str], default_country_code: str = Config.APPOINTMENTS_DEFAULT_COUNTRY_CODE) -> str:
+    """Reduce a phone number to E.164 form, assuming `default_country_code` for national numbers."""
+    number = normalize_number(number or "")
+    if not number or number.startswith("+"):
+        return number
+    if number.startswith("00"):
+        return "+" + number[2:]
+    return default_country_code + number.lstrip("0")
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse an appointment time in ISO 8601 form, e.g. "2025-06-05T11:00" or "2025-06-12T14:30:00Z". Times with an
+    offset are converted to naive local time, so they compare with the naive times of the source.
+    """
+    at = datetime.fromisoformat(value.strip())
+    if at.tzinfo is not None:
+        at = at.astimezone().replace(tzinfo=None)
+    return at
+
+class AppointmentStore:
+    """
+    Appointments loaded from a CSV file or SQLite database and indexed in memory by normalized phone number.
+
+    Lookups never touch the source, so a session can fetch the caller's appointment before its greeting. Confirmations
+    and reschedules apply to the index at once and are written back by a background task, in a worker thread, once
+    `flush_interval` seconds have passed or `batch_size` updates are waiting. A batch that cannot be written is
+    retried, after a delay that doubles up to MAX_RETRY_DELAY. SQLite sources are updated in place; CSV sources get the
+    updates appended to a "<name>.updates.csv" file next to them, which is replayed on load.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.APPOINTMENTS_PATH,
+        table: str = Config.APPOINTMENTS_TABLE,
+        default_country_code: str = Config.APPOINTMENTS_DEFAULT_COUNTRY_CODE,
+        flush_interval: float = Config.APPOINTMENTS_FLUSH_INTERVAL,
+        batch_size: int = Config.APPOINTMENTS_BATCH_SIZE,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.path = path or None
+        self.source_format: Optional[str] = None
+        if self.path is not None:
+            extension = os.path.splitext(self.path)[1].lower()
+            if extension not in SOURCE_FORMATS:
+                raise ValueError(f"Unsupported appointment source: {self.path}. Available formats: {list(SOURCE_FORMATS)}")
+            self.source_format = SOURCE_FORMATS[extension]
+        self.table = table
+        self.default_country_code = default_country_code
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.loaded = False
+        # Normalized phone number -> that number's appointments, earliest first
+        self._by_phone: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_now = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        # Seconds before the next attempt while write-back is failing
+        self._retry_delay: Optional[float] = None
+        self._stopping = False
+        # Columns of a SQLite source, so updated_at is only written where the table has it
+        self._columns: List[str] = []
+        self.stats: Dict[str, int] = {"lookups": 0, "hits": 0, "updates": 0, "written": 0, "batches": 0, "write_errors": 0}
+        self.updates = registry.counter(
+            "appointment_updates_total",
+            "Appointment changes made by callers, by action.",
+            ("action",),
+        )
+
+    @property
+    def updates_path(self) -> Optional[str]:
+        if self.source_format != "csv":
+            return None
+        return f"{os.path.splitext(self.path)[0]}.updates.csv"
+
+    async def start(self) -> None:
+        """Load and index the source, off the event loop."""
+        if self.path is None or self.loaded:
+            return
+        started = time.perf_counter()
+        await asyncio.to_thread(self.load)
+        logger.info(
+            f"Loaded {len(self._by_id)} appointments for {len(self._by_phone)} phone numbers from {self.path} "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    async def stop(self) -> None:
+        """Write back every pending update."""
+        if self._writer is not None:
+            self._stopping = True
+            self._flush_now.set()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._stopping = False
+
+    def load(self) -> None:
+        rows = self._read_sqlite() if self.source_format == "sqlite" else self._read_csv()
+        by_phone: Dict[str, List[Dict[str, Any]]] = {}
+        by_id: Dict[str, Dict[str, Any]] = {}
+        skipped = 0
+        for row in rows:
+            record = {key: value for key, value in row.items() if value not in (None, "")}
+            try:
+                # SQLite columns may hold numbers, so every required value is read as text
+                record["appointment_id"] = str(record["appointment_id"])
+                record["phone_number"] = normalize_phone(str(record["phone_number"]), self.default_country_code)
+                record["appointment_at"] = str(record["appointment_at"])
+                parse_time(record["appointment_at"])
+            except (KeyError, ValueError):
+                skipped += 1
+                continue
+            by_id[record["appointment_id"]] = record
+        for update in self._read_csv_updates():
+            record = by_id.get(update.get("appointment_id"))
+            if record is not None:
+                record.update({key: value for key, value in update.items() if value})
+        for record in by_id.values():
+            by_phone.setdefault(record["phone_number"], []).append(record)
+        for appointments in by_phone.values():
+            appointments.sort(key=lambda record: parse_time(record["appointment_at"]))
+        if skipped:
+            logger.warning(f"Skipped {skipped} appointments in {self.path} without a valid {', '.join(REQUIRED_FIELDS)}")
+        self._by_phone, self._by_id = by_phone, by_id
+        self.loaded = True
+
+    def _read_csv(self) -> List[Dict[str, Any]]:
+        with open(self.path, newline="", encoding="utf-8") as source:
+            return list(csv.DictReader(source))
+
+    def _read_csv_updates(self) -> List[Dict[str, Any]]:
+        if self.updates_path is None or not os.path.exists(self.updates_path):
+            return []
+        with open(self.updates_path, newline="", encoding="utf-8") as updates:
+            return list(csv.DictReader(updates))
+
+    def _read_sqlite(self) -> List[Dict[str, Any]]:
+        db = sqlite3.connect(self.path, timeout=5)
+        db.row_factory = sqlite3.Row
+        try:
+            self._columns = [row["name"] for row in db.execute(f'PRAGMA table_info("{self.table}")')]
+            return [dict(row) for row in db.execute(f'SELECT * FROM "{self.table}"')]
+        finally:
+            db.close()
+
+    def lookup(self, phone_number: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the caller's next active appointment, or their latest one if none is upcoming."""
+        self.stats["lookups"] += 1
+        appointments = self._by_phone.get(normalize_phone(phone_number, self.default_country_code))
+        if not appointments:
+            return None
+        now = datetime.now()
+        active = [record for record in appointments if record.get("status", "").lower() not in INACTIVE_STATUSES]
+        upcoming = [record for record in active if parse_time(record["appointment_at"]) >= now]
+        record = upcoming[0] if upcoming else (active or appointments)[-1]
+        self.stats["hits"] += 1
+        return dict(record)
+
+    def get(self, appointment_id: str) -> Optional[Dict[str, Any]]:
+        record = self._by_id.get(appointment_id)
+        return dict(record) if record is not None else None
+
+    def confirm(self, appointment_id: str) -> Dict[str, Any]:
+        """Mark an appointment confirmed. Returns the updated appointment."""
+        return self._update(appointment_id, "confirmed", status="confirmed")
+
+    def reschedule(self, appointment_id: str, new_time: str) -> Dict[str, Any]:
+        """Move an appointment to `new_time` (ISO 8601). Raises ValueError for an unreadable time."""
+        appointment_at = parse_time(new_time).isoformat(timespec="minutes")
+        return self._update(appointment_id, "rescheduled", status="rescheduled", appointment_at=appointment_at)
+
+    def _update(self, appointment_id: str, action: str, **fields: Any) -> Dict[str, Any]:
+        record = self._by_id.get(appointment_id)
+        if record is None:
+            raise KeyError(f"Unknown appointment: {appointment_id}")
+        record.update(fields, updated_at=datetime.now().isoformat(timespec="seconds"))
+        if "appointment_at" in fields:
+            self._by_phone[record["phone_number"]].sort(key=lambda item: parse_time(item["appointment_at"]))
+        self._pending.append({field: record.get(field) for field in UPDATE_FIELDS})
+        self.stats["updates"] += 1
+        self.updates.inc(action=action)
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(self._write_updates())
+        if len(self._pending) >= self.batch_size and self._retry_delay is None:
+            self._flush_now.set()
+        return dict(record)
+
+    async def _write_updates(self) -> None:
+        """Write back pending updates in batches, collecting those that arrive within the flush interval."""
+        try:
+            while self._pending:
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), self._retry_delay or self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_now.clear()
+                updates, self._pending = self._pending, []
+                try:
+                    await asyncio.to_thread(self._write_batch, updates)
+                except (OSError, sqlite3.Error) as e:
+                    self.stats["write_errors"] += 1
+                    # Keep the failed updates ahead of any that arrived meanwhile
+                    self._pending[:0] = updates
+                    if self._stopping:
+                        logger.error(f"Could not write {len(self._pending)} appointment updates to {self.path} before shutdown: {e}")
+                        return
+                    self._retry_delay = min(2 * (self._retry_delay or self.flush_interval), MAX_RETRY_DELAY)
+                    logger.error(
+                        f"Could not write {len(updates)} appointment updates to {self.path}, retrying in "
+                        f"{self._retry_delay:.0f}s: {e}"
+                    )
+                    continue
+                self._retry_delay = None
+                self.stats["written"] += len(updates)
+                self.stats["batches"] += 1
+        finally:
+            self._writer = None
+
+    def _write_batch(self, updates: List[Dict[str, Any]]) -> None:
+        if self.source_format == "sqlite":
+            db = sqlite3.connect(self.path, timeout=5)
+            try:
+                fields = [field for field in UPDATE_FIELDS[1:] if field != "updated_at" or field in self._columns]
+                with db:
+                    db.executemany(
+                        f'UPDATE "{self.table}" SET {", ".join(f"{field} = ?" for field in fields)} WHERE appointment_id = ?',
+                        [(*(update[field] for field in fields), update["appointment_id"]) for update in updates],
+                    )
+            finally:
+                db.close()
+            return
+        new_file = not os.path.exists(self.updates_path)
+        with open(self.updates_path, "a", newline="", encoding="utf-8") as target:
+            writer = csv.DictWriter(target, fieldnames=UPDATE_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(updates)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.path,
+            "format": self.source_format,
+            "appointments": len(self._by_id),
+            "phone_numbers": len(self._by_phone),
+            **self.stats,
+            "pending": len(self._pending),
+            "retry_in_seconds": self._retry_delay,
+        }
+
+appointment_store = AppointmentStore()
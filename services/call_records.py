@@ -0,0 +1,331 @@
+import os
+import zlib
+import json
+import time
+import asyncio
+import logging
+import importlib.util
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+from config import Config
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl.gz", "parquet")
+QUEUE_POLICIES = ("drop", "block")
+GZIP_LEVEL = 6
+# zlib window bits that select the gzip container
+GZIP_WBITS = 31
+
+# Columns of a call record, with their Parquet types. The transcript is stored as a JSON string.
+CALL_RECORD_FIELDS = (
+    ("room_id", "string"),
+    ("call_sid", "string"),
+    ("call_type", "string"),
+    ("provider", "string"),
+    ("agent", "string"),
+    ("node_id", "string"),
+    ("worker", "int64"),
+    ("status", "string"),
+    ("outcome", "string"),
+    ("end_reason", "string"),
+    ("created_at", "float64"),
+    ("ended_at", "float64"),
+    ("duration_seconds", "float64"),
+    ("caller_joined_seconds", "float64"),
+    ("first_audio_seconds", "float64"),
+    ("transcript", "string"),
+)
+
+class CallRecordSink:
+    """
+    Writes a record of every call (identifiers, provider, timings, outcome and transcript) to rotating files.
+
+    Records are built from SessionManager events and queued without waiting. A background task writes them in batches
+    of up to `batch_size`, or whatever has arrived `flush_interval` seconds after the first record of a batch, in a
+    worker thread so the event loop never touches the disk. When the queue is full, the "drop" policy discards the
+    new record and "block" holds it until the writer catches up. Files rotate after `rotate_bytes` or `rotate_seconds`.
+
+    "jsonl.gz" appends each batch as its own gzip member, so a file is readable up to the last finished batch even
+    while it is written. "parquet" writes a row group per batch and is readable once the file rotates; it needs
+    pyarrow. Values JSON cannot encode are written as strings; a record that still cannot be written is skipped and
+    counted as invalid, without losing the rest of its batch.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = Config.CALL_RECORDS_ENABLED,
+        directory: str = Config.CALL_RECORDS_DIR,
+        file_format: str = Config.CALL_RECORDS_FORMAT,
+        queue_size: int = Config.CALL_RECORDS_QUEUE_SIZE,
+        queue_policy: str = Config.CALL_RECORDS_QUEUE_POLICY,
+        batch_size: int = Config.CALL_RECORDS_BATCH_SIZE,
+        flush_interval: float = Config.CALL_RECORDS_FLUSH_INTERVAL,
+        rotate_bytes: int = Config.CALL_RECORDS_ROTATE_BYTES,
+        rotate_seconds: float = Config.CALL_RECORDS_ROTATE_SECONDS,
+        node_id: str = Config.NODE_ID,
+        registry: MetricsRegistry = metrics,
+    ):
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported call record format: {file_format}. Available formats: {list(FORMATS)}")
+        if queue_policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unsupported call record queue policy: {queue_policy}. Available policies: {list(QUEUE_POLICIES)}")
+        if file_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            logger.warning("CALL_RECORDS_FORMAT is parquet but the 'pyarrow' package is not installed. Falling back to jsonl.gz.")
+            file_format = "jsonl.gz"
+        self.enabled = enabled
+        self.directory = directory
+        self.file_format = file_format
+        self.queue_policy = queue_policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.node_id = node_id
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._blocked: Set[asyncio.Task] = set()
+        self._batch_ready = asyncio.Event()
+        self._stopping = False
+        # room_id -> monotonic times of "created" and of the telemetry stages a record reports
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+        # Current file, touched only by the writer thread
+        self._path: Optional[str] = None
+        self._opened_at = 0.0
+        self._sequence = 0
+        self._parquet_writer = None
+
+        self.stats: Dict[str, int] = {
+            "queued": 0, "written": 0, "dropped": 0, "invalid": 0, "batches": 0, "files": 0, "write_errors": 0,
+        }
+        self.records = registry.counter(
+            "call_records_total",
+            "Call records by whether they were written, dropped or skipped as invalid.",
+            ("outcome",),
+        )
+        self.flush_seconds = registry.histogram(
+            "call_record_flush_seconds",
+            "Seconds to write a batch of call records, spent in a worker thread.",
+        )
+
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Writing call records to {self.directory} as {self.file_format}")
+
+    async def stop(self) -> None:
+        """Write everything queued, then close the current file."""
+        if self._task is None:
+            return
+        if self._blocked:
+            await asyncio.gather(*self._blocked, return_exceptions=True)
+        self._stopping = True
+        self._batch_ready.set()
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        await asyncio.to_thread(self._close_file)
+
+    def on_session_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """SessionManager listener: queue a call record when a session ends."""
+        if not self.enabled:
+            return
+        if event == "created":
+            self._timings[room_id] = {"created": time.monotonic()}
+        elif event == "ended":
+            self.submit(self.build_record(room_id, record, self._timings.pop(room_id, {})))
+
+    def on_stage(self, room_id: str, stage: str, at: float) -> None:
+        """Telemetry sink: when the caller joined and when the agent's first audio went out."""
+        timings = self._timings.get(room_id)
+        if timings is not None and stage in ("caller_joined", "first_audio"):
+            timings.setdefault(stage, at)
+
+    def build_record(self, room_id: str, record: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+        created_at = record.get("created_at")
+        ended_at = time.time()
+        status = record.get("status")
+        end_reason = record.get("end_reason")
+        created = timings.get("created")
+
+        def since_created(stage: str) -> Optional[float]:
+            at = timings.get(stage)
+            return round(at - created, 3) if at is not None and created is not None else None
+
+        return {
+            "room_id": room_id,
+            "call_sid": record.get("call_sid"),
+            "call_type": record.get("call_type"),
+            "provider": record.get("provider"),
+            "agent": record.get("agent_type"),
+            "node_id": record.get("node_id"),
+            "worker": record.get("worker"),
+            "status": status,
+            "outcome": end_reason or ("error" if status == "error" else "completed"),
+            "end_reason": end_reason,
+            "created_at": created_at,
+            "ended_at": ended_at,
+            "duration_seconds": round(ended_at - created_at, 3) if created_at is not None else None,
+            "caller_joined_seconds": since_created("caller_joined"),
+            "first_audio_seconds": since_created("first_audio"),
+            "transcript": record.get("transcript") or [],
+        }
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record without waiting. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if self.queue_policy == "drop":
+                self.stats["dropped"] += 1
+                self.records.inc(outcome="dropped")
+                if self.stats["dropped"] % 1000 == 1:
+                    logger.warning(f"Call record queue is full, dropped {self.stats['dropped']} records so far")
+                return False
+            task = asyncio.get_running_loop().create_task(self._queue.put(record))
+            self._blocked.add(task)
+            task.add_done_callback(self._blocked.discard)
+        self.stats["queued"] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            record = await self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            # Wake once for a full batch or the deadline, not once per record
+            while not self._stopping and self._queue.qsize() + 1 < self.batch_size:
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            stopping = False
+            while len(batch) < self.batch_size and not self._queue.empty():
+                record = self._queue.get_nowait()
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            invalid = await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            self.stats["dropped"] += len(batch)
+            self.records.inc(len(batch), outcome="dropped")
+            logger.error(f"Could not write {len(batch)} call records to {self._path}: {e}", exc_info=True)
+            return
+        self.flush_seconds.observe(time.perf_counter() - started)
+        self.stats["written"] += len(batch) - invalid
+        self.stats["batches"] += 1
+        self.records.inc(len(batch) - invalid, outcome="written")
+        if invalid:
+            self.stats["invalid"] += invalid
+            self.records.inc(invalid, outcome="invalid")
+
+    def _skip_invalid(self, record: Dict[str, Any], error: Exception) -> None:
+        logger.error(f"Skipped call record of room {record.get('room_id')} that could not be written: {error}")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Append a batch to the current file, rotating first if it is too old. Returns the number of records skipped as
+        invalid. Runs in a worker thread.
+        """
+        if self._path is not None and time.monotonic() - self._opened_at >= self.rotate_seconds:
+            self._close_file()
+        if self._path is None:
+            self._open_file()
+        invalid = 0
+        if self.file_format == "parquet":
+            invalid = self._write_parquet(batch)
+        else:
+            # One gzip member per batch, built a record at a time: encoding holds the GIL, so it is handed back to
+            # the event loop between records rather than held for a whole batch
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+            chunks = []
+            for record in batch:
+                try:
+                    line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+                except (TypeError, ValueError) as e:
+                    invalid += 1
+                    self._skip_invalid(record, e)
+                    continue
+                chunks.append(compressor.compress(line.encode("utf-8")))
+                time.sleep(0)
+            chunks.append(compressor.flush())
+            with open(self._path, "ab") as records:
+                records.writelines(chunks)
+        if os.path.getsize(self._path) >= self.rotate_bytes:
+            self._close_file()
+        return invalid
+
+    def _open_file(self) -> None:
+        self._sequence += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._path = os.path.join(self.directory, f"calls-{self.node_id}-{stamp}-{self._sequence:04d}.{self.file_format}")
+        self._opened_at = time.monotonic()
+        self.stats["files"] += 1
+
+    def _write_parquet(self, batch: List[Dict[str, Any]]) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in CALL_RECORD_FIELDS])
+        rows = []
+        for record in batch:
+            row = {name: record.get(name) for name, _ in CALL_RECORD_FIELDS}
+            try:
+                row["transcript"] = json.dumps(record.get("transcript") or [], default=str)
+            except (TypeError, ValueError) as e:
+                self._skip_invalid(record, e)
+                continue
+            rows.append(row)
+        try:
+            table = pa.Table.from_pylist(rows, schema=schema)
+        except (TypeError, ValueError, pa.ArrowException):
+            # Convert the rows one at a time to find those that do not fit the schema
+            valid = []
+            for row in rows:
+                try:
+                    pa.Table.from_pylist([row], schema=schema)
+                except (TypeError, ValueError, pa.ArrowException) as e:
+                    self._skip_invalid(row, e)
+                    continue
+                valid.append(row)
+            rows = valid
+            table = pa.Table.from_pylist(rows, schema=schema)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self._path, schema, compression="zstd")
+        self._parquet_writer.write_table(table)
+        return len(batch) - len(rows)
+
+    def _close_file(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        self._path = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            **self.stats,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "queue_policy": self.queue_policy,
+            "blocked": len(self._blocked),
+            "format": self.file_format,
+            "current_file": self._path,
+        }
@@ -0,0 +1,93 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+# Setup stages in the order a call normally reaches them, timed from when the call request was received
+SETUP_STAGES = (
+    "room_created",
+    "session_created",
+    "twiml_returned",
+    "call_placed",
+    "session_started",
+    "on_enter",
+    "first_audio",
+)
+
+class CallTimeline:
+    """Collects per-call setup stage timestamps and turns them into latency histograms."""
+
+    def __init__(self, registry: MetricsRegistry = metrics, max_open: int = 10000):
+        self.max_open = max_open
+        # room_id -> {"started_at", "stages": {stage: monotonic time}, "labels": {...}}
+        self._open: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.stage_seconds = registry.histogram(
+            "call_setup_stage_seconds",
+            "Seconds from receiving a call request to each setup stage.",
+            ("stage", "call_type", "provider", "agent"),
+        )
+        self.setup_seconds = registry.histogram(
+            "call_setup_seconds",
+            "Seconds from receiving a call request to the agent's first audio.",
+            ("call_type", "provider", "agent"),
+        )
+        self.calls = registry.counter(
+            "call_setups_total",
+            "Call setups by whether the agent's first audio was reached.",
+            ("call_type", "provider", "agent", "outcome"),
+        )
+
+    def begin(self, room_id: str, started_at: Optional[float] = None, **labels: Any) -> None:
+        """Open a timeline for a room, starting at the time the call request was received."""
+        if room_id in self._open:
+            self._open[room_id]["labels"].update(labels)
+            return
+        started_at = time.monotonic() if started_at is None else started_at
+        self._open[room_id] = {"started_at": started_at, "stages": {}, "labels": labels}
+        # Bound memory if calls never report an end
+        while len(self._open) > self.max_open:
+            self._open.popitem(last=False)
+
+    def mark(self, room_id: str, stage: str, at: Optional[float] = None) -> None:
+        """Record a stage. Only the first occurrence counts. Reaching first_audio completes the timeline."""
+        timeline = self._open.get(room_id)
+        if timeline is None or stage not in SETUP_STAGES:
+            return
+        timeline["stages"].setdefault(stage, time.monotonic() if at is None else at)
+        if stage == "first_audio":
+            self.finish(room_id)
+
+    def on_session_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """SessionManager listener: label timelines from session records and close them when sessions end."""
+        if event == "created":
+            self.begin(
+                room_id,
+                call_type=record.get("call_type"),
+                provider=record.get("provider"),
+                agent=record.get("agent_type"),
+            )
+        elif event == "ended":
+            self.finish(room_id)
+
+    def finish(self, room_id: str) -> None:
+        """Close a timeline and record its stages."""
+        timeline = self._open.pop(room_id, None)
+        if timeline is None:
+            return
+        labels = timeline["labels"]
+        started_at = timeline["started_at"]
+        stages = timeline["stages"]
+        for stage, at in stages.items():
+            self.stage_seconds.observe(max(0.0, at - started_at), stage=stage, **labels)
+
+        completed = "first_audio" in stages
+        if completed:
+            self.setup_seconds.observe(max(0.0, stages["first_audio"] - started_at), **labels)
+        self.calls.inc(outcome="completed" if completed else "incomplete", **labels)
+        logger.debug(
+            f"Call setup timeline for room {room_id}: "
+            + ", ".join(f"{stage}=+{(at - started_at) * 1000:.0f}ms" for stage, at in sorted(stages.items(), key=lambda item: item[1]))
+        )
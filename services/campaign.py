@@ -0,0 +1,403 @@
+import csv
+import json
+import time
+import uuid
+import heapq
+import random
+import asyncio
+import codecs
+import logging
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Any, List, Optional, Set, Tuple
+from config import Config
+from models import CampaignStatus
+from providers import ProviderRouter
+from .admission import AdmissionController, AdmissionRejected
+from . import telemetry
+from .room_pool import RoomPool
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+# Provider call statuses that end a call attempt without a conversation
+RETRYABLE_CALL_STATUSES = {"busy", "no-answer"}
+FAILED_CALL_STATUSES = {"failed", "canceled"}
+# Session end reasons that mean the callee never answered; the provider sends no status callback for these
+NO_ANSWER_END_REASONS = {"join_timeout"}
+
+class TokenBucket:
+    """Async token bucket that paces acquisitions to a fixed rate."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    remainder = ""
+    async for chunk in chunks:
+        remainder += decoder.decode(chunk)
+        *lines, remainder = remainder.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield remainder.rstrip("\r")
+
+async def parse_rows(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Dict[str, Any]]:
+    """Parse CSV (with a header row) or JSON lines into campaign rows. Quoted CSV fields may span lines."""
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported campaign format: {fmt}. Available formats: ['csv', 'jsonl']")
+    header: Optional[List[str]] = None
+    # Lines of the CSV record being read; one reader parses them all, once the record's quotes are balanced
+    record_lines: Deque[str] = deque()
+    reader = csv.reader(iter(record_lines.popleft, None))
+    quotes = 0
+    async for line in lines:
+        if not record_lines and not line.strip():
+            continue
+        if fmt == "jsonl":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"Campaign row is not a JSON object: {line}")
+        else:
+            record_lines.append(line + "\n")
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            quotes = 0
+            values = next(reader)
+            if header is None:
+                header = [column.strip() for column in values]
+                continue
+            record = dict(zip(header, values))
+
+        to_number = (record.get("to_number") or "").strip()
+        if not to_number:
+            raise ValueError(f"Campaign row is missing 'to_number': {line}")
+        yield {
+            "to_number": to_number,
+            "initial_greeting": record.get("initial_greeting") or None,
+        }
+    if record_lines:
+        raise ValueError(f"Campaign CSV ends inside a quoted field: {''.join(record_lines)[:200]}")
+
+class Campaign:
+    """State of one outbound campaign: queued rows, retries and progress counters."""
+
+    def __init__(
+        self,
+        name: Optional[str],
+        calls_per_second: float,
+        max_concurrent: int,
+        max_attempts: int,
+        retry_backoff: float,
+        providers: Optional[List[str]] = None,
+    ):
+        self.campaign_id = uuid.uuid4().hex[:12]
+        self.name = name or f"campaign-{self.campaign_id}"
+        self.state = "running"
+        self.created_at = time.time()
+        self.calls_per_second = calls_per_second
+        self.max_concurrent = max_concurrent
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        # SIP providers preferred for this campaign's calls, overriding number prefix rules
+        self.providers = providers
+
+        self.bucket = TokenBucket(calls_per_second)
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.retries: List[Tuple[float, int, Dict[str, Any]]] = []
+        self.loading = True
+        self.in_progress = 0
+        self.counts = {"total": 0, "completed": 0, "failed": 0}
+        self.recent_failures: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self._wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        # Call attempts in progress, kept referenced until they finish
+        self.dials: Set[asyncio.Task] = set()
+
+    def add_row(self, row: Dict[str, Any]) -> None:
+        """Queue a parsed row for dialing."""
+        self.counts["total"] += 1
+        row.update({"row": self.counts["total"], "attempts": 0, "outcome": None})
+        self.pending.append(row)
+        self._wakeup.set()
+
+    def finish_loading(self) -> None:
+        """Mark the upload as complete so the campaign can finish once drained."""
+        self.loading = False
+        self._wakeup.set()
+
+    def schedule_retry(self, row: Dict[str, Any]) -> None:
+        """Queue a row for another attempt after exponential backoff with jitter."""
+        delay = self.retry_backoff * (2 ** (row["attempts"] - 1)) * random.uniform(0.8, 1.2)
+        heapq.heappush(self.retries, (time.monotonic() + delay, row["row"], row))
+        self._wakeup.set()
+
+    def defer(self, row: Dict[str, Any], delay: float) -> None:
+        """Queue a row again after `delay` seconds without using up an attempt."""
+        heapq.heappush(self.retries, (time.monotonic() + delay, row["row"], row))
+        self._wakeup.set()
+
+    def next_row(self) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Return the next row to dial, or None and how long to wait for the next retry."""
+        now = time.monotonic()
+        if self.retries and self.retries[0][0] <= now:
+            return heapq.heappop(self.retries)[2], None
+        if self.pending:
+            return self.pending.popleft(), None
+        return None, (self.retries[0][0] - now if self.retries else None)
+
+    def is_drained(self) -> bool:
+        """Whether every row has reached a final outcome."""
+        return not (self.loading or self.pending or self.retries or self.in_progress)
+
+    async def wait(self, timeout: Optional[float]) -> None:
+        """Sleep until new work arrives, a retry is due or the state changes."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def get_status(self) -> CampaignStatus:
+        """Return a progress snapshot."""
+        return CampaignStatus(
+            campaign_id=self.campaign_id,
+            name=self.name,
+            state=self.state,
+            total=self.counts["total"],
+            pending=len(self.pending),
+            in_progress=self.in_progress,
+            retrying=len(self.retries),
+            completed=self.counts["completed"],
+            failed=self.counts["failed"],
+            calls_per_second=self.calls_per_second,
+            max_concurrent=self.max_concurrent,
+            created_at=self.created_at,
+            providers=self.providers,
+        )
+
+class CampaignScheduler:
+    """Dials campaign rows through the room pool, session manager and SIP provider router."""
+
+    def __init__(
+        self,
+        room_pool: RoomPool,
+        session_manager: SessionManager,
+        router: ProviderRouter,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.room_pool = room_pool
+        self.session_manager = session_manager
+        self.router = router
+        self.admission = admission
+        self.campaigns: Dict[str, Campaign] = {}
+        # call_sid -> (campaign, row, room_id) for status callbacks
+        self._calls: Dict[str, Tuple[Campaign, Dict[str, Any], str]] = {}
+
+    def create_campaign(
+        self,
+        name: Optional[str] = None,
+        calls_per_second: float = Config.CAMPAIGN_CALLS_PER_SECOND,
+        max_concurrent: int = Config.CAMPAIGN_MAX_CONCURRENT,
+        max_attempts: int = Config.CAMPAIGN_MAX_ATTEMPTS,
+        retry_backoff: float = Config.CAMPAIGN_RETRY_BACKOFF,
+        providers: Optional[List[str]] = None,
+    ) -> Campaign:
+        """Create a campaign and start its dialing loop."""
+        if calls_per_second <= 0 or max_concurrent <= 0 or max_attempts <= 0:
+            raise ValueError("calls_per_second, max_concurrent and max_attempts must be positive")
+        if providers:
+            self.router.validate_names(providers)
+
+        campaign = Campaign(name, calls_per_second, max_concurrent, max_attempts, retry_backoff, providers)
+        self.campaigns[campaign.campaign_id] = campaign
+        campaign.task = asyncio.create_task(self._run(campaign), name=f"campaign-{campaign.campaign_id}")
+        logger.info(f"Campaign {campaign.campaign_id} created ({calls_per_second} calls/s, max {max_concurrent} concurrent)")
+        return campaign
+
+    async def ingest(self, campaign: Campaign, chunks: AsyncIterator[bytes], fmt: str) -> None:
+        """Stream rows from an uploaded body into the campaign while it is already dialing."""
+        try:
+            async for row in parse_rows(iter_lines(chunks), fmt):
+                campaign.add_row(row)
+        finally:
+            campaign.finish_loading()
+
+    def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        return self.campaigns.get(campaign_id)
+
+    def pause(self, campaign: Campaign) -> None:
+        if campaign.state == "running":
+            campaign.state = "paused"
+
+    def resume(self, campaign: Campaign) -> None:
+        if campaign.state == "paused":
+            campaign.state = "running"
+            campaign.wake()
+
+    def cancel(self, campaign: Campaign) -> None:
+        """Stop dialing new rows. Calls already in progress are left to finish."""
+        if campaign.state in ("running", "paused"):
+            campaign.state = "cancelled"
+            campaign.wake()
+
+    async def stop(self) -> None:
+        """Stop every campaign's dialing loop and the call attempts in progress."""
+        tasks = [campaign.task for campaign in self.campaigns.values() if campaign.task]
+        tasks += [dial for campaign in self.campaigns.values() for dial in campaign.dials]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, campaign: Campaign) -> None:
+        """Dialing loop: pace rows through the token bucket and concurrency cap."""
+        while campaign.state != "cancelled":
+            if campaign.state == "paused":
+                await campaign.wait(None)
+                continue
+
+            row, retry_in = campaign.next_row()
+            if row is None:
+                if campaign.is_drained():
+                    campaign.state = "completed"
+                    logger.info(f"Campaign {campaign.campaign_id} completed: {campaign.counts}")
+                    return
+                await campaign.wait(retry_in)
+                continue
+
+            await campaign.slots.acquire()
+            await campaign.bucket.acquire()
+            if campaign.state != "running":
+                # Paused or cancelled while waiting for capacity; put the row back
+                campaign.slots.release()
+                campaign.pending.appendleft(row)
+                continue
+
+            campaign.in_progress += 1
+            dial = asyncio.create_task(self._dial(campaign, row))
+            campaign.dials.add(dial)
+            dial.add_done_callback(campaign.dials.discard)
+
+    async def _dial(self, campaign: Campaign, row: Dict[str, Any]) -> None:
+        """Place one call attempt and hold its concurrency slot until the session ends."""
+        if self.admission is not None:
+            try:
+                await self.admission.acquire()
+            except AdmissionRejected as e:
+                # The node is at capacity; try this row again later without counting an attempt
+                logger.info(f"Campaign {campaign.campaign_id} row {row['row']} deferred: {e}")
+                campaign.defer(row, e.retry_after)
+                self._release_slot(campaign)
+                return
+
+        launched = False
+        row["attempts"] += 1
+        row["outcome"] = None
+        room_id: Optional[str] = None
+        call_sid: Optional[str] = None
+
+        try:
+            routes = self.router.plan(row["to_number"], campaign.providers)
+            room_id = await self.room_pool.acquire(number=row["to_number"])
+            launched = True
+            await self.session_manager.launch_session(
+                room_id,
+                "outbound",
+                row["initial_greeting"],
+                provider=routes[0].name,
+                context={"phone_number": row["to_number"]},
+                admitted=self.admission is not None,
+            )
+
+            sip_endpoint = self.room_pool.videosdk_service.get_sip_endpoint(room_id)
+            status_callback = f"{Config.PUBLIC_BASE_URL}/call-status" if Config.PUBLIC_BASE_URL else None
+            call_result = await self.router.place_call(routes, row["to_number"], sip_endpoint, status_callback)
+            telemetry.mark(room_id, "call_placed")
+            if call_result["provider"] != routes[0].name:
+                self.session_manager.update_session(room_id, provider=call_result["provider"])
+
+            call_sid = call_result["call_sid"]
+            self._calls[call_sid] = (campaign, row, room_id)
+            self.session_manager.attach_call(room_id, call_sid)
+            logger.info(f"Campaign {campaign.campaign_id} row {row['row']} dialed {row['to_number']} (attempt {row['attempts']}). Call SID: {call_sid}")
+
+            record = await self.session_manager.wait_for_session_end(room_id)
+            if row["outcome"] is None and (record or {}).get("end_reason") in NO_ANSWER_END_REASONS:
+                row["outcome"] = "no-answer"
+
+            if row["outcome"] in RETRYABLE_CALL_STATUSES or row["outcome"] in FAILED_CALL_STATUSES:
+                raise RuntimeError(f"call ended with status '{row['outcome']}'")
+
+            campaign.counts["completed"] += 1
+
+        except asyncio.CancelledError:
+            if not launched and self.admission is not None:
+                self.admission.release()
+            raise
+        except Exception as e:
+            if not launched and self.admission is not None:
+                self.admission.release()
+            if room_id is not None and room_id in self.session_manager.sessions:
+                await self.session_manager.stop_session(room_id)
+
+            retryable = row["outcome"] not in FAILED_CALL_STATUSES
+            if retryable and row["attempts"] < campaign.max_attempts and campaign.state != "cancelled":
+                logger.warning(f"Campaign {campaign.campaign_id} row {row['row']} attempt {row['attempts']} failed: {e}. Retrying.")
+                campaign.schedule_retry(row)
+            else:
+                logger.error(f"Campaign {campaign.campaign_id} row {row['row']} to {row['to_number']} failed: {e}")
+                campaign.counts["failed"] += 1
+                campaign.recent_failures.append({
+                    "row": row["row"],
+                    "to_number": row["to_number"],
+                    "attempts": row["attempts"],
+                    "error": str(e),
+                })
+
+        finally:
+            if call_sid is not None:
+                self._calls.pop(call_sid, None)
+            self._release_slot(campaign)
+
+    def _release_slot(self, campaign: Campaign) -> None:
+        """Give back a campaign concurrency slot taken by the dialing loop."""
+        campaign.in_progress -= 1
+        campaign.slots.release()
+        campaign.wake()
+
+    async def handle_call_status(self, call_sid: str, call_status: str) -> bool:
+        """Apply a provider status callback. Returns True if the call belongs to a campaign."""
+        entry = self._calls.get(call_sid)
+        if entry is None:
+            return False
+
+        campaign, row, room_id = entry
+        if call_status in RETRYABLE_CALL_STATUSES or call_status in FAILED_CALL_STATUSES:
+            # Nobody will join the room; end the session so the attempt can be retried or failed
+            row["outcome"] = call_status
+            await self.session_manager.stop_session(room_id)
+            logger.info(f"Campaign {campaign.campaign_id} call {call_sid} ended with status {call_status}")
+        return True
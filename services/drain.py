@@ -0,0 +1,251 @@
+import time
+import signal
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from config import Config
+from .admission import AdmissionController
+from .campaign import Campaign, CampaignScheduler
+from .metrics import MetricsRegistry, metrics
+from .room_pool import RoomPool
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+DRAIN_STATES = ("serving", "draining", "drained")
+# Seconds to wait for sessions stopped at the drain deadline to end
+STOP_GRACE = 10.0
+
+class DrainController:
+    """
+    Takes this node out of service for a restart without cutting its calls.
+
+    Draining closes admission, so new inbound calls get a busy signal and outbound requests a 503 with Retry-After.
+    It also pauses running campaigns, stops refilling the room and pipeline pools, and makes the node report not
+    ready, so the load balancer sends new calls elsewhere. Sessions already running are left to finish. Any still
+    running after `timeout` seconds are stopped. A drain starts on SIGTERM when `on_sigterm` is set, and then shuts
+    the server down once it finishes; a second SIGTERM shuts it down at once. A drain started by an operator leaves
+    the server running and can be cancelled.
+    """
+
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        admission: AdmissionController,
+        campaign_scheduler: Optional[CampaignScheduler] = None,
+        room_pool: Optional[RoomPool] = None,
+        timeout: float = Config.DRAIN_TIMEOUT,
+        on_sigterm: bool = Config.DRAIN_ON_SIGTERM,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.session_manager = session_manager
+        self.admission = admission
+        self.campaign_scheduler = campaign_scheduler
+        self.room_pool = room_pool
+        self.timeout = timeout
+        self.on_sigterm = on_sigterm
+        self.state = "serving"
+        self.reason: Optional[str] = None
+        self.exit_when_done = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._started: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self.sessions_at_start = 0
+        self.sessions_ended = 0
+        self.sessions_stopped = 0
+        self._paused_campaigns: List[Campaign] = []
+        self._idle = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # The server's own SIGTERM handler, called to shut down once a drain finishes
+        self._server_handler: Optional[Any] = None
+        self.drains = registry.counter(
+            "drains_total",
+            "Drains of this node, by whether all sessions ended before the deadline.",
+            ("outcome",),
+        )
+
+    def install_signal_handler(self) -> None:
+        """Drain on SIGTERM instead of stopping at once. Call from the server's event loop once it is serving."""
+        if not self.on_sigterm or self._server_handler is not None:
+            return
+        handler = signal.getsignal(signal.SIGTERM)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except (NotImplementedError, RuntimeError, ValueError) as e:
+            logger.warning(f"SIGTERM will stop the server without draining: {e}")
+            return
+        self._server_handler = handler
+
+    def remove_signal_handler(self) -> None:
+        """Give SIGTERM back to the server's own handler."""
+        if self._server_handler is None:
+            return
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+        signal.signal(signal.SIGTERM, self._server_handler)
+        self._server_handler = None
+
+    def _on_sigterm(self) -> None:
+        if self.state == "serving":
+            logger.info("SIGTERM received: draining, then shutting down")
+            self.start("sigterm", exit_when_done=True)
+        elif self.state == "draining" and not self.exit_when_done:
+            logger.info("SIGTERM received: shutting down when the drain finishes")
+            self.exit_when_done = True
+        else:
+            logger.warning("SIGTERM received again: shutting down without waiting for sessions")
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        """Hand SIGTERM to the server, which stops; sessions still running are stopped by its shutdown."""
+        handler = self._server_handler
+        self.remove_signal_handler()
+        if callable(handler):
+            handler(signal.SIGTERM, None)
+        else:
+            signal.raise_signal(signal.SIGTERM)
+
+    def start(self, reason: str = "admin", timeout: Optional[float] = None, exit_when_done: bool = False) -> bool:
+        """Start draining. Returns False if the node is already draining or drained."""
+        if self.state != "serving":
+            return False
+        timeout = self.timeout if timeout is None else timeout
+        self.state = "draining"
+        self.reason = reason
+        self.exit_when_done = exit_when_done
+        self.started_at = time.time()
+        self.finished_at = None
+        self._started = time.monotonic()
+        self._deadline = self._started + timeout
+        self.sessions_at_start = len(self.session_manager.sessions)
+        self.sessions_ended = 0
+        self.sessions_stopped = 0
+        self.admission.close()
+        if self.campaign_scheduler is not None:
+            for campaign in self.campaign_scheduler.campaigns.values():
+                if campaign.state == "running":
+                    self.campaign_scheduler.pause(campaign)
+                    self._paused_campaigns.append(campaign)
+        self._task = asyncio.get_running_loop().create_task(self._run(timeout))
+        logger.warning(
+            f"Draining node {self.session_manager.node_id} ({reason}): {self.sessions_at_start} sessions active, "
+            f"{len(self._paused_campaigns)} campaigns paused, deadline in {timeout:.0f}s"
+        )
+        return True
+
+    async def cancel(self) -> bool:
+        """Return a drained or draining node to service. A drain that will shut the server down cannot be cancelled."""
+        if self.state == "serving" or self.exit_when_done:
+            return False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.state = "serving"
+        self.admission.open()
+        for campaign in self._paused_campaigns:
+            self.campaign_scheduler.resume(campaign)
+        self._paused_campaigns.clear()
+        await self._start_pools()
+        self.drains.inc(outcome="cancelled")
+        logger.info(f"Drain of node {self.session_manager.node_id} cancelled; admitting calls again")
+        return True
+
+    async def stop(self) -> None:
+        """Abandon a drain in progress, for server shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.remove_signal_handler()
+
+    def on_session_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """SessionManager listener: count sessions ending while draining."""
+        if event == "ended" and self.state == "draining":
+            self.sessions_ended += 1
+            remaining = len(self.session_manager.sessions)
+            logger.info(f"Draining: session {room_id} ended, {remaining} left")
+            if not remaining:
+                self._idle.set()
+
+    async def _run(self, timeout: float) -> None:
+        try:
+            await self._stop_pools()
+            outcome = "completed"
+            if not await self._wait_idle(timeout):
+                outcome = "timeout"
+                remaining = list(self.session_manager.sessions)
+                logger.warning(f"Drain deadline passed with {len(remaining)} sessions active; stopping them")
+                stopped = await asyncio.gather(
+                    *(self.session_manager.stop_session(room_id, "drain_timeout") for room_id in remaining),
+                    return_exceptions=True,
+                )
+                self.sessions_stopped = sum(1 for result in stopped if result is True)
+                await self._wait_idle(STOP_GRACE)
+            self.state = "drained"
+            self.finished_at = time.time()
+            self.drains.inc(outcome=outcome)
+            logger.warning(
+                f"Node {self.session_manager.node_id} drained in {time.monotonic() - self._started:.1f}s: "
+                f"{self.sessions_ended} sessions ended, {self.sessions_stopped} stopped at the deadline"
+            )
+        finally:
+            self._task = None
+        if self.exit_when_done:
+            self._shutdown()
+
+    async def _wait_idle(self, timeout: float) -> bool:
+        """Wait until no session of this node is left. Returns False on timeout."""
+        self._idle.clear()
+        if not self.session_manager.sessions:
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return not self.session_manager.sessions
+        return True
+
+    @property
+    def _pipeline_pool(self):
+        # With the process backend, pooled model connections live in the session workers
+        if self.session_manager.backend.get_backend_name() == "inprocess":
+            return self.session_manager.pipeline_pool
+        return None
+
+    async def _stop_pools(self) -> None:
+        # No new session will take a pooled room or model connection
+        if self.room_pool is not None:
+            await self.room_pool.stop()
+        if self._pipeline_pool is not None:
+            await self._pipeline_pool.stop()
+
+    async def _start_pools(self) -> None:
+        if self.room_pool is not None:
+            await self.room_pool.start()
+        if self._pipeline_pool is not None:
+            await self._pipeline_pool.start()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "serving"
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return the drain state and progress."""
+        now = time.time()
+        sessions = list(self.session_manager.sessions.values())
+        draining = self.state == "draining"
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "reason": self.reason,
+            "exit_when_done": self.exit_when_done,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round((self.finished_at or now) - self.started_at, 1) if self.started_at else None,
+            "deadline_in_seconds": round(max(0.0, self._deadline - time.monotonic()), 1) if draining else None,
+            "sessions_at_start": self.sessions_at_start,
+            "sessions_ended": self.sessions_ended,
+            "sessions_stopped": self.sessions_stopped,
+            "active_sessions": len(sessions),
+            "oldest_session_seconds": round(max((now - record.get("created_at", now) for record in sessions), default=0.0), 1),
+            "campaigns_paused": [campaign.campaign_id for campaign in self._paused_campaigns],
+            "rejected_calls": self.admission.stats["rejected_draining"],
+        }
@@ -0,0 +1,131 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from config import Config
+from latency_stats import LatencyStats, DEFAULT_LATENCY
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+_NOT_DIALABLE = re.compile(r"[^\d+]")
+
+def normalize_number(number: str) -> str:
+    """Reduce a phone number or SIP URI user part to "+" and digits, for prefix matching."""
+    if number.startswith("sip:"):
+        number = number[4:].split("@", 1)[0]
+    return _NOT_DIALABLE.sub("", number)
+
+class GeoRouter:
+    """
+    Picks the VideoSDK geo-fence a call's room is created in.
+
+    Candidates come from the longest number prefix in `prefix_routes` (nearest region first), else the default
+    region. The first candidate is used unless its measured room-creation latency, inflated by its error rate,
+    is more than `slow_factor` times that of another candidate. The next candidate, or the same region, takes
+    hedged requests. Latency is measured per region from every room creation, including pool refills.
+    """
+
+    def __init__(
+        self,
+        default_geo_fence: str,
+        regions: Sequence[str] = (),
+        prefix_routes: Optional[Dict[str, List[str]]] = None,
+        slow_factor: float = Config.ROOM_GEO_SLOW_FACTOR,
+        stats_window: float = Config.ROOM_GEO_STATS_WINDOW,
+        hedge_enabled: bool = Config.ROOM_HEDGE_ENABLED,
+        hedge_delay: float = Config.ROOM_HEDGE_DELAY,
+        hedge_percentile: float = Config.ROOM_HEDGE_PERCENTILE,
+        hedge_min_samples: int = Config.ROOM_HEDGE_MIN_SAMPLES,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.default_geo_fence = default_geo_fence
+        self.prefix_routes = dict(Config.ROOM_GEO_ROUTES if prefix_routes is None else prefix_routes)
+        self.slow_factor = slow_factor
+        self.stats_window = stats_window
+        self.hedge_enabled = hedge_enabled
+        self.hedge_delay_default = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        # Prefix index: prefix -> candidate regions, looked up from the longest possible prefix down
+        self._prefixes: Dict[str, List[str]] = {normalize_number(prefix): geos for prefix, geos in self.prefix_routes.items()}
+        self._max_prefix = max((len(prefix) for prefix in self._prefixes), default=0)
+        self.stats: Dict[str, LatencyStats] = {}
+        for region in [default_geo_fence, *regions, *(geo for geos in self._prefixes.values() for geo in geos)]:
+            self._region_stats(region)
+
+        self.create_seconds = registry.histogram(
+            "room_create_seconds",
+            "Seconds to create a VideoSDK room, by geo-fence.",
+            ("region", "outcome"),
+        )
+        self.selections = registry.counter(
+            "room_region_selections_total",
+            "Rooms requested per geo-fence, by why the region was chosen.",
+            ("region", "reason"),
+        )
+
+    def _region_stats(self, region: str) -> LatencyStats:
+        stats = self.stats.get(region)
+        if stats is None:
+            stats = self.stats[region] = LatencyStats(self.stats_window)
+        return stats
+
+    def record(self, region: str, seconds: float, ok: bool) -> None:
+        """Room-creation latency listener for VideoSDKService."""
+        self._region_stats(region).record(seconds, ok)
+        self.create_seconds.observe(seconds, region=region, outcome="ok" if ok else "error")
+
+    def _match(self, number: Optional[str]) -> Optional[List[str]]:
+        if not number:
+            return None
+        number = normalize_number(number)
+        for length in range(min(len(number), self._max_prefix), 0, -1):
+            geos = self._prefixes.get(number[:length])
+            if geos:
+                return geos
+        return None
+
+    def candidates(self, number: Optional[str]) -> List[str]:
+        """Return the regions for a number, nearest first."""
+        return self._match(number) or [self.default_geo_fence]
+
+    def _effective_latency(self, region: str) -> float:
+        stats = self._region_stats(region)
+        latency = stats.latency_ewma if stats.latency_ewma is not None else DEFAULT_LATENCY
+        return latency / max(1.0 - stats.error_rate(), 0.01)
+
+    def select(self, number: Optional[str]) -> Tuple[str, str]:
+        """Return the region to create a call's room in and the region for a hedged request."""
+        matched = self._match(number)
+        candidates = matched or [self.default_geo_fence]
+        primary, reason = candidates[0], "prefix" if matched else "default"
+        fastest = min(candidates, key=self._effective_latency)
+        if self._effective_latency(primary) > self.slow_factor * self._effective_latency(fastest):
+            logger.info(f"Region {primary} is slow ({self._effective_latency(primary) * 1000:.0f}ms), using {fastest}")
+            primary, reason = fastest, "slow_fallback"
+        self.selections.inc(region=primary, reason=reason)
+        hedge = next((geo for geo in candidates if geo != primary), primary)
+        return primary, hedge
+
+    def hedge_delay(self, region: str) -> Optional[float]:
+        """Seconds to wait for a room in `region` before sending a hedged request, or None when hedging is off."""
+        if not self.hedge_enabled:
+            return None
+        stats = self._region_stats(region)
+        if stats.successes() < self.hedge_min_samples:
+            return self.hedge_delay_default
+        return stats.latency_percentile(self.hedge_percentile)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the prefix rules and per-region latency and error rate."""
+        return {
+            "default": self.default_geo_fence,
+            "prefix_routes": self.prefix_routes,
+            "hedge_enabled": self.hedge_enabled,
+            "regions": {region: self._get_region_stats(region) for region in self.stats},
+        }
+
+    def _get_region_stats(self, region: str) -> Dict[str, Any]:
+        delay = self.hedge_delay(region)
+        return {**self.stats[region].get_stats(), "hedge_delay_ms": delay * 1000 if delay is not None else None}
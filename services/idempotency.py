@@ -0,0 +1,96 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from config import Config
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+class IdempotencyConflict(Exception):
+    """Raised when a key is reused for a different request."""
+
+class _Entry:
+    def __init__(self, task: asyncio.Future, fingerprint: Optional[Hashable], expires_at: float):
+        self.task = task
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+class IdempotencyCache:
+    """
+    Runs the work of a request once per key and gives every repeat of the request the same result.
+
+    Repeats that arrive while the work is running wait for it (coalesced); later ones get the stored result
+    (replayed) for `ttl` seconds. The work runs as its own task, so it completes even if the request that
+    started it is cancelled. Failed work, and results `cacheable` rejects, are forgotten once they complete,
+    so the next retry starts over.
+    """
+
+    def __init__(
+        self,
+        ttl: float = Config.IDEMPOTENCY_TTL,
+        max_entries: int = Config.IDEMPOTENCY_MAX_ENTRIES,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Entries share one TTL, so insertion order is expiry order
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.stats: Dict[str, int] = {"new": 0, "coalesced": 0, "replayed": 0, "conflicts": 0, "evicted": 0}
+        self.requests = registry.counter(
+            "idempotent_requests_total",
+            "Requests with an idempotency key, by whether they started work or reused it.",
+            ("scope", "outcome"),
+        )
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            if entry.expires_at > now:
+                self.stats["evicted"] += 1
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        work: Callable[[], Awaitable[Any]],
+        fingerprint: Optional[Hashable] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Return the result of `work` for a key and whether it was "new", "coalesced" or "replayed".
+        Raises IdempotencyConflict if the key was first used with a different `fingerprint`.
+        """
+        self._evict()
+        cache_key = f"{scope}:{key}"
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                self.stats["conflicts"] += 1
+                self.requests.inc(scope=scope, outcome="conflict")
+                raise IdempotencyConflict(f"Idempotency key {key} was already used for a different request")
+            outcome = "replayed" if entry.task.done() else "coalesced"
+        else:
+            entry = _Entry(asyncio.ensure_future(work()), fingerprint, time.monotonic() + self.ttl)
+            self._entries[cache_key] = entry
+            entry.task.add_done_callback(lambda task: self._settle(cache_key, entry, cacheable))
+            outcome = "new"
+
+        self.stats[outcome] += 1
+        self.requests.inc(scope=scope, outcome=outcome)
+        # Shielded so a cancelled request leaves the work running for the others
+        return await asyncio.shield(entry.task), outcome
+
+    def _settle(self, cache_key: str, entry: _Entry, cacheable: Optional[Callable[[Any], bool]]) -> None:
+        task = entry.task
+        keep = not task.cancelled() and task.exception() is None and (cacheable is None or cacheable(task.result()))
+        if not keep and self._entries.get(cache_key) is entry:
+            del self._entries[cache_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._entries), "ttl": self.ttl, "max_entries": self.max_entries}
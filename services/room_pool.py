@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+from config import Config
+from watermark_pool import WatermarkPool
+from .videosdk_service import VideoSDKService
+from .geo_router import GeoRouter
+
+logger = logging.getLogger(__name__)
+
+class RoomPool:
+    """Keeps pre-created VideoSDK rooms ready so calls skip room creation."""
+
+    def __init__(
+        self,
+        videosdk_service: VideoSDKService,
+        geo_fences: Optional[List[str]] = None,
+        low_watermark: int = Config.ROOM_POOL_LOW_WATERMARK,
+        high_watermark: int = Config.ROOM_POOL_HIGH_WATERMARK,
+        room_ttl: float = Config.ROOM_POOL_ROOM_TTL,
+        refill_concurrency: int = Config.ROOM_POOL_REFILL_CONCURRENCY,
+        enabled: bool = Config.ROOM_POOL_ENABLED,
+        geo_router: Optional[GeoRouter] = None,
+    ):
+        self.videosdk_service = videosdk_service
+        self.geo_fences = geo_fences or Config.ROOM_POOL_GEO_FENCES
+        self.default_geo_fence = self.geo_fences[0]
+        # Picks the region per call number and times hedged creations; without it every call uses the default region
+        self.geo_router = geo_router
+
+        # One sub-pool per geo-fence, refilled to the high watermark when it drops below the low watermark
+        self._pool = WatermarkPool("room-pool", low_watermark, high_watermark, room_ttl, refill_concurrency)
+        for geo_fence in self.geo_fences:
+            self._pool.add(geo_fence, lambda geo_fence=geo_fence: self.videosdk_service.create_room(geo_fence))
+        self.enabled = enabled and self._pool.high_watermark > 0
+        self.stats = self._pool.stats
+        self.stats.update(hedged=0, hedge_wins=0, hedge_spares=0)
+
+    @property
+    def low_watermark(self) -> int:
+        return self._pool.low_watermark
+
+    @property
+    def high_watermark(self) -> int:
+        return self._pool.high_watermark
+
+    async def start(self) -> None:
+        """Start one background refill task per geo-fence sub-pool."""
+        if not self.enabled or self._pool.running:
+            return
+        self._pool.start()
+        logger.info(f"Room pool started for geo-fences {self.geo_fences} (low={self.low_watermark}, high={self.high_watermark})")
+
+    async def stop(self) -> None:
+        """Stop the refill tasks. Pooled rooms are left to expire on the VideoSDK side."""
+        await self._pool.stop()
+
+    async def acquire(self, geo_fence: Optional[str] = None, number: Optional[str] = None) -> str:
+        """
+        Return a ready room, falling back to synchronous creation when the sub-pool is empty.
+        Without an explicit `geo_fence`, the region is chosen from the caller or callee `number`.
+        """
+        hedge_geo_fence = None
+        if geo_fence is None and self.geo_router is not None:
+            geo_fence, hedge_geo_fence = self.geo_router.select(number)
+        geo_fence = geo_fence or self.default_geo_fence
+        room_id = self._pool.take(geo_fence)
+        if room_id is not None:
+            logger.info(f"Room {room_id} served from pool ({geo_fence})")
+            return room_id
+
+        hedge_delay = self.geo_router.hedge_delay(geo_fence) if self.geo_router is not None else None
+        if hedge_delay is None:
+            return await self.videosdk_service.create_room(geo_fence)
+        return await self._create_hedged(geo_fence, hedge_geo_fence or geo_fence, hedge_delay)
+
+    async def _create_hedged(self, geo_fence: str, hedge_geo_fence: str, delay: float) -> str:
+        """
+        Create a room, sending a second request to `hedge_geo_fence` if the first takes longer than `delay`.
+        The first room created wins; the other is kept in the pool when it arrives, so hedging wastes no rooms.
+        """
+        primary = asyncio.create_task(self.videosdk_service.create_room(geo_fence))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self.stats["hedged"] += 1
+        hedge = asyncio.create_task(self.videosdk_service.create_room(hedge_geo_fence))
+        regions = {primary: geo_fence, hedge: hedge_geo_fence}
+        pending = set(regions)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if not winners:
+                    error = next(iter(done)).exception()
+                    continue
+                winner = winners[0]
+                if winner is hedge:
+                    self.stats["hedge_wins"] += 1
+                for task in [*winners[1:], *pending]:
+                    task.add_done_callback(lambda task, geo=regions[task]: self._keep_spare(task, geo))
+                pending = set()
+                logger.info(f"Room {winner.result()} created by {'hedged' if winner is hedge else 'first'} request ({regions[winner]})")
+                return winner.result()
+        except asyncio.CancelledError:
+            for task in pending:
+                task.add_done_callback(lambda task, geo=regions[task]: self._keep_spare(task, geo))
+            raise
+        raise error
+
+    def _keep_spare(self, task: asyncio.Task, geo_fence: str) -> None:
+        """Pool the room of a request that lost a hedge, if its region is pooled and has space."""
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self._pool.put(geo_fence, task.result()):
+            self.stats["hedge_spares"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current sub-pool sizes."""
+        return {
+            **self._pool.get_stats(),
+            "enabled": self.enabled,
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+        }
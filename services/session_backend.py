@@ -0,0 +1,236 @@
+import os
+import signal
+import asyncio
+import logging
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+from config import Config
+from . import telemetry
+
+if TYPE_CHECKING:
+    from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+class SessionBackend(ABC):
+    """Base interface for where agent sessions are executed."""
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Prepare the backend to accept sessions."""
+        pass
+
+    @abstractmethod
+    async def launch(self, room_id: str, call_type: str, context: Dict[str, Any], ai_agent_name: str) -> None:
+        """Create and run an agent session for a room."""
+        pass
+
+    @abstractmethod
+    async def stop_session(self, room_id: str) -> None:
+        """Stop a running session."""
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop all sessions and release backend resources."""
+        pass
+
+    @abstractmethod
+    def get_backend_name(self) -> str:
+        """Return the backend name."""
+        pass
+
+class InProcessSessionBackend(SessionBackend):
+    """Runs sessions as tasks on the current event loop. Intended for development."""
+
+    def __init__(self, manager: "SessionManager"):
+        self.manager = manager
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def launch(self, room_id: str, call_type: str, context: Dict[str, Any], ai_agent_name: str) -> None:
+        session = await self.manager.create_session(room_id, call_type, ai_agent_name=ai_agent_name, context=context)
+        task = asyncio.create_task(self.manager.run_session(session, room_id), name=f"session-{room_id}")
+        self._tasks[room_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(room_id, None))
+
+    async def stop_session(self, room_id: str) -> None:
+        task = self._tasks.get(room_id)
+        if task is not None:
+            task.cancel()
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_backend_name(self) -> str:
+        return "inprocess"
+
+def _worker_main(worker_id: int, commands: multiprocessing.Queue, events: multiprocessing.Queue) -> None:
+    """Entry point of a session worker process: one event loop running in-process sessions."""
+    if Config.DRAIN_ON_SIGTERM:
+        # The API process drains and then stops its workers; a SIGTERM sent to the whole process group must not cut calls
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(_worker_loop(worker_id, commands, events))
+
+async def _worker_loop(worker_id: int, commands: multiprocessing.Queue, events: multiprocessing.Queue) -> None:
+    from .session_manager import SessionManager
+
+    # Workers report to the API process, which owns the registry entries
+    manager = SessionManager(backend_name="inprocess", registry_name="memory")
+    manager.add_listener(lambda event, room_id, record: events.put((worker_id, event, room_id, dict(record))))
+    telemetry.add_sink(lambda room_id, stage, at: events.put((worker_id, "telemetry", room_id, {"stage": stage, "at": at})))
+    await manager.start()
+    logger.info(f"Session worker {worker_id} started (pid {os.getpid()})")
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            command = await loop.run_in_executor(None, commands.get)
+            if command is None:
+                break
+
+            operation, payload = command
+            try:
+                if operation == "launch":
+                    await manager.launch_session(**payload)
+                elif operation == "stop_session":
+                    await manager.stop_session(payload["room_id"])
+            except Exception as e:
+                logger.error(f"Session worker {worker_id} failed to {operation} {payload.get('room_id')}: {e}", exc_info=True)
+                events.put((worker_id, "ended", payload.get("room_id"), {"status": "error", "error": str(e)}))
+    finally:
+        await manager.stop()
+        logger.info(f"Session worker {worker_id} stopped")
+
+class ProcessSessionBackend(SessionBackend):
+    """Dispatches sessions to a pool of worker processes, each with its own event loop."""
+
+    def __init__(self, manager: "SessionManager", workers: int = Config.SESSION_WORKERS):
+        self.manager = manager
+        self.workers = max(1, workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.workers
+        self._commands: List[Optional[multiprocessing.Queue]] = [None] * self.workers
+        self._load: List[int] = [0] * self.workers
+        self._placement: Dict[str, int] = {}
+        self._reader: Optional[threading.Thread] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        self._reader = threading.Thread(target=self._read_events, name="session-worker-events", daemon=True)
+        self._reader.start()
+        self._monitor_task = asyncio.create_task(self._monitor_workers())
+        logger.info(f"Started {self.workers} session worker processes")
+
+    def _spawn(self, worker_id: int) -> None:
+        commands = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, commands, self._events),
+            name=f"session-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._commands[worker_id] = commands
+        self._processes[worker_id] = process
+        self._load[worker_id] = 0
+
+    async def launch(self, room_id: str, call_type: str, context: Dict[str, Any], ai_agent_name: str) -> None:
+        record = self.manager.sessions.get(room_id, {})
+        # Least-loaded placement; ties go to the lowest worker id
+        worker_id = min(range(self.workers), key=lambda index: self._load[index])
+        self._load[worker_id] += 1
+        self._placement[room_id] = worker_id
+        self.manager.update_session(room_id, worker=worker_id)
+        self._commands[worker_id].put(("launch", {
+            "room_id": room_id,
+            "call_type": call_type,
+            "context": context,
+            "ai_agent_name": ai_agent_name,
+            "provider": record.get("provider"),
+        }))
+        logger.info(f"Session for room {room_id} dispatched to worker {worker_id} (load {self._load[worker_id]})")
+
+    async def stop_session(self, room_id: str) -> None:
+        worker_id = self._placement.get(room_id)
+        if worker_id is not None:
+            self._commands[worker_id].put(("stop_session", {"room_id": room_id}))
+
+    def _read_events(self) -> None:
+        """Forward lifecycle events from worker processes to the API event loop."""
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_event, *event)
+
+    def _on_event(self, worker_id: int, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        if event == "telemetry":
+            telemetry.mark(room_id, record["stage"], record["at"])
+            return
+        if event == "ended" and self._placement.pop(room_id, None) is not None:
+            self._load[worker_id] = max(0, self._load[worker_id] - 1)
+        self.manager.apply_remote_event(event, room_id, {**record, "worker": worker_id})
+
+    async def _monitor_workers(self) -> None:
+        """Replace dead workers and end the sessions they owned."""
+        while not self._stopping:
+            await asyncio.sleep(2)
+            for worker_id, process in enumerate(self._processes):
+                if self._stopping or process is None or process.is_alive():
+                    continue
+                logger.error(f"Session worker {worker_id} exited with code {process.exitcode}; restarting")
+                for room_id in [room for room, owner in self._placement.items() if owner == worker_id]:
+                    self._on_event(worker_id, "ended", room_id, {"status": "error", "error": "worker exited"})
+                self._spawn(worker_id)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+        for commands in self._commands:
+            if commands is not None:
+                commands.put(None)
+
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, Config.SESSION_WORKER_SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.kill()
+
+        self._events.put(None)
+        logger.info("Session worker processes stopped")
+
+    def get_backend_name(self) -> str:
+        return "process"
+
+    def get_worker_load(self) -> Dict[int, int]:
+        """Return the number of sessions placed on each worker."""
+        return dict(enumerate(self._load))
+
+def create_session_backend(manager: "SessionManager", backend_name: str = Config.SESSION_BACKEND) -> SessionBackend:
+    """Factory function to get the appropriate session backend."""
+    backends = {
+        "inprocess": InProcessSessionBackend,
+        "process": ProcessSessionBackend,
+    }
+
+    if backend_name not in backends:
+        raise ValueError(f"Unsupported session backend: {backend_name}. Available backends: {list(backends.keys())}")
+
+    return backends[backend_name](manager)
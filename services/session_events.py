@@ -0,0 +1,140 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Record fields sent with each event, matching models.SessionInfo
+SESSION_FIELDS = ("room_id", "call_type", "agent_type", "status", "provider", "node_id", "created_at", "worker")
+
+def session_view(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: record.get(field) for field in SESSION_FIELDS}
+
+class Subscription:
+    """The events of one client, in order. Ends with an "overflow" event if the client falls too far behind."""
+
+    def __init__(self, stream: "SessionEventStream", queue_size: int, filters: Dict[str, Any]):
+        self.stream = stream
+        self.filters = filters
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        # Id of the last event handed out, which is where the client should resume
+        self.cursor: Optional[int] = None
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        session = event.get("session") or {}
+        return all(session.get(field) == value for field, value in self.filters.items())
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without waiting. Returns False if the queue is full."""
+        if not self.matches(event):
+            return True
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the next event, or None if none arrives within `timeout` seconds."""
+        if self.overflowed and self.queue.empty():
+            return {"id": self.cursor, "event": "overflow", "at": time.time()}
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.cursor = event["id"]
+        return event
+
+    def close(self) -> None:
+        self.stream.unsubscribe(self)
+
+class SessionEventStream:
+    """
+    Numbered session lifecycle events of this node, kept in a ring buffer and pushed to subscribers.
+
+    Events are created, started, greeting_sent, error, ended and updated. A subscriber that passes the id
+    of the last event it saw gets the buffered events after it; one without a cursor, or whose cursor has
+    left the buffer, starts with a "snapshot" of the current sessions instead. A subscriber whose queue
+    fills is dropped after an "overflow" event and can reconnect from its cursor.
+    """
+
+    def __init__(
+        self,
+        list_sessions: Callable[[], List[Dict[str, Any]]],
+        capacity: int = Config.SESSION_EVENTS_BUFFER,
+        queue_size: int = Config.SESSION_EVENTS_SUBSCRIBER_QUEUE,
+    ):
+        self.list_sessions = list_sessions
+        self.queue_size = queue_size
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._subscribers: Set[Subscription] = set()
+        # room_id -> session view, for events that carry no record of their own
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self.last_id = 0
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, event: str, room_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Number an event, buffer it and queue it for every subscriber."""
+        self.last_id += 1
+        self.published += 1
+        message = {"id": self.last_id, "event": event, "room_id": room_id, "at": time.time(), "session": session}
+        self._buffer.append(message)
+        for subscription in list(self._subscribers):
+            if not subscription.offer(message):
+                self._subscribers.discard(subscription)
+                self.dropped_subscribers += 1
+                logger.warning(f"Dropped a session event subscriber that fell {self.queue_size} events behind")
+        return message
+
+    def on_session_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """SessionManager listener."""
+        session = session_view(record)
+        if event == "ended":
+            self._sessions.pop(room_id, None)
+        else:
+            self._sessions[room_id] = session
+        self.publish(event, room_id, session)
+
+    def on_stage(self, room_id: str, stage: str, at: float) -> None:
+        """Telemetry sink: the agent's first audio means the greeting went out."""
+        if stage == "first_audio" and room_id in self._sessions:
+            self.publish("greeting_sent", room_id, self._sessions[room_id])
+
+    def subscribe(self, after: Optional[int] = None, **filters: Any) -> Subscription:
+        """
+        Start receiving events after the `after` cursor, optionally only for sessions whose fields match `filters`.
+        Replayed events, or a snapshot, are queued before any new event.
+        """
+        subscription = Subscription(self, self.queue_size + len(self._buffer) + 1, filters)
+        oldest = self._buffer[0]["id"] if self._buffer else self.last_id + 1
+        # A cursor ahead of last_id comes from before a restart, when ids began again
+        if after is not None and oldest - 1 <= after <= self.last_id:
+            for message in self._buffer:
+                if message["id"] > after:
+                    subscription.offer(message)
+        else:
+            sessions = [session_view(record) for record in self.list_sessions()]
+            sessions = [session for session in sessions if subscription.matches({"session": session})]
+            subscription.queue.put_nowait({"id": self.last_id, "event": "snapshot", "at": time.time(), "sessions": sessions})
+        # Taken together with the replay above, without awaiting, so no event falls in between
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "last_id": self.last_id,
+            "buffered": len(self._buffer),
+            "capacity": self._buffer.maxlen,
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
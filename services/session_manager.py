@@ -1,26 +1,276 @@
+import time
 import logging
 import asyncio
-from typing import Dict, Any, Optional
-from videosdk.agents import AgentSession
-from ai import get_ai_agent
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Set, Tuple
+from ai import PipelinePool, ai_agents, get_ai_agent
 from config import Config
+from .session_backend import create_session_backend
+from .session_registry import create_session_registry
+from .appointments import AppointmentStore, appointment_store
+from . import telemetry
+
+if TYPE_CHECKING:
+    from videosdk.agents import AgentSession
 
 logger = logging.getLogger(__name__)
 
+# Lifecycle event emitted when a session enters a status
+STATUS_EVENTS = {"active": "started", "error": "error"}
+
+@lru_cache(maxsize=None)
+def call_end_listener_class() -> type:
+    """Return the CallEndListener class, importing the VideoSDK client only once a session needs it."""
+    from videosdk import MeetingEventHandler
+    
+    class CallEndListener(MeetingEventHandler):
+        """Signals when the caller joins or leaves the room, or the agent leaves the meeting."""
+        
+        def __init__(self, on_end, on_join=None):
+            super().__init__()
+            self._on_end = on_end
+            self._on_join = on_join
+        
+        def on_participant_joined(self, participant) -> None:
+            if self._on_join is not None:
+                self._on_join()
+        
+        def on_participant_left(self, participant) -> None:
+            self._on_end()
+        
+        def on_meeting_left(self, data) -> None:
+            self._on_end()
+    
+    return CallEndListener
+
 class SessionManager:
     """Manages AI agent sessions."""
     
-    def __init__(self):
-        self.active_sessions: Dict[str, AgentSession] = {}
+    def __init__(
+        self,
+        backend_name: str = Config.SESSION_BACKEND,
+        registry_name: str = Config.SESSION_REGISTRY,
+        node_id: str = Config.NODE_ID,
+        appointments: AppointmentStore = appointment_store,
+    ):
+        self.node_id = node_id
+        # AgentSession objects running in this process
+        self.active_sessions: Dict[str, "AgentSession"] = {}
+        # Metadata for every session this node launched, wherever it runs
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        # Records of the sessions of every node
+        self.registry = create_session_registry(registry_name)
+        self._listeners: List[Callable[[str, str, Dict[str, Any]], None]] = []
+        self._end_waiters: Dict[str, List[asyncio.Future]] = {}
+        # Provider call SID -> room, for status callbacks of this node's sessions
+        self._call_rooms: Dict[str, str] = {}
+        self._stopping: Set[str] = set()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.backend = create_session_backend(self, backend_name)
+        # Ready model connections for sessions created in this process
+        self.pipeline_pool = PipelinePool()
+        # Caller appointments, prefetched when a session is created here
+        self.appointments = appointments
+    
+    async def start(self) -> None:
+        """Open the registry and start the session backend."""
+        self.registry.start()
+        self.registry.heartbeat(self.node_id)
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        await self.backend.start()
+        # With the process backend, sessions (and their pools) live in the workers
+        if self.backend.get_backend_name() == "inprocess":
+            # Import the agent now rather than on the first call
+            ai_agents.load(Config.DEFAULT_AI_AGENT)
+            for ai_agent_name in Config.PIPELINE_POOL_AGENTS:
+                ai_agent = get_ai_agent(ai_agent_name)
+                if ai_agent.pipeline_key() is not None:
+                    self.pipeline_pool.register(ai_agent.pipeline_key(), ai_agent.prepare_model)
+            await self.pipeline_pool.start()
+            await self.appointments.start()
+        logger.info(
+            f"Session manager started on node {self.node_id} with {self.backend.get_backend_name()} backend "
+            f"and {self.registry.get_registry_name()} registry"
+        )
+    
+    async def stop(self) -> None:
+        """Stop all sessions, the session backend and the registry heartbeat."""
+        await self.backend.stop()
+        await self.pipeline_pool.stop()
+        await self.appointments.stop()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        for room_id in list(self.sessions):
+            try:
+                self.registry.remove(room_id)
+            except Exception as e:
+                logger.error(f"Could not remove session {room_id} from the registry: {e}")
+        self.registry.stop()
+    
+    async def _heartbeat_loop(self) -> None:
+        """Keep this node alive in the registry, reap dead nodes and serve stop requests from other nodes."""
+        while True:
+            await asyncio.sleep(Config.SESSION_REGISTRY_HEARTBEAT_INTERVAL)
+            try:
+                if self.registry.blocking:
+                    reaped, owned = await asyncio.to_thread(self._sync_registry)
+                else:
+                    reaped, owned = self._sync_registry()
+                for record in reaped:
+                    logger.warning(f"Reaped session {record['room_id']} of unresponsive node {record.get('node_id')}")
+                for record in owned:
+                    if record.get("stop_requested") and record["room_id"] in self.sessions:
+                        logger.info(f"Stopping session {record['room_id']} on request of another node")
+                        await self.backend.stop_session(record["room_id"])
+            except Exception as e:
+                logger.error(f"Session registry heartbeat failed: {e}", exc_info=True)
+    
+    def _sync_registry(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Heartbeat, then return the sessions reaped from dead nodes and this node's own session records."""
+        self.registry.heartbeat(self.node_id)
+        reaped = self.registry.reap_expired(Config.SESSION_REGISTRY_NODE_TTL)
+        return reaped, self.registry.list(node_id=self.node_id)
+    
+    def add_listener(self, listener: Callable[[str, str, Dict[str, Any]], None]) -> None:
+        """Register a callback for lifecycle events: created, started, error and ended."""
+        self._listeners.append(listener)
+    
+    def _emit(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event, room_id, record)
+            except Exception as e:
+                logger.error(f"Session listener failed for {event} in room {room_id}: {e}", exc_info=True)
+    
+    async def launch_session(
+        self,
+        room_id: str,
+        call_type: str = "inbound",
+        initial_greeting: Optional[str] = None,
+        ai_agent_name: str = Config.DEFAULT_AI_AGENT,
+        provider: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        admitted: bool = False,
+    ) -> None:
+        """
+        Register a session and hand it to the backend to create and run.
+        `admitted` marks sessions holding an admission slot, released when they end.
+        """
+        context = {**(context or {}), "call_type": call_type}
+        if initial_greeting:
+            context["initial_greeting"] = initial_greeting
+        
+        self.sessions[room_id] = {
+            "room_id": room_id,
+            "call_type": call_type,
+            "agent_type": ai_agent_name,
+            "provider": provider,
+            "status": "starting",
+            "created_at": time.time(),
+            "admitted": admitted,
+            "node_id": self.node_id,
+        }
+        self._emit("created", room_id, self.sessions[room_id])
+        
+        try:
+            self.registry.put(self.sessions[room_id])
+            await self.backend.launch(room_id, call_type, context, ai_agent_name)
+        except Exception:
+            self.update_session(room_id, status="error")
+            self._end(room_id)
+            raise
+    
+    async def stop_session(self, room_id: str, reason: Optional[str] = None) -> bool:
+        """
+        Stop a session wherever it is running. Sessions of other nodes are stopped by their owner.
+        Returns False if the session is unknown or already being stopped. `reason` is kept on the record as end_reason.
+        """
+        if room_id in self.sessions:
+            if room_id in self._stopping:
+                return False
+            self._stopping.add(room_id)
+            if reason is not None:
+                self.update_session(room_id, end_reason=reason)
+            await self.backend.stop_session(room_id)
+            return True
+        if self.registry.update(room_id, stop_requested=True) is not None:
+            logger.info(f"Requested stop of session {room_id} owned by another node")
+            return True
+        return False
+    
+    def attach_call(self, room_id: str, call_sid: str) -> None:
+        """Record the provider call SID of a session, so status callbacks can find it."""
+        if room_id not in self.sessions:
+            return
+        self._call_rooms[call_sid] = room_id
+        self.update_session(room_id, call_sid=call_sid)
+    
+    def room_for_call(self, call_sid: str) -> Optional[str]:
+        """Return the room of one of this node's sessions by provider call SID."""
+        return self._call_rooms.get(call_sid)
+    
+    async def wait_for_session_end(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """Wait until a session has ended. Returns its final record, or None if it had already ended."""
+        if room_id not in self.sessions:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._end_waiters.setdefault(room_id, []).append(future)
+        return await future
+    
+    def update_session(self, room_id: str, **fields: Any) -> None:
+        """Update session metadata, emitting an event when the status changes."""
+        record = self.sessions.get(room_id)
+        if record is None:
+            return
+        previous_status = record.get("status")
+        record.update(fields)
+        try:
+            self.registry.update(room_id, **fields)
+        except Exception as e:
+            # The local record is still updated; only other nodes' view of the session is stale
+            logger.error(f"Could not update session {room_id} in the registry: {e}")
+        if record.get("status") != previous_status:
+            self._emit(STATUS_EVENTS.get(record["status"], "updated"), room_id, record)
+    
+    def apply_remote_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """Apply a lifecycle event reported by a session worker process."""
+        if room_id not in self.sessions:
+            return
+        if event == "ended":
+            if "transcript" in record:
+                self.sessions[room_id]["transcript"] = record["transcript"]
+            self.update_session(room_id, status=record.get("status", self.sessions[room_id]["status"]))
+            self._end(room_id)
+        elif event in ("started", "error"):
+            self.update_session(room_id, status=record["status"])
+    
+    def _end(self, room_id: str) -> None:
+        """Forget a session and wake anyone waiting for it to end."""
+        record = self.sessions.pop(room_id, None)
+        if record is None:
+            return
+        self._stopping.discard(room_id)
+        self._call_rooms.pop(record.get("call_sid"), None)
+        try:
+            self.registry.remove(room_id)
+        except Exception as e:
+            logger.error(f"Could not remove session {room_id} from the registry: {e}")
+        self._emit("ended", room_id, record)
+        for future in self._end_waiters.pop(room_id, []):
+            if not future.done():
+                future.set_result(record)
     
     async def create_session(
         self, 
         room_id: str, 
         call_type: str = "inbound",
         initial_greeting: Optional[str] = None,
-        ai_agent_name: str = "gemini"
-    ) -> AgentSession:
-        """Create and store a new AI agent session."""
+        ai_agent_name: str = Config.DEFAULT_AI_AGENT,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> "AgentSession":
+        """Create and store a new AI agent session in this process."""
         logger.info(f"Creating AI agent session for {call_type} call in room: {room_id}")
         
         try:
@@ -29,16 +279,26 @@ class SessionManager:
             
             # Prepare context
             context = {
+                **(context or {}),
                 "call_type": call_type,
             }
             if initial_greeting:
                 context["initial_greeting"] = initial_greeting
+            # Prefetch the caller's appointment so the greeting and instructions need no lookup mid-call
+            if "appointment" not in context:
+                context["appointment"] = self.appointments.lookup(context.get("phone_number"))
             
-            # Create session
-            session = ai_agent.create_session(room_id, context)
+            # Create session, on a pre-connected model when one is ready
+            model = self.pipeline_pool.checkout(ai_agent.pipeline_key())
+            if model is not None:
+                session = ai_agent.create_session(room_id, context, model=model)
+            else:
+                session = ai_agent.create_session(room_id, context)
             
             # Store the session
             self.active_sessions[room_id] = session
+            telemetry.mark(room_id, "session_created")
+            telemetry.instrument_session(session, room_id)
             
             logger.info(f"Session created for room {room_id} using {ai_agent.get_agent_name()}")
             return session
@@ -47,35 +307,96 @@ class SessionManager:
             logger.error(f"Error creating AI agent session for room {room_id}: {e}", exc_info=True)
             raise
     
-    async def run_session(self, session: AgentSession, room_id: str):
-        """Run the agent session and keep it alive."""
+    async def run_session(self, session: "AgentSession", room_id: str):
+        """Run the agent session and keep it alive until the call ends."""
         try:
             logger.info(f"Starting session for room {room_id}...")
+            telemetry.mark(room_id, "session_started")
             await session.start()
+            self.update_session(room_id, status="active")
+            # start() returns once the agent has joined and greeted; the call is still live
+            await self._wait_for_call_end(session, room_id)
             logger.info(f"AI Agent session for room {room_id} has ended.")
+        except asyncio.CancelledError:
+            logger.info(f"AI Agent session for room {room_id} was stopped.")
+            raise
         except Exception as session_error:
             logger.error(f"Session error for room {room_id}: {session_error}", exc_info=True)
+            self.update_session(room_id, status="error")
         finally:
-            # Clean up the session
+            # Release the room and model connection, then forget the session
+            await self._close_session(session, room_id)
+            self._keep_transcript(session, room_id)
             self.cleanup_session(room_id)
     
+    async def _wait_for_call_end(self, session: "AgentSession", room_id: str) -> None:
+        """Wait until the room reports that the call has ended, marking when the caller joins."""
+        room = getattr(session.pipeline, "room", None)
+        meeting = getattr(room, "meeting", None)
+        if meeting is None:
+            return
+        
+        loop = asyncio.get_running_loop()
+        ended = asyncio.Event()
+        # The caller may have joined while the agent was greeting
+        if getattr(room, "participants_data", None):
+            telemetry.mark(room_id, "caller_joined")
+            on_join = None
+        else:
+            on_join = lambda: loop.call_soon_threadsafe(telemetry.mark, room_id, "caller_joined")
+        listener = call_end_listener_class()(lambda: loop.call_soon_threadsafe(ended.set), on_join)
+        meeting.add_event_listener(listener)
+        try:
+            await ended.wait()
+        finally:
+            meeting.remove_event_listener(listener)
+    
+    async def _close_session(self, session: "AgentSession", room_id: str) -> None:
+        """Close the session's pipeline, ignoring errors from an already-closed room."""
+        try:
+            await session.close()
+        except Exception as close_error:
+            logger.debug(f"Error closing session for room {room_id}: {close_error}")
+        
+        # Pipeline cleanup can stop part-way once the room is gone; always release the model
+        model = getattr(session.pipeline, "model", None)
+        if model is not None and hasattr(model, "aclose"):
+            try:
+                await model.aclose()
+            except Exception as close_error:
+                logger.warning(f"Error closing model for room {room_id}: {close_error}")
+    
+    def _keep_transcript(self, session: "AgentSession", room_id: str) -> None:
+        """Put the conversation on the session record, so the ended event carries it to call records."""
+        record = self.sessions.get(room_id)
+        transcript = getattr(session.agent, "transcript", None)
+        if record is None or transcript is None:
+            return
+        try:
+            # Kept off the registry, which only needs what other nodes look up
+            record["transcript"] = transcript()
+        except Exception as e:
+            logger.warning(f"Could not read the transcript of room {room_id}: {e}")
+    
     def cleanup_session(self, room_id: str):
         """Clean up a session."""
         if room_id in self.active_sessions:
             del self.active_sessions[room_id]
             logger.info(f"Session cleaned up for room {room_id}")
+        self._end(room_id)
+    
+    def get_session(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a session on any node."""
+        return self.registry.get(room_id)
+    
+    def get_active_sessions_count(self, **filters: Any) -> int:
+        """Get the number of active sessions across all nodes."""
+        return self.registry.count(**filters)
+    
+    def get_session_info(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Get information about active sessions across all nodes, optionally filtered by call_type, agent_type, provider or node_id."""
+        return self.registry.list(**filters)
     
-    def get_active_sessions_count(self) -> int:
-        """Get the number of active sessions."""
-        return len(self.active_sessions)
-    
-    def get_session_info(self) -> Dict[str, Any]:
-        """Get information about all active sessions."""
-        session_info = []
-        for room_id, session in self.active_sessions.items():
-            session_info.append({
-                "room_id": room_id,
-                "agent_type": session.agent.__class__.__name__,
-                "status": "active"
-            })
-        return session_info 
\ No newline at end of file
+    def get_session_page(self, limit: int, after: Optional[Tuple[float, str]] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Get up to `limit` sessions across all nodes, oldest first, after the (created_at, room_id) position `after`."""
+        return self.registry.list_page(limit, after, **filters) 
\ No newline at end of file
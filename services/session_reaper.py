@@ -0,0 +1,118 @@
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+from config import Config
+from .metrics import MetricsRegistry, metrics
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+# Provider call statuses after which nobody will talk to the agent
+TERMINAL_CALL_STATUSES = {"completed", "busy", "no-answer", "failed", "canceled"}
+
+class SessionReaper:
+    """
+    Stops sessions of this node that will never end on their own.
+
+    A session is reaped when the caller has not joined its room `join_timeout` seconds after it was created
+    (the call was never answered or the SIP leg never reached VideoSDK), when it has run for `max_duration`
+    seconds, or when the provider reports that its call ended. Stopping a session closes its pipeline and
+    model connection and frees its admission slot.
+    """
+
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        join_timeout: float = Config.SESSION_JOIN_TIMEOUT,
+        max_duration: float = Config.SESSION_MAX_DURATION,
+        interval: float = Config.SESSION_REAPER_INTERVAL,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.session_manager = session_manager
+        self.join_timeout = join_timeout
+        self.max_duration = max_duration
+        self.interval = interval
+        self._joined: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.reaped: Dict[str, int] = {}
+        self.call_statuses: Dict[str, int] = {}
+        self.reaped_sessions = registry.counter(
+            "sessions_reaped_total",
+            "Sessions stopped by the reaper, by reason.",
+            ("reason",),
+        )
+
+    async def start(self) -> None:
+        if self._task is None and (self.join_timeout > 0 or self.max_duration > 0):
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Session reaper started (join timeout {self.join_timeout}s, max duration {self.max_duration}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def on_stage(self, room_id: str, stage: str, at: float) -> None:
+        """Telemetry sink: the caller has joined the room."""
+        if stage == "caller_joined" and room_id in self.session_manager.sessions:
+            self._joined.add(room_id)
+
+    def on_session_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """SessionManager listener."""
+        if event == "ended":
+            self._joined.discard(room_id)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap_expired()
+            except Exception as e:
+                logger.error(f"Session reaper failed: {e}", exc_info=True)
+
+    async def reap_expired(self) -> int:
+        """Stop sessions past their join or duration deadline. Returns how many were stopped."""
+        now = time.time()
+        expired = []
+        for room_id, record in list(self.session_manager.sessions.items()):
+            age = now - record.get("created_at", now)
+            if self.join_timeout > 0 and room_id not in self._joined and age > self.join_timeout:
+                expired.append((room_id, "join_timeout"))
+            elif self.max_duration > 0 and age > self.max_duration:
+                expired.append((room_id, "max_duration"))
+        stopped = await asyncio.gather(*(self.reap(room_id, reason) for room_id, reason in expired))
+        return sum(stopped)
+
+    async def reap(self, room_id: str, reason: str) -> bool:
+        """Stop a session, counting it under `reason` unless it was already stopping."""
+        if not await self.session_manager.stop_session(room_id, reason):
+            return False
+        self.reaped[reason] = self.reaped.get(reason, 0) + 1
+        self.reaped_sessions.inc(reason=reason)
+        logger.warning(f"Reaped session {room_id}: {reason}")
+        return True
+
+    async def handle_call_status(self, call_sid: str, call_status: str) -> Optional[str]:
+        """Apply a provider status callback, stopping the session once its call has ended. Returns the session's room."""
+        self.call_statuses[call_status] = self.call_statuses.get(call_status, 0) + 1
+        room_id = self.session_manager.room_for_call(call_sid)
+        if room_id is None:
+            return None
+        if call_status == "in-progress":
+            # Answered; the caller joining the room is still what clears the join deadline
+            logger.info(f"Call {call_sid} for room {room_id} answered")
+        elif call_status in TERMINAL_CALL_STATUSES:
+            await self.reap(room_id, f"call_{call_status.replace('-', '_')}")
+        return room_id
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "join_timeout": self.join_timeout,
+            "max_duration": self.max_duration,
+            "waiting_for_caller": sum(1 for room_id in self.session_manager.sessions if room_id not in self._joined),
+            "reaped": dict(self.reaped),
+            "reaped_total": sum(self.reaped.values()),
+            "call_statuses": dict(self.call_statuses),
+        }
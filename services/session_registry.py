@@ -0,0 +1,367 @@
+import json
+import heapq
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Record fields that can be used to filter sessions
+INDEXED_FIELDS = ("call_type", "agent_type", "provider", "node_id")
+
+# Position of a record in listing order, used as a page cursor
+PageKey = Tuple[float, str]
+
+# SQLite registry operations slower than this are logged as lock contention
+SLOW_OPERATION = 0.05
+
+def page_key(record: Dict[str, Any]) -> PageKey:
+    return (record.get("created_at") or 0.0, record["room_id"])
+
+class SessionRegistry(ABC):
+    """Base interface for the registry of session records shared by all nodes."""
+
+    # Whether calls can block on I/O, so periodic bulk work should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def start(self) -> None:
+        """Open the registry."""
+        pass
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Close the registry."""
+        pass
+
+    @abstractmethod
+    def put(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a session record. The record must carry room_id and node_id."""
+        pass
+
+    @abstractmethod
+    def update(self, room_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Merge fields into a session record and return it, or None if it is unknown."""
+        pass
+
+    @abstractmethod
+    def remove(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """Delete a session record and return it."""
+        pass
+
+    @abstractmethod
+    def get(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a session record by room, whichever node owns it."""
+        pass
+
+    @abstractmethod
+    def list(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Return session records matching indexed field filters, oldest first."""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, node_id: str) -> None:
+        """Record that a node is alive."""
+        pass
+
+    @abstractmethod
+    def reap_expired(self, node_ttl: float) -> List[Dict[str, Any]]:
+        """Remove nodes silent for longer than node_ttl along with their sessions, returning the sessions."""
+        pass
+
+    @abstractmethod
+    def get_registry_name(self) -> str:
+        """Return the registry name."""
+        pass
+
+    def count(self, **filters: Any) -> int:
+        """Return the number of session records matching the filters."""
+        return len(self.list(**filters))
+
+    def list_page(self, limit: int, after: Optional[PageKey] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Return up to `limit` matching records ordered by (created_at, room_id), starting after the `after` position."""
+        records = sorted(self.list(**filters), key=page_key)
+        if after is not None:
+            records = [record for record in records if page_key(record) > after]
+        return records[:limit]
+
+def _check_filters(filters: Dict[str, Any]) -> None:
+    unknown = set(filters) - set(INDEXED_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported session filter: {sorted(unknown)}. Available filters: {list(INDEXED_FIELDS)}")
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Registry local to one process. Suitable for a single node."""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self._nodes: Dict[str, float] = {}
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def _index(self, record: Dict[str, Any]) -> None:
+        for field in INDEXED_FIELDS:
+            self._indexes[field].setdefault(record.get(field), set()).add(record["room_id"])
+
+    def _unindex(self, record: Dict[str, Any]) -> None:
+        for field in INDEXED_FIELDS:
+            room_ids = self._indexes[field].get(record.get(field))
+            if room_ids is not None:
+                room_ids.discard(record["room_id"])
+                if not room_ids:
+                    del self._indexes[field][record.get(field)]
+
+    def put(self, record: Dict[str, Any]) -> None:
+        self.remove(record["room_id"])
+        self._records[record["room_id"]] = dict(record)
+        self._index(record)
+
+    def update(self, room_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        record = self._records.get(room_id)
+        if record is None:
+            return None
+        self._unindex(record)
+        record.update(fields)
+        self._index(record)
+        return dict(record)
+
+    def remove(self, room_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.pop(room_id, None)
+        if record is not None:
+            self._unindex(record)
+        return record
+
+    def get(self, room_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(room_id)
+        return dict(record) if record is not None else None
+
+    def list(self, **filters: Any) -> List[Dict[str, Any]]:
+        _check_filters(filters)
+        room_ids: Optional[Set[str]] = None
+        for field, value in filters.items():
+            matches = self._indexes[field].get(value, set())
+            room_ids = matches if room_ids is None else room_ids & matches
+        records = self._records.values() if room_ids is None else (self._records[room_id] for room_id in room_ids)
+        return sorted((dict(record) for record in records), key=lambda record: record.get("created_at", 0))
+
+    def count(self, **filters: Any) -> int:
+        if not filters:
+            return len(self._records)
+        return super().count(**filters)
+
+    def list_page(self, limit: int, after: Optional[PageKey] = None, **filters: Any) -> List[Dict[str, Any]]:
+        _check_filters(filters)
+        room_ids: Optional[Set[str]] = None
+        for field, value in filters.items():
+            matches = self._indexes[field].get(value, set())
+            room_ids = matches if room_ids is None else room_ids & matches
+        records = self._records.values() if room_ids is None else (self._records[room_id] for room_id in room_ids)
+        if after is not None:
+            records = (record for record in records if page_key(record) > after)
+        # Copy only the page, not every matching record
+        return [dict(record) for record in heapq.nsmallest(limit, records, key=page_key)]
+
+    def heartbeat(self, node_id: str) -> None:
+        self._nodes[node_id] = time.time()
+
+    def reap_expired(self, node_ttl: float) -> List[Dict[str, Any]]:
+        cutoff = time.time() - node_ttl
+        reaped: List[Dict[str, Any]] = []
+        for node_id in [node for node, seen_at in self._nodes.items() if seen_at < cutoff]:
+            del self._nodes[node_id]
+            for record in self.list(node_id=node_id):
+                reaped.append(self.remove(record["room_id"]))
+        return reaped
+
+    def get_registry_name(self) -> str:
+        return "memory"
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """
+    Registry in a SQLite database in WAL mode, shared by every worker and process on a host.
+
+    Calls wait at most `busy_timeout` seconds for another process's write lock, then raise sqlite3.OperationalError.
+    Waits and timeouts are logged and counted in `stats`. The connection may be used from worker threads, one call at a
+    time.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str = Config.SESSION_REGISTRY_PATH, busy_timeout: float = Config.SESSION_REGISTRY_BUSY_TIMEOUT):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"slow_operations": 0, "lock_timeouts": 0}
+
+    def start(self) -> None:
+        if self._db is not None:
+            return
+        # Startup may wait longer for the schema; calls made while serving use the short busy timeout
+        self._db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL only syncs at checkpoints, keeping writes off the disk's critical path
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                room_id TEXT PRIMARY KEY,
+                call_type TEXT,
+                agent_type TEXT,
+                provider TEXT,
+                node_id TEXT NOT NULL,
+                created_at REAL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_call_type ON sessions (call_type);
+            CREATE INDEX IF NOT EXISTS sessions_agent_type ON sessions (agent_type);
+            CREATE INDEX IF NOT EXISTS sessions_provider ON sessions (provider);
+            CREATE INDEX IF NOT EXISTS sessions_node_id ON sessions (node_id);
+            CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at, room_id);
+            CREATE TABLE IF NOT EXISTS nodes (
+                node_id TEXT PRIMARY KEY,
+                heartbeat_at REAL NOT NULL
+            );
+            """
+        )
+        self._db.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        logger.info(f"SQLite session registry opened at {self.path}")
+
+    def stop(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @contextmanager
+    def _using(self, operation: str) -> Iterator[sqlite3.Connection]:
+        """Hold the connection for one operation, logging it when it had to wait for another process."""
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                yield self._db
+            except sqlite3.OperationalError as e:
+                if "locked" in str(e):
+                    self.stats["lock_timeouts"] += 1
+                    logger.warning(f"Session registry {operation} gave up after {self.busy_timeout}s waiting for a lock on {self.path}")
+                raise
+        elapsed = time.perf_counter() - started
+        if elapsed > SLOW_OPERATION:
+            self.stats["slow_operations"] += 1
+            logger.warning(f"Session registry {operation} took {elapsed * 1000:.0f}ms; {self.path} is contended")
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions (room_id, call_type, agent_type, provider, node_id, created_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                record["room_id"],
+                record.get("call_type"),
+                record.get("agent_type"),
+                record.get("provider"),
+                record["node_id"],
+                record.get("created_at"),
+                json.dumps(record),
+            ),
+        )
+
+    def put(self, record: Dict[str, Any]) -> None:
+        with self._using("put"):
+            self._write(record)
+
+    def update(self, room_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        with self._using("update") as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT data FROM sessions WHERE room_id = ?", (room_id,)).fetchone()
+                record = json.loads(row["data"]) if row is not None else None
+                if record is not None:
+                    record.update(fields)
+                    self._write(record)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return record
+
+    def remove(self, room_id: str) -> Optional[Dict[str, Any]]:
+        with self._using("remove") as db:
+            row = db.execute("DELETE FROM sessions WHERE room_id = ? RETURNING data", (room_id,)).fetchone()
+        return json.loads(row["data"]) if row is not None else None
+
+    def get(self, room_id: str) -> Optional[Dict[str, Any]]:
+        with self._using("get") as db:
+            row = db.execute("SELECT data FROM sessions WHERE room_id = ?", (room_id,)).fetchone()
+        return json.loads(row["data"]) if row is not None else None
+
+    def _where(self, filters: Dict[str, Any]):
+        _check_filters(filters)
+        clauses = [f"{field} IS ?" for field in filters]
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(filters.values())
+
+    def list(self, **filters: Any) -> List[Dict[str, Any]]:
+        where, params = self._where(filters)
+        with self._using("list") as db:
+            rows = db.execute(f"SELECT data FROM sessions{where} ORDER BY created_at", params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def count(self, **filters: Any) -> int:
+        where, params = self._where(filters)
+        with self._using("count") as db:
+            return db.execute(f"SELECT COUNT(*) FROM sessions{where}", params).fetchone()[0]
+
+    def list_page(self, limit: int, after: Optional[PageKey] = None, **filters: Any) -> List[Dict[str, Any]]:
+        where, params = self._where(filters)
+        if after is not None:
+            where += (" AND " if where else " WHERE ") + "(created_at, room_id) > (?, ?)"
+            params += tuple(after)
+        with self._using("list") as db:
+            rows = db.execute(
+                f"SELECT data FROM sessions{where} ORDER BY created_at, room_id LIMIT ?", params + (limit,)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def heartbeat(self, node_id: str) -> None:
+        with self._using("heartbeat") as db:
+            db.execute("INSERT OR REPLACE INTO nodes (node_id, heartbeat_at) VALUES (?, ?)", (node_id, time.time()))
+
+    def reap_expired(self, node_ttl: float) -> List[Dict[str, Any]]:
+        cutoff = time.time() - node_ttl
+        with self._using("reap") as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    "DELETE FROM sessions WHERE node_id IN (SELECT node_id FROM nodes WHERE heartbeat_at < ?) RETURNING data",
+                    (cutoff,),
+                ).fetchall()
+                db.execute("DELETE FROM nodes WHERE heartbeat_at < ?", (cutoff,))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return [json.loads(row["data"]) for row in rows]
+
+    def get_registry_name(self) -> str:
+        return "sqlite"
+
+def create_session_registry(registry_name: str = Config.SESSION_REGISTRY) -> SessionRegistry:
+    """Factory function to get the appropriate session registry."""
+    registries = {
+        "memory": InMemorySessionRegistry,
+        "sqlite": SQLiteSessionRegistry,
+    }
+
+    if registry_name not in registries:
+        raise ValueError(f"Unsupported session registry: {registry_name}. Available registries: {list(registries.keys())}")
+
+    return registries[registry_name]()
@@ -0,0 +1,42 @@
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class StartupReport:
+    """Records how long each import and startup step of the process took."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.steps: List[Dict[str, Any]] = []
+
+    def record(self, name: str, seconds: float, kind: str = "step") -> None:
+        """Add a step that has already been timed."""
+        self.steps.append({"name": name, "kind": kind, "seconds": seconds})
+
+    @contextmanager
+    def step(self, name: str, kind: str = "step") -> Iterator[None]:
+        """Time the body of a with block as a startup step."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, kind)
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.monotonic()
+        logger.info(f"Startup finished in {self.ready_at - self.started_at:.3f}s")
+
+    def get_report(self, plugin_load_times: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Return the steps, slowest first, with imports of providers and agents loaded since startup."""
+        steps = list(self.steps)
+        for name, seconds in (plugin_load_times or {}).items():
+            steps.append({"name": name, "kind": "plugin_import", "seconds": seconds})
+        return {
+            "ready": self.ready_at is not None,
+            "seconds_to_ready": self.ready_at - self.started_at if self.ready_at is not None else None,
+            "steps": sorted(steps, key=lambda step: step["seconds"], reverse=True),
+        }
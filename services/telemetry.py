@@ -0,0 +1,144 @@
+import time
+import logging
+from typing import Any, Callable, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Sinks receive (room_id, stage, monotonic timestamp)
+_sinks: List[Callable[[str, str, float], None]] = []
+
+def add_sink(sink: Callable[[str, str, float], None]) -> None:
+    """Register a receiver for call stage marks."""
+    _sinks.append(sink)
+
+def remove_sink(sink: Callable[[str, str, float], None]) -> None:
+    """Unregister a receiver added with add_sink."""
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+def mark(room_id: str, stage: str, at: Optional[float] = None) -> None:
+    """Record that a call reached a stage. Timestamps use time.monotonic, which is shared by processes on a host."""
+    if not _sinks:
+        return
+    at = time.monotonic() if at is None else at
+    for sink in _sinks:
+        try:
+            sink(room_id, stage, at)
+        except Exception as e:
+            logger.error(f"Telemetry sink failed for {stage} in room {room_id}: {e}", exc_info=True)
+
+def instrument_session(session: Any, room_id: str) -> None:
+    """Mark when the agent's on_enter fires, when its first audio reaches the outgoing track, and the timing of each turn."""
+    agent = session.agent
+    on_enter = agent.on_enter
+
+    async def timed_on_enter() -> None:
+        mark(room_id, "on_enter")
+        _tap_first_audio(session, room_id)
+        if Config.TURN_LATENCY_ENABLED:
+            _tap_turns(session, room_id)
+        await on_enter()
+
+    agent.on_enter = timed_on_enter
+
+def _tap_first_audio(session: Any, room_id: str) -> None:
+    """Wrap the audio track's add_new_bytes to mark the first chunk that passes."""
+    track = getattr(getattr(session.pipeline, "model", None), "audio_track", None)
+    if track is None or not hasattr(track, "add_new_bytes"):
+        return
+    add_new_bytes = track.add_new_bytes
+    marked = False
+
+    def first_audio(audio_data: bytes):
+        # Other taps may wrap the track after this one, so it stays installed and passes through
+        nonlocal marked
+        if not marked:
+            marked = True
+            mark(room_id, "first_audio")
+        return add_new_bytes(audio_data)
+
+    track.add_new_bytes = first_audio
+
+class _TurnTap:
+    """
+    Marks each turn of a call: "turn_speech_end" when the caller stops talking, "turn_model_audio" when the model's
+    first audio for the reply reaches the track and "turn_played" when the first frame of it is sent to the room.
+
+    Runs on every audio frame, so the per-frame work is a peak check in C on caller frames and a flag test on
+    outgoing ones. Speech ends at the last loud frame once `hangover` seconds of quiet follow it, or earlier if the
+    model starts replying first.
+    """
+
+    __slots__ = ("room_id", "track", "threshold", "hangover", "speaking", "last_speech", "awaiting_audio", "awaiting_play")
+
+    def __init__(self, room_id: str, track: Any, threshold: int, hangover: float):
+        self.room_id = room_id
+        self.track = track
+        self.threshold = threshold
+        self.hangover = hangover
+        self.speaking = False
+        self.last_speech = 0.0
+        self.awaiting_audio = False
+        self.awaiting_play = False
+
+    def on_caller_audio(self, audio_data: bytes) -> None:
+        # Peak of the frame's 16-bit samples, ignoring a trailing odd byte
+        samples = memoryview(audio_data)[: len(audio_data) & ~1].cast("h")
+        if max(map(abs, samples), default=0) > self.threshold:
+            self.last_speech = time.monotonic()
+            self.speaking = True
+        elif self.speaking and time.monotonic() - self.last_speech >= self.hangover:
+            self._end_speech()
+
+    def _end_speech(self) -> None:
+        self.speaking = False
+        self.awaiting_audio = True
+        self.awaiting_play = False
+        mark(self.room_id, "turn_speech_end", self.last_speech)
+
+    def on_model_audio(self) -> None:
+        # Audio arriving while the track is idle is a reply, so the caller is done even if the hangover has not passed;
+        # while the track is still playing it is the rest of an earlier reply the caller is talking over
+        if self.speaking and not getattr(self.track, "frame_buffer", None):
+            self._end_speech()
+        if self.awaiting_audio:
+            self.awaiting_audio = False
+            self.awaiting_play = True
+            mark(self.room_id, "turn_model_audio")
+
+    def on_played(self) -> None:
+        self.awaiting_play = False
+        mark(self.room_id, "turn_played")
+
+def _tap_turns(session: Any, room_id: str) -> None:
+    """Wrap the pipeline's caller audio input and the audio track's input and output to time each turn."""
+    pipeline = session.pipeline
+    track = getattr(getattr(pipeline, "model", None), "audio_track", None)
+    if track is None or not hasattr(track, "add_new_bytes") or not hasattr(pipeline, "on_audio_delta"):
+        return
+    tap = _TurnTap(room_id, track, Config.TURN_SPEECH_THRESHOLD, Config.TURN_SPEECH_HANGOVER)
+    on_audio_delta = pipeline.on_audio_delta
+    add_new_bytes = track.add_new_bytes
+    recv = track.recv
+
+    def caller_audio(audio_data: bytes):
+        # Returns the wrapped coroutine rather than awaiting it, saving a frame per caller packet
+        tap.on_caller_audio(audio_data)
+        return on_audio_delta(audio_data)
+
+    def model_audio(audio_data: bytes):
+        tap.on_model_audio()
+        return add_new_bytes(audio_data)
+
+    async def played_recv():
+        # Only a queued frame is the reply; an empty buffer plays silence
+        if tap.awaiting_play and track.frame_buffer:
+            frame = await recv()
+            tap.on_played()
+            return frame
+        return await recv()
+
+    pipeline.on_audio_delta = caller_audio
+    track.add_new_bytes = model_audio
+    track.recv = played_recv
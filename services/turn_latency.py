@@ -0,0 +1,221 @@
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+from config import Config
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+# Turn marks from telemetry, in the order a turn reaches them
+TURN_STAGES = ("turn_speech_end", "turn_model_audio", "turn_played")
+# Per-call aggregates recorded when a call ends
+CALL_STATS = ("p50", "p95", "max")
+TURN_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of unsorted values, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(p * len(ordered))) - 1))]
+
+class _CallTurns:
+    def __init__(self, labels: Dict[str, Any]):
+        self.labels = labels
+        self.started_at = time.time()
+        # Marks of the turn in progress: stage -> monotonic time
+        self.turn: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.unanswered = 0
+        self.slow = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "turns": len(self.latencies),
+            "unanswered": self.unanswered,
+            "slow": self.slow,
+            **{f"{stat}_ms": _ms(self.stat(stat)) for stat in CALL_STATS},
+        }
+
+    def stat(self, stat: str) -> Optional[float]:
+        if stat == "max":
+            return max(self.latencies, default=None)
+        return percentile(self.latencies, int(stat[1:]) / 100)
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+class TurnLatency:
+    """
+    Times each turn of a conversation from the caller's end of speech to the model's first audio and to the first
+    frame of the reply played into the room, per call and across calls.
+
+    A turn that the caller follows with more speech before any reply is played counts as unanswered. Turns slower
+    than `slow_threshold` are sampled at `sample_rate`, kept in memory and appended to `sample_path` as JSON lines.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = Config.TURN_SLOW_THRESHOLD,
+        sample_rate: float = Config.TURN_SLOW_SAMPLE_RATE,
+        sample_path: Optional[str] = Config.TURN_SLOW_SAMPLE_PATH,
+        max_samples: int = 100,
+        max_recent: int = 100,
+        max_open: int = 10000,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.sample_path = sample_path or None
+        self.max_open = max_open
+        self._calls: "OrderedDict[str, _CallTurns]" = OrderedDict()
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=max_recent)
+        self.slow_samples: Deque[Dict[str, Any]] = deque(maxlen=max_samples)
+        self._pending: List[str] = []
+        self._writer: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"turns": 0, "unanswered": 0, "slow": 0, "sampled": 0, "write_errors": 0}
+
+        self.turn_seconds = registry.histogram(
+            "turn_latency_seconds",
+            "Seconds from the end of the caller's speech to the model's first audio and to the reply starting to play.",
+            ("stage", "call_type", "provider", "agent"),
+            buckets=TURN_BUCKETS,
+        )
+        self.call_turn_seconds = registry.histogram(
+            "call_turn_latency_seconds",
+            "Per-call median, p95 and worst turn latency, recorded when the call ends.",
+            ("stat", "call_type", "provider", "agent"),
+            buckets=TURN_BUCKETS,
+        )
+        self.turns = registry.counter(
+            "turns_total",
+            "Conversation turns by whether a reply was played.",
+            ("call_type", "provider", "agent", "outcome"),
+        )
+
+    def on_session_event(self, event: str, room_id: str, record: Dict[str, Any]) -> None:
+        """SessionManager listener: label calls from session records and summarize them when sessions end."""
+        if event == "created":
+            self._calls[room_id] = _CallTurns({
+                "call_type": record.get("call_type"),
+                "provider": record.get("provider"),
+                "agent": record.get("agent_type"),
+            })
+            # Bound memory if calls never report an end
+            while len(self._calls) > self.max_open:
+                self._calls.popitem(last=False)
+        elif event == "ended":
+            self.finish(room_id)
+
+    def mark(self, room_id: str, stage: str, at: float) -> None:
+        """Telemetry sink for turn marks."""
+        if stage not in TURN_STAGES:
+            return
+        call = self._calls.get(room_id)
+        if call is None:
+            return
+        turn = call.turn
+        if stage == "turn_speech_end":
+            if turn:
+                self._unanswered(call)
+            call.turn = {stage: at}
+        elif stage == "turn_model_audio":
+            if "turn_speech_end" in turn:
+                turn.setdefault(stage, at)
+        elif "turn_model_audio" in turn:
+            turn[stage] = at
+            self._complete(room_id, call)
+
+    def _unanswered(self, call: _CallTurns) -> None:
+        call.unanswered += 1
+        self.stats["unanswered"] += 1
+        self.turns.inc(outcome="unanswered", **call.labels)
+
+    def _complete(self, room_id: str, call: _CallTurns) -> None:
+        turn, call.turn = call.turn, {}
+        speech_end = turn["turn_speech_end"]
+        model_audio = max(0.0, turn["turn_model_audio"] - speech_end)
+        played = max(0.0, turn["turn_played"] - speech_end)
+        self.turn_seconds.observe(model_audio, stage="model_audio", **call.labels)
+        self.turn_seconds.observe(played, stage="played", **call.labels)
+        self.turns.inc(outcome="answered", **call.labels)
+        call.latencies.append(played)
+        self.stats["turns"] += 1
+        if played >= self.slow_threshold:
+            call.slow += 1
+            self.stats["slow"] += 1
+            if random.random() < self.sample_rate:
+                self._sample(room_id, call, model_audio, played)
+
+    def _sample(self, room_id: str, call: _CallTurns, model_audio: float, played: float) -> None:
+        sample = {
+            "at": time.time(),
+            "room_id": room_id,
+            "turn": len(call.latencies),
+            "call_seconds": round(time.time() - call.started_at, 3),
+            "model_audio_ms": _ms(model_audio),
+            "playout_ms": _ms(played - model_audio),
+            "played_ms": _ms(played),
+            **call.labels,
+        }
+        self.slow_samples.append(sample)
+        self.stats["sampled"] += 1
+        logger.info(f"Slow turn {sample['turn']} in room {room_id}: reply played after {sample['played_ms']:.0f}ms")
+        if self.sample_path is not None:
+            self._pending.append(json.dumps(sample))
+            if self._writer is None:
+                self._writer = asyncio.get_running_loop().create_task(self._write_samples())
+
+    async def _write_samples(self) -> None:
+        """Append queued samples to the sample file off the event loop, batching those that arrive meanwhile."""
+        try:
+            while self._pending:
+                lines, self._pending = self._pending, []
+                try:
+                    await asyncio.to_thread(self._append, lines)
+                except OSError as e:
+                    self.stats["write_errors"] += 1
+                    logger.warning(f"Could not write slow turn samples to {self.sample_path}: {e}")
+        finally:
+            self._writer = None
+
+    def _append(self, lines: List[str]) -> None:
+        with open(self.sample_path, "a", encoding="utf-8") as samples:
+            samples.write("\n".join(lines) + "\n")
+
+    def finish(self, room_id: str) -> None:
+        """Summarize a call's turns into the per-call histograms."""
+        call = self._calls.pop(room_id, None)
+        if call is None:
+            return
+        if call.turn:
+            self._unanswered(call)
+        if call.latencies:
+            for stat in CALL_STATS:
+                self.call_turn_seconds.observe(call.stat(stat), stat=stat, **call.labels)
+        summary = {"room_id": room_id, **call.summary()}
+        self.recent.append(summary)
+        logger.debug(f"Turn latency for room {room_id}: {summary}")
+
+    def get_call_stats(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """Return the turn latency summary of an active or recently ended call."""
+        call = self._calls.get(room_id)
+        if call is not None:
+            return {"room_id": room_id, "active": True, **call.summary()}
+        for summary in reversed(self.recent):
+            if summary["room_id"] == room_id:
+                return {**summary, "active": False}
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active_calls": len(self._calls),
+            "slow_threshold_ms": _ms(self.slow_threshold),
+            "recent_calls": list(self.recent),
+            "slow_samples": list(self.slow_samples),
+        }
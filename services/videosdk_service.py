@@ -1,6 +1,8 @@
+import time
 import logging
+import importlib.util
 import httpx
-from typing import Dict, Any
+from typing import Callable, List, Optional
 from fastapi import HTTPException
 from config import Config
 
@@ -8,46 +10,101 @@ logger = logging.getLogger(__name__)
 
 class VideoSDKService:
     """Service for managing VideoSDK rooms and operations."""
-    
+
     def __init__(self):
         self.auth_token = Config.VIDEOSDK_AUTH_TOKEN
-        self.base_url = "https://api.videosdk.live/v2"
-    
-    async def create_room(self, geo_fence: str = "us002") -> str:
-        """Creates a new VideoSDK room and returns its ID."""
-        url = f"{self.base_url}/rooms"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": self.auth_token
-        }
-       
-        
-        async with httpx.AsyncClient() as client:
+        self.base_url = Config.VIDEOSDK_API_BASE_URL
+        self._client: Optional[httpx.AsyncClient] = None
+        self._latency_listeners: List[Callable[[str, float, bool], None]] = []
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Build the long-lived, keep-alive HTTP client for the VideoSDK API."""
+        http2 = Config.VIDEOSDK_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("VIDEOSDK_HTTP2 is enabled but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+            http2 = False
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.auth_token or "",
+            },
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=Config.VIDEOSDK_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.VIDEOSDK_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.VIDEOSDK_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(Config.VIDEOSDK_TIMEOUT, connect=Config.VIDEOSDK_CONNECT_TIMEOUT),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def start(self) -> None:
+        """Open the shared HTTP client. Called from the app lifespan."""
+        client = self.client
+        logger.info(f"VideoSDK HTTP client ready (base_url={client.base_url}, http2={Config.VIDEOSDK_HTTP2})")
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("VideoSDK HTTP client closed")
+
+    def add_latency_listener(self, listener: Callable[[str, float, bool], None]) -> None:
+        """Register a callback receiving (geo_fence, seconds, succeeded) for every room creation."""
+        self._latency_listeners.append(listener)
+
+    def _report_latency(self, geo_fence: str, seconds: float, ok: bool) -> None:
+        for listener in self._latency_listeners:
             try:
-                response = await client.post(url, headers=headers)
-                response.raise_for_status()
-                room_data = response.json()
-                
-                room_id = room_data.get("roomId")
-                if not room_id:
-                    raise ValueError("roomId not found in VideoSDK response.")
-                
-                logger.info(f"VideoSDK Room created: {room_id}")
-                return room_id
-                
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error creating VideoSDK room: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Failed to create VideoSDK room: HTTP error {e.response.status_code}"
-                )
+                listener(geo_fence, seconds, ok)
             except Exception as e:
-                logger.error(f"Error creating VideoSDK room: {e}")
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Failed to create VideoSDK room: {e}"
-                )
-    
+                logger.error(f"Room latency listener failed for {geo_fence}: {e}", exc_info=True)
+
+    async def create_room(self, geo_fence: str = "us002") -> str:
+        """Creates a new VideoSDK room in a geo-fence and returns its ID."""
+        started = time.perf_counter()
+        # None while in flight, so a cancelled request is not counted as a failure
+        ok: Optional[bool] = None
+        try:
+            response = await self.client.post("/rooms", json={"geoFence": geo_fence})
+            response.raise_for_status()
+            room_data = response.json()
+
+            room_id = room_data.get("roomId")
+            if not room_id:
+                raise ValueError("roomId not found in VideoSDK response.")
+
+            ok = True
+            logger.info(f"VideoSDK Room created: {room_id} ({geo_fence})")
+            return room_id
+
+        except httpx.HTTPStatusError as e:
+            ok = False
+            logger.error(f"HTTP error creating VideoSDK room: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to create VideoSDK room: HTTP error {e.response.status_code}"
+            )
+        except Exception as e:
+            ok = False
+            logger.error(f"Error creating VideoSDK room: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to create VideoSDK room: {e}"
+            )
+        finally:
+            if ok is not None:
+                self._report_latency(geo_fence, time.perf_counter() - started, ok)
+
     def get_sip_endpoint(self, room_id: str) -> str:
         """Generate SIP endpoint for a room."""
-        return f"sip:{room_id}@sip.videosdk.live" 
\ No newline at end of file
+        return f"sip:{room_id}@sip.videosdk.live"
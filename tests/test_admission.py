@@ -0,0 +1,19 @@
+import asyncio
+import pytest
+from services.admission import AdmissionController, AdmissionRejected
+
+def test_queued_call_closed_at_the_deadline_is_rejected():
+    async def run():
+        admission = AdmissionController(max_active=1, max_queue=1, queue_timeout=0, retry_after=1)
+        await admission.acquire()
+        queued = asyncio.create_task(admission.acquire())
+        # The queued call has hit its deadline but not yet handled it when the node starts draining
+        await asyncio.sleep(0)
+        admission.close()
+        with pytest.raises(AdmissionRejected):
+            await queued
+        return admission
+
+    admission = asyncio.run(run())
+    assert admission.active == 1
+    assert admission.stats["rejected_draining"] == 1
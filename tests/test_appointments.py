@@ -0,0 +1,102 @@
+import csv
+import asyncio
+import sqlite3
+from services.appointments import AppointmentStore, parse_time
+from services.metrics import MetricsRegistry
+
+def write_source(tmp_path):
+    path = tmp_path / "appointments.csv"
+    with open(path, "w", newline="", encoding="utf-8") as source:
+        writer = csv.writer(source)
+        writer.writerow(["appointment_id", "phone_number", "appointment_at", "status"])
+        writer.writerow(["1", "+14155550100", "2030-06-05T11:00", "booked"])
+        writer.writerow(["2", "+14155550100", "2030-07-01T09:00+02:00", "booked"])
+    return str(path)
+
+def test_parse_time_converts_offsets_to_naive_local_time():
+    assert parse_time("2030-06-12T14:30:00Z").tzinfo is None
+    assert parse_time("2030-06-12T14:30") == parse_time("2030-06-12 14:30")
+
+def test_reschedule_with_utc_time_keeps_lookups_working(tmp_path):
+    async def run():
+        store = AppointmentStore(path=write_source(tmp_path), flush_interval=0.01, registry=MetricsRegistry())
+        await store.start()
+        rescheduled = store.reschedule("1", "2030-06-12T14:30:00Z")
+        appointment = store.lookup("+14155550100")
+        await store.stop()
+        return rescheduled, appointment
+
+    rescheduled, appointment = asyncio.run(run())
+    assert rescheduled["appointment_at"] == parse_time("2030-06-12T14:30:00Z").isoformat(timespec="minutes")
+    assert appointment["appointment_id"] == "1"
+
+def write_sqlite_source(path, columns):
+    db = sqlite3.connect(path)
+    db.execute(f"CREATE TABLE appointments (appointment_id TEXT PRIMARY KEY, {', '.join(columns)})")
+    db.execute(
+        "INSERT INTO appointments (appointment_id, phone_number, appointment_at) VALUES (?, ?, ?)",
+        ("appt-1", "+14155550100", "2030-06-05T11:00"),
+    )
+    db.commit()
+    db.close()
+
+def test_failed_write_back_is_retried_and_sets_updated_at(tmp_path):
+    path = str(tmp_path / "appointments.db")
+    write_sqlite_source(path, ("phone_number", "appointment_at", "status", "updated_at"))
+
+    async def run():
+        store = AppointmentStore(path=path, flush_interval=0.01, registry=MetricsRegistry())
+        await store.start()
+        # Take the table away so the first write fails
+        db = sqlite3.connect(path)
+        db.execute("ALTER TABLE appointments RENAME TO appointments_moved")
+        db.commit()
+        store.confirm("appt-1")
+        while not store.stats["write_errors"]:
+            await asyncio.sleep(0.01)
+        assert store.get_stats()["pending"] == 1
+        db.execute("ALTER TABLE appointments_moved RENAME TO appointments")
+        db.commit()
+        db.close()
+        while store.get_stats()["pending"]:
+            await asyncio.sleep(0.01)
+        await store.stop()
+        return store
+
+    store = asyncio.run(run())
+    assert store.stats["written"] == 1
+    db = sqlite3.connect(path)
+    status, updated_at = db.execute("SELECT status, updated_at FROM appointments").fetchone()
+    db.close()
+    assert status == "confirmed"
+    assert updated_at == store.get("appt-1")["updated_at"]
+
+def test_write_back_skips_updated_at_when_the_table_lacks_it(tmp_path):
+    path = str(tmp_path / "appointments.db")
+    write_sqlite_source(path, ("phone_number", "appointment_at", "status"))
+
+    async def run():
+        store = AppointmentStore(path=path, flush_interval=0.01, registry=MetricsRegistry())
+        await store.start()
+        store.confirm("appt-1")
+        await store.stop()
+        return store
+
+    store = asyncio.run(run())
+    assert (store.stats["written"], store.stats["write_errors"]) == (1, 0)
+
+def test_numeric_sqlite_values_are_read_as_text(tmp_path):
+    path = str(tmp_path / "appointments.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE appointments (appointment_id INTEGER, phone_number INTEGER, appointment_at)")
+    db.executemany(
+        "INSERT INTO appointments VALUES (?, ?, ?)",
+        [(1, 4155550100, "2030-06-05T11:00"), (2, 4155550101, 1749121200)],
+    )
+    db.commit()
+    db.close()
+
+    store = AppointmentStore(path=path, default_country_code="+1", registry=MetricsRegistry())
+    store.load()
+    assert store.lookup("+14155550100")["appointment_id"] == "1"
+    assert store.get("2") is None
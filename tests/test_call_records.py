@@ -0,0 +1,26 @@
+import gzip
+import json
+import asyncio
+from datetime import datetime
+from services.call_records import CallRecordSink
+from services.metrics import MetricsRegistry
+
+def test_unserializable_record_does_not_drop_its_batch(tmp_path):
+    circular = {"room_id": "room-2"}
+    circular["self"] = circular
+
+    async def run():
+        sink = CallRecordSink(enabled=True, directory=str(tmp_path), file_format="jsonl.gz", registry=MetricsRegistry())
+        await sink.start()
+        sink.submit({"room_id": "room-1", "created_at": datetime(2030, 6, 5, 11, 0)})
+        sink.submit(circular)
+        sink.submit({"room_id": "room-3"})
+        await sink.stop()
+        return sink.get_stats()
+
+    stats = asyncio.run(run())
+    assert (stats["written"], stats["invalid"], stats["dropped"], stats["write_errors"]) == (2, 1, 0, 0)
+    [path] = tmp_path.iterdir()
+    with gzip.open(path, "rt", encoding="utf-8") as records:
+        written = [json.loads(line) for line in records]
+    assert written == [{"room_id": "room-1", "created_at": "2030-06-05 11:00:00"}, {"room_id": "room-3"}]
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from services.campaign import CampaignScheduler, iter_lines, parse_rows
+
+class FakeVideoSDK:
+    def get_sip_endpoint(self, room_id):
+        return f"sip:{room_id}@sip.videosdk.live"
+
+class FakeRoomPool:
+    videosdk_service = FakeVideoSDK()
+
+    def __init__(self):
+        self.acquired = 0
+
+    async def acquire(self, number=None):
+        self.acquired += 1
+        return f"room-{self.acquired}"
+
+class FakeRoute:
+    name = "twilio"
+
+class FakeRouter:
+    def plan(self, number, providers=None):
+        return [FakeRoute()]
+
+    async def place_call(self, routes, to_number, sip_endpoint, status_callback=None):
+        return {"provider": "twilio", "call_sid": f"CA-{sip_endpoint}"}
+
+class FakeSessionManager:
+    """Sessions that end at once with `end_reason`, as if the reaper stopped them."""
+
+    def __init__(self, end_reason):
+        self.end_reason = end_reason
+        self.sessions = {}
+
+    async def launch_session(self, room_id, *args, **kwargs):
+        self.sessions[room_id] = {"room_id": room_id}
+
+    def attach_call(self, room_id, call_sid):
+        pass
+
+    async def wait_for_session_end(self, room_id):
+        record = self.sessions.pop(room_id)
+        record["end_reason"] = self.end_reason
+        return record
+
+def run_campaign(end_reason, max_attempts):
+    async def run():
+        scheduler = CampaignScheduler(FakeRoomPool(), FakeSessionManager(end_reason), FakeRouter())
+        campaign = scheduler.create_campaign(calls_per_second=100, max_attempts=max_attempts, retry_backoff=0.01)
+        campaign.add_row({"to_number": "+14155550100", "initial_greeting": None})
+        campaign.finish_loading()
+        await asyncio.wait_for(campaign.task, 5)
+        return campaign, scheduler.room_pool.acquired
+
+    return asyncio.run(run())
+
+def test_session_reaped_before_answer_is_retried_then_failed():
+    campaign, attempts = run_campaign("join_timeout", max_attempts=2)
+    assert attempts == 2
+    assert campaign.counts == {"total": 1, "completed": 0, "failed": 1}
+    assert "no-answer" in campaign.recent_failures[0]["error"]
+
+def test_session_ended_normally_counts_as_completed():
+    campaign, attempts = run_campaign("caller_hangup", max_attempts=2)
+    assert attempts == 1
+    assert campaign.counts == {"total": 1, "completed": 1, "failed": 0}
+
+def parse(body, chunk_size=7):
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    async def run():
+        return [row async for row in parse_rows(iter_lines(chunks()), "csv")]
+
+    return asyncio.run(run())
+
+def test_csv_rows_keep_quoted_fields_that_span_lines():
+    body = (
+        b'to_number,initial_greeting\r\n'
+        b'+14155550100,"Hello,\r\n\r\nthis is the ""clinic"""\r\n'
+        b'\r\n'
+        b'+14155550101,\r\n'
+    )
+    assert parse(body) == [
+        {"to_number": "+14155550100", "initial_greeting": 'Hello,\n\nthis is the "clinic"'},
+        {"to_number": "+14155550101", "initial_greeting": None},
+    ]
+
+def test_jsonl_rows_must_be_objects():
+    async def lines():
+        yield "[1, 2]"
+
+    async def run():
+        return [row async for row in parse_rows(lines(), "jsonl")]
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+class HangingSessionManager(FakeSessionManager):
+    """Sessions that never end, so their call attempts stay in progress."""
+
+    async def wait_for_session_end(self, room_id):
+        await asyncio.Event().wait()
+
+def test_stop_cancels_call_attempts_in_progress():
+    async def run():
+        session_manager = HangingSessionManager(None)
+        scheduler = CampaignScheduler(FakeRoomPool(), session_manager, FakeRouter())
+        campaign = scheduler.create_campaign(calls_per_second=100, max_attempts=1)
+        campaign.add_row({"to_number": "+14155550100", "initial_greeting": None})
+        while not session_manager.sessions:
+            await asyncio.sleep(0)
+        dial = next(iter(campaign.dials))
+        await scheduler.stop()
+        return campaign, dial
+
+    campaign, dial = asyncio.run(run())
+    assert dial.cancelled()
+    assert not campaign.dials
+    assert campaign.in_progress == 0
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from latency_stats import LatencyStats
+from providers.router import CircuitBreaker, ProviderRoute, ProviderRouter
+
+class HangingProvider:
+    """A provider whose calls never return, so the caller has to cancel them."""
+
+    def generate_twiml(self, sip_endpoint):
+        return f"<Response><Dial><Sip>{sip_endpoint}</Sip></Dial></Response>"
+
+    async def initiate_outbound_call_async(self, to_number, twiml, status_callback=None):
+        await asyncio.Event().wait()
+
+def test_cancelled_half_open_trial_releases_the_breaker():
+    router = ProviderRouter(provider_names=["twilio"], weights={}, prefix_routes={})
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    route = ProviderRoute("twilio", HangingProvider(), 1.0, breaker, LatencyStats())
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+
+    async def run():
+        call = asyncio.create_task(router.place_call([route], "+14155550100", "sip:room@sip.videosdk.live"))
+        await asyncio.sleep(0)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    asyncio.run(run())
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+class ProviderError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+class FailingProvider(HangingProvider):
+    def __init__(self, status):
+        self.status = status
+
+    async def initiate_outbound_call_async(self, to_number, twiml, status_callback=None):
+        raise ProviderError(self.status)
+
+class AnsweringProvider(HangingProvider):
+    async def initiate_outbound_call_async(self, to_number, twiml, status_callback=None):
+        return {"call_sid": "CA123"}
+
+def route(name, provider):
+    return ProviderRoute(name, provider, 1.0, CircuitBreaker(failure_threshold=1), LatencyStats())
+
+def test_auth_failure_opens_the_breaker_and_fails_over():
+    router = ProviderRouter(provider_names=["twilio"], weights={}, prefix_routes={})
+    failing, answering = route("twilio", FailingProvider(401)), route("vonage", AnsweringProvider())
+    result = asyncio.run(router.place_call([failing, answering], "+14155550100", "sip:room@sip.videosdk.live"))
+    assert result["provider"] == "vonage"
+    assert failing.breaker.state == "open"
+
+def test_invalid_request_is_not_retried_elsewhere():
+    router = ProviderRouter(provider_names=["twilio"], weights={}, prefix_routes={})
+    failing, answering = route("twilio", FailingProvider(400)), route("vonage", AnsweringProvider())
+    with pytest.raises(ProviderError):
+        asyncio.run(router.place_call([failing, answering], "+14155550100", "sip:room@sip.videosdk.live"))
+    assert failing.breaker.state == "closed"
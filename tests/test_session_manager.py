@@ -0,0 +1,26 @@
+import sqlite3
+import asyncio
+import pytest
+from services.session_manager import SessionManager
+from services.session_registry import InMemorySessionRegistry
+
+class LockedRegistry(InMemorySessionRegistry):
+    """A registry whose writes time out, as a contended SQLite file does."""
+
+    def put(self, record):
+        raise sqlite3.OperationalError("database is locked")
+
+def test_failed_registry_put_ends_the_session_and_releases_its_slot():
+    manager = SessionManager(backend_name="inprocess", registry_name="memory", node_id="node-a")
+    manager.registry = LockedRegistry()
+    events = []
+    manager.add_listener(lambda event, room_id, record: events.append((event, record.get("admitted"))))
+
+    async def run():
+        with pytest.raises(sqlite3.OperationalError):
+            await manager.launch_session("room-1", "outbound", admitted=True)
+
+    asyncio.run(run())
+    assert manager.sessions == {}
+    assert events[0] == ("created", True)
+    assert events[-1] == ("ended", True)
@@ -0,0 +1,36 @@
+import time
+import sqlite3
+import asyncio
+import pytest
+from services.session_registry import SQLiteSessionRegistry
+
+def test_sqlite_registry_gives_up_quickly_on_a_locked_database(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    registry = SQLiteSessionRegistry(path, busy_timeout=0.1)
+    registry.start()
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        with pytest.raises(sqlite3.OperationalError):
+            registry.put({"room_id": "room-1", "node_id": "node-a", "created_at": 1.0})
+        assert time.perf_counter() - started < 1.0
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert registry.stats["lock_timeouts"] == 1
+    registry.put({"room_id": "room-1", "node_id": "node-a", "created_at": 1.0})
+    assert registry.get("room-1")["node_id"] == "node-a"
+    registry.stop()
+
+def test_sqlite_registry_can_be_used_from_a_worker_thread(tmp_path):
+    registry = SQLiteSessionRegistry(str(tmp_path / "sessions.db"))
+    registry.start()
+    registry.put({"room_id": "room-1", "node_id": "node-a", "created_at": 1.0})
+
+    async def run():
+        await asyncio.to_thread(registry.heartbeat, "node-a")
+        return await asyncio.to_thread(registry.list, node_id="node-a")
+
+    assert [record["room_id"] for record in asyncio.run(run())] == ["room-1"]
+    registry.stop()
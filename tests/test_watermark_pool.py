@@ -0,0 +1,83 @@
+import asyncio
+from ai.pipeline_pool import PipelinePool
+from services.room_pool import RoomPool
+
+class FakeModel:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+class FakeVideoSDK:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.created = 0
+
+    async def create_room(self, geo_fence):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("room creation failed")
+        self.created += 1
+        return f"{geo_fence}-{self.created}"
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+def test_room_pool_refills_below_the_low_watermark():
+    async def run():
+        pool = RoomPool(FakeVideoSDK(), geo_fences=["us002"], low_watermark=2, high_watermark=3, enabled=True)
+        await pool.start()
+        await settle()
+        assert pool.get_stats()["available"] == {"us002": 3}
+        assert await pool.acquire("us002") == "us002-1"
+        await settle()
+        # Still at the low watermark: no refill yet
+        assert pool.get_stats()["available"] == {"us002": 2}
+        await pool.acquire("us002")
+        await settle()
+        stats = pool.get_stats()
+        await pool.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["available"] == {"us002": 3}
+    assert (stats["hits"], stats["misses"], stats["created"]) == (2, 0, 5)
+
+def test_room_pool_backs_off_after_failed_refills():
+    async def run():
+        pool = RoomPool(FakeVideoSDK(failures=1), geo_fences=["us002"], low_watermark=1, high_watermark=2, enabled=True)
+        await pool.start()
+        await settle()
+        errors = pool.get_stats()["refill_errors"]
+        available = pool.get_stats()["available"]["us002"]
+        await pool.stop()
+        return errors, available
+
+    assert asyncio.run(run()) == (1, 1)
+
+def test_pipeline_pool_closes_models_on_stop():
+    models = []
+
+    async def factory():
+        models.append(FakeModel())
+        return models[-1]
+
+    async def run():
+        pool = PipelinePool(size=2, ttl=60, refill_concurrency=2, enabled=True)
+        pool.register("gemini", factory)
+        await pool.start()
+        await settle()
+        model = pool.checkout("gemini")
+        assert pool.checkout("unknown") is None
+        await settle()
+        stats = pool.get_stats()
+        await pool.stop()
+        return model, stats
+
+    model, stats = asyncio.run(run())
+    assert stats["available"] == {"gemini": 2}
+    assert (stats["hits"], stats["misses"], stats["created"]) == (1, 0, 3)
+    assert not model.closed
+    assert [m.closed for m in models if m is not model] == [True, True]
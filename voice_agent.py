@@ -1,32 +1,125 @@
 import logging
-from typing import Optional, List, Any
-from videosdk.agents import Agent
+from typing import Optional, List, Any, Dict
+from videosdk.agents import Agent, function_tool
+from videosdk.agents.llm.chat_context import ChatMessage, ChatRole, FunctionCall, FunctionCallOutput
+from services.appointments import AppointmentStore, appointment_store, parse_time
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_INSTRUCTIONS = (
+    "You are a medical appointment scheduling assistant. Your goal is to confirm the caller's upcoming appointment "
+    "and reschedule it if needed. Call confirm_appointment once they confirm, and reschedule_appointment once they "
+    "agree on a new date and time."
+)
+DEFAULT_GREETING = "Hello, this is Neha, calling from City Medical Center regarding your upcoming appointment. Is this a good time to speak?"
+NO_APPOINTMENT_INSTRUCTIONS = (
+    "No appointment was found for the caller's phone number. Ask for their name and preferred date and time, "
+    "and tell them the clinic will call back to book it."
+)
+
+def describe_time(value: str) -> str:
+    """Spoken form of an appointment time, e.g. "Thursday 5 June 2025 at 11:00 AM"."""
+    at = parse_time(value)
+    return f"{at:%A} {at.day} {at:%B %Y} at {at.hour % 12 or 12}:{at:%M %p}"
+
 class VoiceAgent(Agent):
     """An outbound call agent specialized for medical appointment scheduling."""
 
     def __init__(
         self,
-        instructions: str = "You are a medical appointment scheduling assistant. Your goal is to confirm upcoming appointments (5th June 2025 at 11:00 AM) and reschedule if needed.",
+        instructions: str = DEFAULT_INSTRUCTIONS,
         tools: Optional[List[Any]] = None,
         context: Optional[dict] = None,
+        appointments: AppointmentStore = appointment_store,
     ) -> None:
         """Initialize the AppointmentSchedulingAgent."""
+        context = context or {}
+        self.appointments = appointments
+        # Prefetched by the session manager: None when the caller has no appointment, absent outside a call
+        self.appointment: Optional[Dict[str, Any]] = context.get("appointment")
+        self.base_instructions = instructions
+        # Kept apart from the base instructions, which a pre-connected model session was opened with
+        self.call_instructions: Optional[str] = None
+        if self.appointment is not None:
+            self.call_instructions = self.describe_appointment(self.appointment)
+        elif "appointment" in context:
+            self.call_instructions = NO_APPOINTMENT_INSTRUCTIONS
         super().__init__(
-            instructions=instructions,
+            instructions=f"{instructions}\n\n{self.call_instructions}" if self.call_instructions else instructions,
             tools=tools or []
         )
-        self.context = context or {}
+        self.context = context
         self.logger = logging.getLogger(__name__)
+    
+    @staticmethod
+    def describe_appointment(appointment: Dict[str, Any]) -> str:
+        """Instructions with the caller's appointment, so the model never has to look it up."""
+        details = [f"Time: {describe_time(appointment['appointment_at'])}"]
+        for field, label in (("patient_name", "Patient"), ("doctor", "With"), ("location", "Location"), ("status", "Status")):
+            if appointment.get(field):
+                details.append(f"{label}: {appointment[field]}")
+        return "The caller's appointment, already on file (do not ask them for it):\n" + "\n".join(details)
+    
+    def greeting(self) -> str:
+        """The first line of the call: the configured greeting, else one naming the caller's appointment."""
+        if self.context.get("initial_greeting"):
+            return self.context["initial_greeting"]
+        if self.appointment is None:
+            return DEFAULT_GREETING
+        name = self.appointment.get("patient_name")
+        return (
+            f"Hello{' ' + name if name else ''}, this is Neha, calling from City Medical Center regarding your "
+            f"appointment on {describe_time(self.appointment['appointment_at'])}. Is this a good time to speak?"
+        )
         
     async def on_enter(self) -> None:
         """Handle agent entry into the session."""
         self.logger.info("Agent entered the session.")
-        initial_greeting = self.context.get("initial_greeting", "Hello, this is Neha, calling from City Medical Center regarding your upcoming appointment. Is this a good time to speak?")
-        await self.session.say(initial_greeting)
+        await self.session.say(self.greeting())
+
+    @function_tool
+    async def confirm_appointment(self) -> Dict[str, Any]:
+        """Confirm the caller's appointment once they say they will attend."""
+        if self.appointment is None:
+            return {"error": "No appointment is on file for this caller."}
+        try:
+            self.appointment = self.appointments.confirm(self.appointment["appointment_id"])
+        except KeyError as e:
+            return {"error": str(e)}
+        return {"status": "confirmed", "appointment": describe_time(self.appointment["appointment_at"])}
+
+    @function_tool
+    async def reschedule_appointment(self, new_time: str) -> Dict[str, Any]:
+        """Move the caller's appointment to the date and time they agreed to.
+
+        Args:
+            new_time: The new date and time in ISO 8601 format, e.g. 2025-06-12T14:30
+        """
+        if self.appointment is None:
+            return {"error": "No appointment is on file for this caller."}
+        try:
+            self.appointment = self.appointments.reschedule(self.appointment["appointment_id"], new_time)
+        except ValueError:
+            return {"error": f"Could not read the time {new_time!r}. Use the format YYYY-MM-DDTHH:MM."}
+        except KeyError as e:
+            return {"error": str(e)}
+        return {"status": "rescheduled", "appointment": describe_time(self.appointment["appointment_at"])}
 
     async def on_exit(self) -> None:
         """Handle call termination."""
-        self.logger.info("Call ended")
\ No newline at end of file
+        self.logger.info("Call ended")
+    
+    def transcript(self) -> List[Dict[str, Any]]:
+        """Return the conversation so far: spoken lines, tool calls and tool results, without the instructions."""
+        lines = []
+        for item in self.chat_context.items:
+            if isinstance(item, ChatMessage):
+                if item.role == ChatRole.SYSTEM:
+                    continue
+                text = item.content if isinstance(item.content, str) else " ".join(part.text for part in item.content)
+                lines.append({"role": item.role.value, "text": text, "at": item.created_at})
+            elif isinstance(item, FunctionCall):
+                lines.append({"role": "tool_call", "name": item.name, "arguments": item.arguments})
+            elif isinstance(item, FunctionCallOutput):
+                lines.append({"role": "tool_result", "name": item.name, "output": item.output, "is_error": item.is_error})
+        return lines
\ No newline at end of file
@@ -0,0 +1,172 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest wait before retrying a refill that failed
+MAX_REFILL_BACKOFF = 30.0
+
+class WatermarkPool:
+    """
+    Keyed FIFO sub-pools of ready items, each topped up by its own background task.
+
+    A sub-pool's task refills it to `high_watermark` when a checkout leaves it below `low_watermark`, and every
+    `ttl / 2` seconds so items older than `ttl` are replaced before they are needed. At most `concurrency` items are
+    created at a time; after a failed creation the task backs off, doubling up to MAX_REFILL_BACKOFF. Items that expire
+    or remain at stop are passed to `close`, when given.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        low_watermark: int,
+        high_watermark: int,
+        ttl: float,
+        concurrency: int,
+        close: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ):
+        self.name = name
+        self.low_watermark = low_watermark
+        self.high_watermark = max(high_watermark, low_watermark)
+        self.ttl = ttl
+        self.concurrency = max(1, concurrency)
+        self.close = close
+        # Each sub-pool is FIFO of (item, created_at) so the oldest item is handed out first
+        self.items: Dict[Hashable, Deque[Tuple[Any, float]]] = {}
+        self._factories: Dict[Hashable, Callable[[], Awaitable[Any]]] = {}
+        self._refill_events: Dict[Hashable, asyncio.Event] = {}
+        self._refill_tasks: List[asyncio.Task] = []
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "created": 0,
+            "refill_errors": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._refill_tasks)
+
+    def add(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> None:
+        """Add a sub-pool filled by `factory`, if there is none for `key` yet."""
+        if key not in self._factories:
+            self._factories[key] = factory
+            self.items[key] = deque()
+            if self.running:
+                self._start_refill(key)
+
+    def start(self) -> None:
+        """Start one refill task per sub-pool."""
+        if self.running:
+            return
+        for key in self._factories:
+            self._start_refill(key)
+
+    def _start_refill(self, key: Hashable) -> None:
+        event = asyncio.Event()
+        event.set()
+        self._refill_events[key] = event
+        self._refill_tasks.append(asyncio.create_task(self._refill_loop(key), name=f"{self.name}-{key}"))
+
+    async def stop(self) -> None:
+        """Stop the refill tasks, closing the pooled items if the pool has `close`."""
+        for task in self._refill_tasks:
+            task.cancel()
+        await asyncio.gather(*self._refill_tasks, return_exceptions=True)
+        self._refill_tasks.clear()
+        self._refill_events.clear()
+        if self.close is not None:
+            for items in self.items.values():
+                while items:
+                    await self._close(items.popleft()[0])
+
+    def take(self, key: Hashable) -> Optional[Any]:
+        """Take the oldest fresh item of a sub-pool, or None if it is empty, waking its refill task if needed."""
+        items = self.items.get(key)
+        item = None
+        if items is not None:
+            expired = self.pop_expired(key)
+            if self.close is not None:
+                # Close stale items in the background rather than delaying the caller
+                for stale in expired:
+                    asyncio.create_task(self._close(stale))
+            item = items.popleft()[0] if items else None
+            if len(items) < self.low_watermark and key in self._refill_events:
+                self._refill_events[key].set()
+        self.stats["hits" if item is not None else "misses"] += 1
+        return item
+
+    def put(self, key: Hashable, item: Any) -> bool:
+        """Pool an item created elsewhere, if its sub-pool exists and is below the high watermark."""
+        items = self.items.get(key)
+        if items is None or len(items) >= self.high_watermark:
+            return False
+        items.append((item, time.monotonic()))
+        return True
+
+    def pop_expired(self, key: Hashable) -> List[Any]:
+        """Remove and return items older than the TTL. The oldest items sit at the head of the deque."""
+        items = self.items[key]
+        cutoff = time.monotonic() - self.ttl
+        expired = []
+        while items and items[0][1] < cutoff:
+            expired.append(items.popleft()[0])
+            self.stats["expired"] += 1
+        return expired
+
+    async def _close(self, item: Any) -> None:
+        if self.close is None:
+            return
+        try:
+            await self.close(item)
+        except Exception as e:
+            logger.warning(f"Error closing an item of {self.name}: {e}")
+
+    async def _refill_loop(self, key: Hashable) -> None:
+        """Top the sub-pool up to the high watermark whenever woken, replacing expired items."""
+        event = self._refill_events[key]
+        items = self.items[key]
+        factory = self._factories[key]
+        backoff = 1.0
+
+        while True:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=self.ttl / 2)
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
+            for expired in self.pop_expired(key):
+                await self._close(expired)
+
+            while len(items) < self.high_watermark:
+                batch = min(self.high_watermark - len(items), self.concurrency)
+                results = await asyncio.gather(*(factory() for _ in range(batch)), return_exceptions=True)
+                failed = False
+                for result in results:
+                    if isinstance(result, BaseException):
+                        self.stats["refill_errors"] += 1
+                        failed = True
+                        logger.warning(f"{self.name} refill failed for {key}: {result}")
+                    else:
+                        items.append((result, time.monotonic()))
+                        self.stats["created"] += 1
+
+                if failed:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, MAX_REFILL_BACKOFF)
+                    event.set()
+                    break
+                backoff = 1.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current sub-pool sizes."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+            "available": {str(key): len(items) for key, items in self.items.items()},
+        }